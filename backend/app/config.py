@@ -0,0 +1,151 @@
+"""
+Runtime configuration for the LA Interactive Map backend.
+Every value can be overridden with an environment variable of the same name.
+"""
+
+import os
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment."""
+    return float(os.getenv(name, default))
+
+
+# Public upstream APIs; point them at the local simulator (python -m simulator)
+# for load tests
+NOMINATIM_BASE_URL = os.getenv("NOMINATIM_BASE_URL", "https://nominatim.openstreetmap.org").rstrip("/")
+OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+
+# OSRM routing server; point at a local container, e.g. http://localhost:5000
+OSRM_BASE_URL = os.getenv("OSRM_BASE_URL", "http://router.project-osrm.org").rstrip("/")
+
+# Default upstream request budgets for the public services: (host, requests
+# per second, burst size). Nominatim's usage policy allows at most 1 request
+# per second.
+_PUBLIC_RATE_LIMITS = {
+    "NOMINATIM": ("nominatim.openstreetmap.org", 1.0, 1),
+    "OVERPASS": ("overpass-api.de", 1.0, 2),
+    "OSRM": ("router.project-osrm.org", 1.0, 2),
+}
+
+
+def _upstream_rate_limits(urls: Dict[str, str]) -> Dict[str, Tuple[float, float]]:
+    """
+    host[:port] -> (requests per second, burst size) for each upstream URL.
+
+    The public hosts get their default budget; any other host (a local OSRM
+    container, the simulator) is unlimited unless <NAME>_RATE_PER_SEC is set.
+    Services sharing a host share one bucket with the stricter of their budgets.
+    """
+    limits: Dict[str, Tuple[float, float]] = {}
+    for name, url in urls.items():
+        parts = urlsplit(url)
+        public_host, rate, burst = _PUBLIC_RATE_LIMITS[name]
+        if parts.hostname != public_host and os.getenv(f"{name}_RATE_PER_SEC") is None:
+            continue
+        limit = (_env_float(f"{name}_RATE_PER_SEC", rate), _env_float(f"{name}_BURST", burst))
+        if parts.netloc in limits:
+            limit = tuple(min(pair) for pair in zip(limits[parts.netloc], limit))
+        limits[parts.netloc] = limit
+    return limits
+
+
+UPSTREAM_RATE_LIMITS = _upstream_rate_limits({
+    "NOMINATIM": NOMINATIM_BASE_URL,
+    "OVERPASS": OVERPASS_URL,
+    "OSRM": OSRM_BASE_URL,
+})
+
+# How long a request may wait for an upstream slot, by priority class
+UPSTREAM_QUEUE_TIMEOUTS = {
+    "interactive": _env_float("UPSTREAM_TIMEOUT_INTERACTIVE_SEC", 10.0),
+    "prefetch": _env_float("UPSTREAM_TIMEOUT_PREFETCH_SEC", 30.0),
+    "background": _env_float("UPSTREAM_TIMEOUT_BACKGROUND_SEC", 120.0),
+}
+
+# How long fetched zone polygons are reused before asking Nominatim again
+ZONE_CACHE_TTL_SEC = _env_float("ZONE_CACHE_TTL_SEC", 24 * 3600)
+# Retry sooner when some zones could not be fetched
+ZONE_RETRY_SEC = _env_float("ZONE_RETRY_SEC", 60)
+ZONE_FETCH_TIMEOUT_SEC = _env_float("ZONE_FETCH_TIMEOUT_SEC", 10.0)
+
+OSRM_TIMEOUT_SEC = _env_float("OSRM_TIMEOUT_SEC", 10.0)
+OSRM_MAX_RETRIES = int(_env_float("OSRM_MAX_RETRIES", 2))
+OSRM_RETRY_BACKOFF_SEC = _env_float("OSRM_RETRY_BACKOFF_SEC", 0.5)
+OSRM_MAX_CONNECTIONS = int(_env_float("OSRM_MAX_CONNECTIONS", 20))
+# Most coordinates OSRM accepts in one table request (demo server: 100)
+OSRM_TABLE_MAX_COORDS = int(_env_float("OSRM_TABLE_MAX_COORDS", 100))
+
+# How many of the closest candidates rank=travel_time re-ranks (per category for POIs)
+TRAVEL_TIME_RERANK_CANDIDATES = int(_env_float("TRAVEL_TIME_RERANK_CANDIDATES", 25))
+
+# Base routes are cached per OSRM profile with endpoints snapped to this many
+# decimal places (4 ~= 11 m)
+ROUTE_SNAP_DECIMALS = int(_env_float("ROUTE_SNAP_DECIMALS", 4))
+ROUTE_CACHE_TTL_SEC = _env_float("ROUTE_CACHE_TTL_SEC", 3600)
+ROUTE_CACHE_MAX_ENTRIES = int(_env_float("ROUTE_CACHE_MAX_ENTRIES", 2048))
+
+# Routing backend: "osrm" (HTTP server above) or "local" (prebuilt graphs
+# from build_routing_graph.py)
+ROUTING_BACKEND = os.getenv("ROUTING_BACKEND", "osrm")
+LOCAL_GRAPH_DIR = os.getenv("LOCAL_GRAPH_DIR", "data/graphs")
+
+# Check-in storage: "memory" (demo data, lost on restart) or "sqlite"
+CHECKIN_STORE = os.getenv("CHECKIN_STORE", "memory")
+CHECKIN_DB_PATH = os.getenv("CHECKIN_DB_PATH", "data/checkins.db")
+# Recent check-ins kept per zone by the in-memory store
+CHECKIN_ZONE_CAPACITY = int(_env_float("CHECKIN_ZONE_CAPACITY", 1000))
+# Seed for the demo check-ins generated at startup (unset: different every run)
+MOCK_DATA_SEED = int(os.environ["MOCK_DATA_SEED"]) if os.getenv("MOCK_DATA_SEED") else None
+
+# Live check-in streams: events buffered per subscriber before it must resync,
+# and how often idle SSE connections get a keep-alive comment
+CHECKIN_STREAM_QUEUE_SIZE = int(_env_float("CHECKIN_STREAM_QUEUE_SIZE", 256))
+CHECKIN_STREAM_HEARTBEAT_SEC = _env_float("CHECKIN_STREAM_HEARTBEAT_SEC", 15.0)
+
+# Half-life of the decayed score used by /locations/{zone}/trending?window=decay
+TRENDING_HALF_LIFE_SEC = _env_float("TRENDING_HALF_LIFE_SEC", 3600)
+
+# Deepest zoom level served by /checkins/heatmap/{z}/{x}/{y}
+HEATMAP_MAX_ZOOM = int(_env_float("HEATMAP_MAX_ZOOM", 16))
+
+# POST /checkins/bulk: records validated and written per batch, and how many
+# line errors are reported back
+BULK_CHUNK_SIZE = int(_env_float("BULK_CHUNK_SIZE", 2000))
+BULK_MAX_REPORTED_ERRORS = int(_env_float("BULK_MAX_REPORTED_ERRORS", 100))
+
+# /checkins/near grid: cell size (0.005 deg ~ 500 m), recent check-ins kept
+# per cell, and the largest radius accepted
+NEARBY_CELL_DEG = _env_float("NEARBY_CELL_DEG", 0.005)
+NEARBY_CELL_CAPACITY = int(_env_float("NEARBY_CELL_CAPACITY", 200))
+NEARBY_MAX_RADIUS_M = _env_float("NEARBY_MAX_RADIUS_M", 5000)
+
+# Event-loop lag sampling for /health: interval between probes and how many
+# recent samples the percentiles cover
+LOOP_LAG_INTERVAL_SEC = _env_float("LOOP_LAG_INTERVAL_SEC", 0.1)
+LOOP_LAG_WINDOW = int(_env_float("LOOP_LAG_WINDOW", 600))
+
+# Append every API request to this NDJSON file for `python -m loadtest --replay`
+# (unset: disabled)
+REQUEST_LOG_PATH = os.getenv("REQUEST_LOG_PATH")
+
+# Application log level, and the fraction of per-request DEBUG/INFO messages
+# that are actually emitted (warnings and errors are never sampled)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = _env_float("LOG_SAMPLE_RATE", 0.01)
+
+# On-demand request profiling: requests carrying this token (X-Profile-Token
+# header or ?profile= query flag) are sampled every PROFILE_SAMPLE_INTERVAL_SEC
+# and kept as collapsed stacks (unset: disabled). The last PROFILE_HISTORY
+# profiles are kept in memory, and also written to PROFILE_DIR if set.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_INTERVAL_SEC = _env_float("PROFILE_SAMPLE_INTERVAL_SEC", 0.005)
+PROFILE_HISTORY = int(_env_float("PROFILE_HISTORY", 20))
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+
+# Event-loop stalls longer than this are logged with the blocking stack
+# (0 disables); the last LOOP_BLOCK_HISTORY are kept for /debug/loop-blocks
+LOOP_BLOCK_THRESHOLD_SEC = _env_float("LOOP_BLOCK_THRESHOLD_SEC", 0.25)
+LOOP_BLOCK_HISTORY = int(_env_float("LOOP_BLOCK_HISTORY", 20))
@@ -3,9 +3,20 @@ FastAPI main application for LA Interactive Map backend.
 Provides endpoints for zone data and place search functionality.
 """
 
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import map_routes, checkin_routes
+from fastapi.responses import PlainTextResponse
+from app.config import PROFILE_TOKEN, REQUEST_LOG_PATH
+from app.routers import map_routes, checkin_routes, debug_routes
+from app.services.zone_service import get_la_zones
+from app.utils.logging_setup import configure_logging
+from app.utils.loop_monitor import loop_monitor
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.profiling import ProfilingMiddleware, loop_block_detector
+from app.utils.request_log import RequestLogMiddleware
+
+configure_logging()
 
 # Create FastAPI application instance
 app = FastAPI(
@@ -23,9 +34,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record API traffic for load-test replay
+if REQUEST_LOG_PATH:
+    app.add_middleware(RequestLogMiddleware, path=REQUEST_LOG_PATH)
+
+# Opt-in per-request profiling; outside the request log so the token isn't logged
+if PROFILE_TOKEN:
+    app.add_middleware(ProfilingMiddleware, token=PROFILE_TOKEN)
+
+# Outermost, so request timing covers the other middleware too
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(map_routes.router, prefix="/api", tags=["map"])
 app.include_router(checkin_routes.router, prefix="/api", tags=["checkins"])
+if PROFILE_TOKEN:
+    app.include_router(debug_routes.router, prefix="/debug", tags=["debug"])
+
+@app.on_event("startup")
+async def warm_zone_cache():
+    """Fetch zone polygons in the background so the first request doesn't wait."""
+    asyncio.get_running_loop().run_in_executor(None, get_la_zones)
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    """Start sampling event-loop lag for /health, and watching for stalls."""
+    loop_monitor.start()
+    loop_block_detector.start()
+
+@app.on_event("shutdown")
+async def close_upstream_clients():
+    """Release pooled upstream connections."""
+    await map_routes.transit_service.aclose()
+    loop_block_detector.stop()
+    await loop_monitor.stop()
 
 @app.get("/")
 async def root():
@@ -38,5 +80,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Health check endpoint, with recent event-loop lag."""
+    return {"status": "healthy", "event_loop_lag_ms": loop_monitor.snapshot()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: request, upstream, cache, scheduler and event-loop."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
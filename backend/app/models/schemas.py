@@ -16,6 +16,7 @@ class SearchResult(BaseModel):
     distance_km: float
     distance_miles: float
     source: str  # 'overpass' or 'nominatim'
+    travel_time_s: Optional[int] = None  # set when ranked by travel time
 
 class SearchResponse(BaseModel):
     """Response containing multiple search results."""
@@ -29,6 +30,8 @@ class SearchRequest(BaseModel):
     query: str
     lat: float
     lon: float
+    rank: str = "distance"  # 'distance' or 'travel_time'
+    mode: str = "driving"  # travel mode used when rank is 'travel_time'
 
 # New multi-result search models
 class SearchResultOld(BaseModel):
@@ -68,6 +71,7 @@ class POI(BaseModel):
     description: str
     address: str
     distance: Optional[float] = None
+    travel_time_s: Optional[int] = None
     tags: Optional[Dict[str, str]] = None
 
 class POIRequest(BaseModel):
@@ -83,6 +87,14 @@ class POIResponse(BaseModel):
     pois: Dict[str, List[POI]]
     total_count: int
 
+class NearestPOIResponse(BaseModel):
+    """Response model for nearest POI lookup."""
+    category: str
+    lat: float
+    lon: float
+    results: List[POI]
+    total_count: int
+
 
 class TopLocation(BaseModel):
     """Top location in a zone with check-in count."""
@@ -94,6 +106,26 @@ class TopLocation(BaseModel):
     checkin_count: int = Field(..., description="Number of check-ins at this location")
 
 
+class TrendingLocation(BaseModel):
+    """Venue trending in a zone."""
+    poi_name: str = Field(..., description="Name of the POI")
+    poi_id: str = Field(..., description="Unique identifier for the POI")
+    lat: float = Field(..., description="Latitude")
+    lon: float = Field(..., description="Longitude")
+    amenity_type: str = Field(..., description="Type of venue (restaurant, bar, etc)")
+    score: float = Field(..., description="Check-ins in the window, or decayed score for window=decay")
+
+
+class HeatmapTile(BaseModel):
+    """Check-in density for one slippy-map tile."""
+    z: int
+    x: int
+    y: int
+    resolution: int = Field(..., description="Cells per tile side")
+    max_count: int = Field(..., description="Largest cell count in the tile")
+    cells: List[List[int]] = Field(..., description="[column, row, count] for each non-empty cell")
+
+
 class CheckInBase(BaseModel):
     """Base fields for check-in."""
     user_name: str = Field(..., description="Name of user checking in")
@@ -110,6 +142,30 @@ class CheckInCreate(CheckInBase):
     pass
 
 
+class CheckInImport(BaseModel):
+    """One line of a bulk check-in import; the zone is derived from the coordinates."""
+    user_name: str = Field(..., description="Name of user checking in")
+    poi_name: str = Field(..., description="Name of the POI")
+    poi_lat: float = Field(..., ge=-90, le=90, description="POI latitude")
+    poi_lon: float = Field(..., ge=-180, le=180, description="POI longitude")
+    amenity_type: str = Field("attraction", description="Type of venue")
+    caption: Optional[str] = Field(None, description="Check-in caption")
+    poi_id: Optional[str] = Field(None, description="Unique identifier for the POI")
+    timestamp: Optional[datetime] = Field(None, description="When the check-in happened (defaults to now)")
+
+
+class BulkLineError(BaseModel):
+    line: int = Field(..., description="1-based line number in the request body")
+    error: str
+
+
+class BulkIngestResponse(BaseModel):
+    """Outcome of a bulk check-in import."""
+    accepted: int
+    rejected: int
+    errors: List[BulkLineError] = Field(..., description="First rejected lines and why")
+
+
 class CheckIn(CheckInBase):
     """Complete check-in object returned by API."""
     id: str = Field(..., description="Unique check-in ID")
@@ -121,11 +177,18 @@ class CheckIn(CheckInBase):
         json_encoders = {
             datetime: lambda dt: dt.isoformat()
         }
+
+
+class NearbyCheckIn(CheckIn):
+    """Check-in returned by a radius query."""
+    distance_m: float = Field(..., description="Distance from the query point in metres")
+
 class TransitRoute(BaseModel):
     mode: str
     duration: int
     distance: float
     instructions: str
+    geometry: Optional[str] = None  # polyline6, when requested
     
 class CarbonSavings(BaseModel):
     transit: float
@@ -137,3 +200,6 @@ class TransitResponse(BaseModel):
     total_distance: float
     total_duration: int
     carbon_savings: CarbonSavings
+    
+class TransitComparisonResponse(BaseModel):
+    options: Dict[str, TransitResponse]
@@ -1,39 +1,213 @@
 """
 API routes for check-ins and top locations.
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from ..models.schemas import CheckIn, CheckInCreate, TopLocation
+from ..config import CHECKIN_STREAM_HEARTBEAT_SEC, HEATMAP_MAX_ZOOM, NEARBY_MAX_RADIUS_M
+from ..models.schemas import (
+    BulkIngestResponse, CheckIn, CheckInCreate, HeatmapTile, NearbyCheckIn, TopLocation, TrendingLocation
+)
+from ..services.checkin_ingest import ingest_ndjson
+from ..services.checkin_events import broadcaster
+from ..services.checkin_nearby import SORT_ORDERS
+from ..services.trending import WINDOWS
 from ..services.checkin_store import (
     get_zone_checkins,
+    get_heatmap_tile,
+    get_nearby_checkins,
     get_top_locations,
+    get_trending_locations,
+    get_zone_version,
     add_checkin
 )
 
 router = APIRouter()
 
+# Sent on a quiet WebSocket so dead connections are noticed and proxies keep it open
+_WS_PING = '{"type":"ping"}'
+
+
+def _zone_etag(zone: str) -> str:
+    return f'"{get_zone_version(zone)}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already names ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+# Registered before /checkins/{zone} so "near" isn't taken for a zone name
+@router.get("/checkins/near", response_model=List[NearbyCheckIn])
+def get_checkins_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(500, gt=0, le=NEARBY_MAX_RADIUS_M, description="Radius in metres"),
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = Query("distance", description="distance or recent")
+):
+    """Recent check-ins within a radius of a point, closest or newest first."""
+    if sort not in SORT_ORDERS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORT_ORDERS)}")
+    try:
+        return jsonable_encoder(get_nearby_checkins(lat, lon, radius, limit, sort))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 @router.get("/checkins/{zone}", response_model=List[CheckIn])
-def get_checkins(zone: str, limit: Optional[int] = 20):
-    """Get recent check-ins for a zone."""
+def get_checkins(
+    zone: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=200),
+    since_id: Optional[int] = Query(None, ge=0, description="Only check-ins newer than this id"),
+    before_id: Optional[int] = Query(None, ge=0, description="Only check-ins older than this id")
+):
+    """
+    Get recent check-ins for a zone, newest first.
+    
+    Poll with since_id set to the newest id already shown to receive only new
+    check-ins (the oldest ``limit`` of them, so repeating the poll from the
+    newest id returned leaves no gap); page back through history with before_id set to the oldest id
+    shown. Responses carry an ETag and honour If-None-Match with 304.
+    """
     try:
-        checkins = get_zone_checkins(zone, limit)
+        # Read the version before the data: a concurrent write can only make
+        # the ETag older than the body, never newer
+        etag = _zone_etag(zone)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        checkins = get_zone_checkins(zone, limit, since_id, before_id)
+        response.headers["ETag"] = etag
         return jsonable_encoder(checkins)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/checkins/bulk", response_model=BulkIngestResponse)
+async def bulk_import_checkins(request: Request):
+    """
+    Import many check-ins from an NDJSON body (one CheckInImport per line).
+    
+    Send `Content-Encoding: gzip` for compressed bodies. Zones are assigned
+    from the coordinates; invalid lines are skipped and reported by number.
+    """
+    content_type = request.headers.get("content-type", "")
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip" or "gzip" in content_type
+    try:
+        return await ingest_ndjson(request.stream(), gzipped)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/checkins/heatmap/{z}/{x}/{y}", response_model=HeatmapTile)
+def get_checkin_heatmap(z: int, x: int, y: int):
+    """Check-in density for a map tile, binned as check-ins arrive."""
+    if not 0 <= z <= HEATMAP_MAX_ZOOM:
+        raise HTTPException(status_code=400, detail=f"z must be between 0 and {HEATMAP_MAX_ZOOM}")
+    if not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        raise HTTPException(status_code=400, detail="Tile x / y out of range for zoom")
+    return get_heatmap_tile(z, x, y)
+
+
+@router.get("/checkins/{zone}/stream")
+async def stream_checkins(zone: str, request: Request):
+    """
+    Server-sent events with a zone's new check-ins as they happen.
+    
+    Events: "checkin" (the new check-in), "leaderboard" (venue and count
+    delta) and "resync" (the client fell behind and should re-fetch).
+    """
+    subscription = broadcaster.subscribe(zone)
+
+    async def events():
+        try:
+            yield b"retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(CHECKIN_STREAM_HEARTBEAT_SEC)
+                yield event.sse if event else b": keep-alive\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/checkins/{zone}/ws")
+async def checkins_websocket(websocket: WebSocket, zone: str):
+    """
+    WebSocket variant of the check-in stream; sends {"type", "data"} messages,
+    and {"type": "ping"} when a zone has been quiet for a heartbeat interval.
+    """
+    await websocket.accept()
+    subscription = broadcaster.subscribe(zone)
+
+    async def send_events():
+        while True:
+            event = await subscription.get(CHECKIN_STREAM_HEARTBEAT_SEC)
+            await websocket.send_text(event.json if event else _WS_PING)
+
+    async def wait_for_disconnect():
+        # Messages from the client are ignored; receiving is how a close is noticed
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = {asyncio.create_task(send_events()), asyncio.create_task(wait_for_disconnect())}
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        broadcaster.unsubscribe(subscription)
+
+
 @router.get("/locations/{zone}/top", response_model=List[TopLocation])
-def get_zone_top_locations(zone: str, limit: Optional[int] = 10):
-    """Get top locations for a zone."""
+def get_zone_top_locations(
+    zone: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100)
+):
+    """Get top locations for a zone (ETag / If-None-Match supported)."""
     try:
+        etag = _zone_etag(zone)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         locations = get_top_locations(zone, limit)
+        response.headers["ETag"] = etag
         return jsonable_encoder(locations)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/locations/{zone}/trending", response_model=List[TrendingLocation])
+def get_zone_trending_locations(zone: str, window: str = "hour", limit: int = Query(10, ge=1, le=100)):
+    """
+    Venues trending in a zone: most check-ins in the last hour or day, or by
+    exponentially decayed score (window=decay).
+    """
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of: {', '.join(WINDOWS)}")
+    try:
+        return jsonable_encoder(get_trending_locations(zone, window, limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/checkins", response_model=CheckIn)
 def create_checkin(checkin: CheckInCreate):
     """Create a new check-in."""
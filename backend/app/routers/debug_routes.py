@@ -0,0 +1,45 @@
+"""
+Admin routes for request profiles and event-loop stalls (mounted only when
+PROFILE_TOKEN is set; every route requires the token).
+"""
+import hmac
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..config import PROFILE_TOKEN
+from ..utils.profiling import loop_block_detector, profile_store
+
+
+def _require_token(x_profile_token: Optional[str] = Header(None)):
+    if not x_profile_token or not hmac.compare_digest(x_profile_token, PROFILE_TOKEN or ""):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+
+router = APIRouter(dependencies=[Depends(_require_token)])
+
+
+@router.get("/profiles")
+async def list_profiles() -> List[Dict]:
+    """Most recent request profiles, newest first."""
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """
+    One profile as collapsed stacks, e.g.
+    ``curl ... | flamegraph.pl > profile.svg`` or open in speedscope.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        # Profiles are stored once the request has fully finished
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
+    return PlainTextResponse(profile.stacks.render())
+
+
+@router.get("/loop-blocks")
+async def list_loop_blocks() -> List[Dict]:
+    """Recent event-loop stalls with the stacks sampled while the loop was blocked."""
+    return loop_block_detector.events()
@@ -2,18 +2,26 @@
 Map-related API routes for zone data, place search, and POI data.
 """
 
+import json
+import logging
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from app.models.schemas import SearchRequest, SearchResponse, ZonesResponse, POIRequest, POIResponse, SearchResult
-from app.services.zone_service import get_la_zones
+from app.models.schemas import SearchRequest, SearchResponse, ZonesResponse, POIRequest, POIResponse, SearchResult, NearestPOIResponse
+from app.services.zone_service import get_la_zones_async
 from app.services.nominatim_service import NominatimService
 from app.services.overpass_service import OverpassService
 from app.utils.zone_utils import find_zone_for_point, validate_coordinates
-from app.services.transit_service import TransitService
-from app.models.schemas import TransitResponse, TransitRoute, CarbonSavings
+from app.services.transit_service import PROFILE_BY_MODE, TransitService
+from app.services.upstream_scheduler import upstream_scheduler
+from app.config import TRAVEL_TIME_RERANK_CANDIDATES
+from app.utils.geo_utils import calculate_distance
+from app.utils.logging_setup import SampledLogger
+from app.models.schemas import TransitResponse, TransitRoute, CarbonSavings, TransitComparisonResponse
 
 # Create router instance
 router = APIRouter()
+sampled_logger = SampledLogger(logging.getLogger("map_routes"))
 
 # Initialize services
 nominatim_service = NominatimService()
@@ -29,7 +37,7 @@ async def get_zones():
         ZonesResponse: List of zones with polygon data
     """
     try:
-        zones = get_la_zones()
+        zones = await get_la_zones_async()
         return ZonesResponse(zones=zones)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching zones: {str(e)}")
@@ -49,15 +57,25 @@ async def search_places(request: SearchRequest):
         # Validate coordinates
         if not validate_coordinates(request.lat, request.lon):
             raise HTTPException(status_code=400, detail="Invalid coordinates")
+        _validate_rank(request.rank)
+        _validate_mode(request.mode)
+        by_travel_time = request.rank == "travel_time"
         
         # Search for places (returns list now)
         results = await nominatim_service.search_places(
             query=request.query,
             user_lat=request.lat,
             user_lon=request.lon,
-            limit=10,
+            limit=TRAVEL_TIME_RERANK_CANDIDATES if by_travel_time else 10,
             radius_km=32.0  # 20 miles
         )
+
+        # Re-rank the closest candidates with one travel-time matrix call
+        if results and by_travel_time:
+            results = await transit_service.rank_by_travel_time(
+                request.lat, request.lon, results, mode=request.mode
+            )
+            results = results[:10]
         
         if not results:
             raise HTTPException(
@@ -80,12 +98,47 @@ async def search_places(request: SearchRequest):
             detail=f"Error searching places: {str(e)}"
         )
 
+@router.post("/search/stream")
+async def search_places_stream(request: SearchRequest):
+    """
+    Stream search results as newline-delimited JSON while each source responds.
+    
+    Args:
+        request: SearchRequest with query and user coordinates
+    
+    Returns:
+        StreamingResponse: One JSON event per line - a "batch" for every source
+        (only results not already sent), then a "final" ranked snapshot
+    """
+    if not validate_coordinates(request.lat, request.lon):
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+
+    async def event_stream():
+        async for event in nominatim_service.search_places_stream(
+            query=request.query,
+            user_lat=request.lat,
+            user_lon=request.lon,
+            limit=10,
+            radius_km=32.0  # 20 miles
+        ):
+            if event["type"] == "final":
+                event.update(
+                    total_count=len(event["results"]),
+                    query=request.query,
+                    user_location={"lat": request.lat, "lon": request.lon}
+                )
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 @router.get("/pois", response_model=POIResponse)
 async def get_pois(
     zone: str = Query(..., description="Zone name to search for POIs"),
     categories: Optional[str] = Query(None, description="Comma-separated list of POI categories"),
     lat: Optional[float] = Query(None, description="User latitude for distance calculation"),
-    lon: Optional[float] = Query(None, description="User longitude for distance calculation")
+    lon: Optional[float] = Query(None, description="User longitude for distance calculation"),
+    rank: str = Query("distance", description="Ranking: 'distance' or 'travel_time'"),
+    mode: str = Query("driving", description="Travel mode used when rank is 'travel_time'")
 ):
     """
     Get Points of Interest (POIs) within a specific zone.
@@ -95,20 +148,23 @@ async def get_pois(
         categories: Comma-separated list of categories (restaurants, bars, attractions, utilities)
         lat: User's latitude for distance calculation
         lon: User's longitude for distance calculation
+        rank: 'travel_time' re-ranks the closest POIs of each category by travel time
+        mode: Travel mode for travel-time ranking
     
     Returns:
         POIResponse: POIs grouped by category
     """
-    print(f"🌐 POI API endpoint called")
-    print(f"  - Zone: {zone}")
-    print(f"  - Categories: {categories}")
-    print(f"  - Lat: {lat}, Lon: {lon}")
+    sampled_logger.info("POIs requested: zone=%s categories=%s lat=%s lon=%s", zone, categories, lat, lon)
     
     try:
         # Validate coordinates if provided
         if lat is not None and lon is not None:
             if not validate_coordinates(lat, lon):
                 raise HTTPException(status_code=400, detail="Invalid coordinates")
+        _validate_rank(rank)
+        _validate_mode(mode)
+        if rank == "travel_time" and (lat is None or lon is None):
+            raise HTTPException(status_code=400, detail="rank=travel_time requires lat and lon")
         
         # Parse categories
         category_list = None
@@ -124,7 +180,7 @@ async def get_pois(
                 )
         
         # Find the zone
-        zones = get_la_zones()
+        zones = await get_la_zones_async()
         target_zone = None
         for z in zones:
             if z.name.lower() == zone.lower():
@@ -139,11 +195,6 @@ async def get_pois(
             )
         
         # Get POIs from Overpass API
-        print(f"🔄 Calling overpass_service.get_pois_in_zone...")
-        print(f"  - Zone: {target_zone.name}")
-        print(f"  - Categories: {category_list}")
-        print(f"  - User location: {lat}, {lon}")
-        
         pois_by_category = await overpass_service.get_pois_in_zone(
             target_zone,
             category_list,
@@ -151,6 +202,9 @@ async def get_pois(
             lon
         )
         
+        if rank == "travel_time":
+            pois_by_category = await _rank_pois_by_travel_time(pois_by_category, lat, lon, mode)
+
         # Calculate total count
         total_count = sum(len(pois) for pois in pois_by_category.values())
         
@@ -165,6 +219,90 @@ async def get_pois(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching POIs: {str(e)}")
 
+@router.get("/nearest", response_model=NearestPOIResponse)
+async def get_nearest_pois(
+    category: str = Query(..., description="POI category to search"),
+    lat: float = Query(..., description="User latitude"),
+    lon: float = Query(..., description="User longitude"),
+    k: int = Query(5, ge=1, le=50, description="Number of POIs to return")
+):
+    """
+    Get the k POIs of a category closest to the user.
+    
+    Args:
+        category: POI category (restaurants, bars, attractions, utilities)
+        lat: User's latitude
+        lon: User's longitude
+        k: Number of POIs to return
+    
+    Returns:
+        NearestPOIResponse: Closest POIs with distance (km), closest first
+    """
+    try:
+        if not validate_coordinates(lat, lon):
+            raise HTTPException(status_code=400, detail="Invalid coordinates")
+
+        category = category.strip().lower()
+        valid_categories = overpass_service.get_all_categories()
+        if category not in valid_categories:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid category: {category}. Valid categories: {valid_categories}"
+            )
+
+        # Load the user's zone into the cache the first time it is needed
+        zone = find_zone_for_point(lat, lon, await get_la_zones_async())
+        if zone and not overpass_service.is_zone_cached(zone.name, category):
+            await overpass_service.get_pois_in_zone(zone, [category])
+
+        results = overpass_service.get_nearest_pois(category, lat, lon, k)
+        return NearestPOIResponse(
+            category=category,
+            lat=lat,
+            lon=lon,
+            results=results,
+            total_count=len(results)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding nearest POIs: {str(e)}")
+
+async def _rank_pois_by_travel_time(pois_by_category: dict, lat: float, lon: float, mode: str) -> dict:
+    """Re-rank each category's closest POIs using a single travel-time matrix call."""
+    candidates, rest = [], {}
+    for category, pois in pois_by_category.items():
+        by_distance = sorted(pois, key=lambda p: calculate_distance(lat, lon, p["lat"], p["lon"]))
+        # Tag candidates so all categories share one matrix request
+        candidates.extend(
+            {**poi, "_category": category}
+            for poi in by_distance[:TRAVEL_TIME_RERANK_CANDIDATES]
+        )
+        rest[category] = [
+            {**poi, "travel_time_s": None}
+            for poi in by_distance[TRAVEL_TIME_RERANK_CANDIDATES:]
+        ]
+
+    ranked = await transit_service.rank_by_travel_time(
+        lat, lon, candidates, mode=mode, max_candidates=len(candidates)
+    )
+
+    result = {category: [] for category in pois_by_category}
+    for poi in ranked:
+        result[poi.pop("_category")].append(poi)
+    for category, pois in rest.items():
+        result[category].extend(pois)
+    return result
+
+def _validate_rank(rank: str):
+    if rank not in ("distance", "travel_time"):
+        raise HTTPException(status_code=400, detail="rank must be 'distance' or 'travel_time'")
+
+def _validate_mode(mode: str):
+    if mode not in PROFILE_BY_MODE:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {list(PROFILE_BY_MODE)}")
+
 @router.get("/pois/test")
 async def test_overpass_api():
     """
@@ -209,6 +347,16 @@ async def get_poi_categories():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
 
+@router.get("/upstream/status")
+async def get_upstream_status():
+    """
+    Get rate limiter state for each upstream API host.
+    
+    Returns:
+        Dictionary of host -> token bucket, queue depth and wait metrics
+    """
+    return upstream_scheduler.snapshot()
+
 @router.get("/zone/detect")
 async def detect_zone(
     lat: float = Query(..., description="User latitude"),
@@ -228,8 +376,7 @@ async def detect_zone(
         if not validate_coordinates(lat, lon):
             raise HTTPException(status_code=400, detail="Invalid coordinates")
         
-        from app.utils.zone_utils import find_zone_for_point
-        zone = find_zone_for_point(lat, lon)
+        zone = find_zone_for_point(lat, lon, await get_la_zones_async())
         
         if zone:
             return {
@@ -254,13 +401,75 @@ async def get_transit_directions(request: dict):
     end_lon = request.get("end_lon")
     mode = request.get("mode", "transit")
     passengers = request.get("passengers", 1)
+    geometry = request.get("geometry", "none")
+    steps = request.get("steps", True)
     
     if not validate_coordinates(start_lat, start_lon) or not validate_coordinates(end_lat, end_lon):
         raise HTTPException(status_code=400, detail="Invalid coordinates")
+    _validate_geometry(geometry)
+    _validate_steps(steps)
 
     directions = await transit_service.get_transit_directions(
-        start_lat, start_lon, end_lat, end_lon, mode=mode, passengers=passengers
+        start_lat, start_lon, end_lat, end_lon, mode=mode, passengers=passengers,
+        geometry=geometry, steps=steps
     )
+    return _build_transit_response(directions, mode, passengers)
+
+@router.post("/transit/compare", response_model=TransitComparisonResponse)
+async def compare_transit_modes(request: dict):
+    """
+    Compare every travel mode for a trip in one call.
+    
+    Args:
+        request: Trip endpoints (start_lat, start_lon, end_lat, end_lon),
+            optional passengers, optional list of modes
+            (defaults to driving, carpool, transit and walking) and
+            optional geometry / steps as for /transit
+    
+    Returns:
+        TransitComparisonResponse: Directions and carbon savings per mode
+    """
+    start_lat = request.get("start_lat")
+    start_lon = request.get("start_lon")
+    end_lat = request.get("end_lat")
+    end_lon = request.get("end_lon")
+    passengers = request.get("passengers", 1)
+    modes = request.get("modes")
+    geometry = request.get("geometry", "none")
+    steps = request.get("steps", True)
+
+    if not validate_coordinates(start_lat, start_lon) or not validate_coordinates(end_lat, end_lon):
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+    _validate_modes(modes)
+    _validate_geometry(geometry)
+    _validate_steps(steps)
+
+    directions_by_mode = await transit_service.compare_modes(
+        start_lat, start_lon, end_lat, end_lon, modes=modes, geometry=geometry, steps=steps
+    )
+    return TransitComparisonResponse(options={
+        mode: _build_transit_response(directions, mode, passengers)
+        for mode, directions in directions_by_mode.items()
+    })
+
+def _validate_modes(modes):
+    if modes is None:
+        return
+    if not isinstance(modes, list) or not modes or not all(
+        isinstance(mode, str) and mode in PROFILE_BY_MODE for mode in modes
+    ):
+        raise HTTPException(status_code=400, detail=f"modes must be a non-empty list of {list(PROFILE_BY_MODE)}")
+
+def _validate_geometry(geometry: str):
+    if geometry not in ("none", "simplified", "full"):
+        raise HTTPException(status_code=400, detail="geometry must be 'none', 'simplified' or 'full'")
+
+def _validate_steps(steps):
+    if not isinstance(steps, bool):
+        raise HTTPException(status_code=400, detail="steps must be true or false")
+
+def _build_transit_response(directions: dict, mode: str, passengers: int) -> TransitResponse:
+    """Convert service directions into a TransitResponse with carbon savings."""
     total_distance = directions.get("total_distance", 0.0)
     total_duration = directions.get("total_duration", 0)
     routes_data = directions.get("routes", [])
@@ -270,7 +479,8 @@ async def get_transit_directions(request: dict):
             mode=r.get("mode"),
             duration=r.get("duration"),
             distance=r.get("distance"),
-            instructions=r.get("instructions")
+            instructions=r.get("instructions"),
+            geometry=r.get("geometry")
         )
         for r in routes_data
     ]
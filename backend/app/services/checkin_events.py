@@ -0,0 +1,127 @@
+"""
+Per-zone pub/sub for live check-in updates.
+
+Each new check-in is serialized once and fanned out on the event loop to the
+zone's subscribers (SSE or WebSocket connections). Every subscriber has a
+bounded queue; a consumer that falls behind has its backlog dropped and gets
+a single "resync" event telling it to re-fetch the feed instead of letting
+the queue grow without bound.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set
+
+from app.config import CHECKIN_STREAM_QUEUE_SIZE
+
+logger = logging.getLogger("checkin_events")
+
+
+class CheckinEvent:
+    """An event serialized once, in both SSE and WebSocket form."""
+
+    __slots__ = ("type", "json", "sse")
+
+    def __init__(self, event_type: str, data: Dict):
+        self.type = event_type
+        payload = json.dumps(data, separators=(",", ":"))
+        self.json = f'{{"type":"{event_type}","data":{payload}}}'
+        self.sse = f"event: {event_type}\ndata: {payload}\n\n".encode()
+
+
+RESYNC = CheckinEvent("resync", {})
+
+
+class Subscription:
+    """One consumer's bounded queue of events for a zone."""
+
+    def __init__(self, zone: str, maxsize: int):
+        self.zone = zone
+        self.queue: "asyncio.Queue[CheckinEvent]" = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def offer(self, event: CheckinEvent):
+        """Queue an event, or swap the backlog for a resync if the consumer is behind."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[CheckinEvent]:
+        """Next event, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class CheckinBroadcaster:
+    """Fans check-in events out to the subscribers of each zone."""
+
+    def __init__(self, queue_size: int = CHECKIN_STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, zone: str) -> Subscription:
+        """Start receiving a zone's events (call from the event loop)."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(zone, self.queue_size)
+        self._subscribers.setdefault(zone, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.zone)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.zone]
+        if subscription.dropped:
+            logger.info(
+                "Subscriber to %s dropped %d events while lagging",
+                subscription.zone, subscription.dropped
+            )
+
+    def publish_checkin(self, checkin: Dict):
+        """
+        Push a new check-in and its leaderboard delta to the zone's subscribers.
+        Safe to call from any thread; costs nothing when nobody is listening.
+        """
+        zone = checkin["zone_name"]
+        if not self._subscribers.get(zone) or self._loop is None:
+            return
+        events = (
+            CheckinEvent("checkin", checkin),
+            CheckinEvent("leaderboard", {
+                "poi_id": checkin["poi_id"],
+                "poi_name": checkin["poi_name"],
+                "lat": checkin["poi_lat"],
+                "lon": checkin["poi_lon"],
+                "amenity_type": checkin["amenity_type"],
+                "delta": 1
+            }),
+        )
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, zone, events)
+        except RuntimeError:
+            # Event loop already closed (server shutting down)
+            pass
+
+    def subscriber_count(self, zone: Optional[str] = None) -> int:
+        if zone is not None:
+            return len(self._subscribers.get(zone, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _fan_out(self, zone: str, events):
+        for subscription in tuple(self._subscribers.get(zone, ())):
+            for event in events:
+                subscription.offer(event)
+
+
+# Shared by the check-in store and the streaming routes
+broadcaster = CheckinBroadcaster()
@@ -0,0 +1,148 @@
+"""
+Bulk check-in import from NDJSON (optionally gzip-compressed) request bodies.
+
+The body is decompressed and split into lines as it streams in. Lines are
+handled in chunks on a worker thread: parsed, validated as one batch, given a
+zone by point-in-polygon, and written with a single store call per chunk.
+Imported check-ins are not pushed to live subscribers, and history older than
+a zone's feed does not enter it.
+"""
+
+import json
+import zlib
+from typing import AsyncIterator, Dict, List, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import BULK_CHUNK_SIZE, BULK_MAX_REPORTED_ERRORS
+from app.models.schemas import CheckInImport
+from app.services.checkin_store import import_checkins
+from app.utils.zone_utils import assign_zones
+
+_batch_adapter = TypeAdapter(List[CheckInImport])
+
+
+class IngestResult:
+    """Running totals for one import."""
+
+    def __init__(self, max_errors: int = BULK_MAX_REPORTED_ERRORS):
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: List[Dict] = []
+        self._max_errors = max_errors
+
+    def reject(self, line: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < self._max_errors:
+            self.errors.append({"line": line, "error": error})
+
+    def to_dict(self) -> Dict:
+        return {"accepted": self.accepted, "rejected": self.rejected, "errors": self.errors}
+
+
+async def ingest_ndjson(body: AsyncIterator[bytes], gzipped: bool = False,
+                        chunk_size: int = BULK_CHUNK_SIZE) -> Dict:
+    """
+    Import check-ins from a streamed NDJSON body.
+
+    Args:
+        body: Raw request body chunks
+        gzipped: Whether the body is gzip-compressed
+        chunk_size: Lines validated and written together
+
+    Returns:
+        Dict with accepted / rejected counts and the first line errors
+    """
+    result = IngestResult()
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    pending = b""
+    lines: List[Tuple[int, bytes]] = []
+    line_number = 0
+
+    async for data in body:
+        if decompressor:
+            try:
+                data = decompressor.decompress(data)
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip body: {e}")
+        parts = (pending + data).split(b"\n")
+        pending = parts.pop()
+        for part in parts:
+            line_number += 1
+            lines.append((line_number, part))
+        if len(lines) >= chunk_size:
+            await run_in_threadpool(_process_chunk, lines, result)
+            lines = []
+
+    if decompressor:
+        pending += decompressor.flush()
+    if pending:
+        line_number += 1
+        lines.append((line_number, pending))
+    if lines:
+        await run_in_threadpool(_process_chunk, lines, result)
+    return result.to_dict()
+
+
+def _process_chunk(lines: List[Tuple[int, bytes]], result: IngestResult):
+    """Parse, validate, zone and store one chunk of lines."""
+    numbers, raw = [], []
+    for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            raw.append(json.loads(line))
+            numbers.append(number)
+        except ValueError as e:
+            result.reject(number, f"Invalid JSON: {e}")
+
+    records = _validate(numbers, raw, result)
+    if not records:
+        return
+
+    zones = assign_zones([(record.poi_lat, record.poi_lon) for _, record in records])
+    batch = []
+    for (number, record), zone in zip(records, zones):
+        if zone is None:
+            result.reject(number, "Coordinates are outside every zone")
+            continue
+        poi_data = {
+            "poi_name": record.poi_name,
+            "poi_id": record.poi_id,
+            "lat": record.poi_lat,
+            "lon": record.poi_lon,
+            "zone_name": zone,
+            "amenity_type": record.amenity_type,
+            "timestamp": _local_iso(record.timestamp) if record.timestamp else None
+        }
+        batch.append((record.user_name, poi_data, record.caption))
+
+    if batch:
+        import_checkins(batch)
+        result.accepted += len(batch)
+
+
+def _validate(numbers: List[int], raw: List, result: IngestResult) -> List[Tuple[int, CheckInImport]]:
+    """Validate the chunk in one call; only re-check line by line if it has errors."""
+    try:
+        return list(zip(numbers, _batch_adapter.validate_python(raw)))
+    except ValidationError:
+        pass
+    records = []
+    for number, item in zip(numbers, raw):
+        try:
+            records.append((number, CheckInImport.model_validate(item)))
+        except ValidationError as e:
+            result.reject(number, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'record'}: {err['msg']}"
+                for err in e.errors()
+            ))
+    return records
+
+
+def _local_iso(timestamp) -> str:
+    # Stored timestamps are naive local time, like datetime.now().isoformat()
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp.isoformat()
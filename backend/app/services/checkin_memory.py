@@ -0,0 +1,270 @@
+"""
+In-memory check-in store.
+Keeps a bounded window of recent check-ins per zone; resets on server restart.
+
+Sync route handlers run on FastAPI's threadpool, so the store is sharded by
+zone: writes take only their zone's lock, and reads never lock. A zone's feed
+is an immutable linked list whose head is swapped in one assignment, and the
+leaderboard is read through a snapshot stamped with the zone's write version.
+"""
+
+import itertools
+import threading
+import uuid
+from collections import Counter, deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.leaderboard import Leaderboard
+
+
+class CheckinRecord:
+    """Compact check-in record (no per-instance __dict__)."""
+
+    __slots__ = (
+        "id", "user_name", "poi_name", "poi_id", "poi_lat", "poi_lon",
+        "zone_name", "caption", "timestamp", "amenity_type"
+    )
+
+    def __init__(self, checkin_id: int, fields: Dict):
+        self.id = checkin_id
+        self.user_name = fields["user_name"]
+        self.poi_name = fields["poi_name"]
+        self.poi_id = fields["poi_id"]
+        self.poi_lat = fields["poi_lat"]
+        self.poi_lon = fields["poi_lon"]
+        self.zone_name = fields["zone_name"]
+        self.caption = fields["caption"]
+        self.timestamp = fields["timestamp"]
+        self.amenity_type = fields["amenity_type"]
+
+    def to_dict(self) -> Dict:
+        checkin_id = str(self.id)
+        return {
+            "id": checkin_id,
+            "user_name": self.user_name,
+            "poi_name": self.poi_name,
+            "poi_id": self.poi_id,
+            "poi_lat": self.poi_lat,
+            "poi_lon": self.poi_lon,
+            "zone_name": self.zone_name,
+            "photo_url": f"https://picsum.photos/400/300?random={checkin_id}",
+            "caption": self.caption,
+            "timestamp": self.timestamp,
+            "amenity_type": self.amenity_type
+        }
+
+
+class _FeedNode:
+    """Immutable link in a zone's newest-first check-in feed."""
+
+    __slots__ = ("record", "next", "length")
+
+    def __init__(self, record: CheckinRecord, next_node: Optional["_FeedNode"]):
+        self.record = record
+        self.next = next_node
+        self.length = 1 + (next_node.length if next_node else 0)
+
+
+class _ZoneShard:
+    """One zone's check-ins, guarded by its own write lock."""
+
+    __slots__ = ("lock", "head", "leaderboard", "version", "top_snapshot")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.head: Optional[_FeedNode] = None
+        self.leaderboard = Leaderboard()
+        self.version = 0
+        # (version, complete, venues) published by the last top-locations read
+        self.top_snapshot: Tuple[int, bool, List[Dict]] = (-1, False, [])
+
+
+class MemoryCheckinStore:
+    """Check-in store kept in process memory; O(1) writes, bounded per zone."""
+
+    def __init__(self, zone_capacity: int = 1000):
+        self.zone_capacity = zone_capacity
+        self._ids = itertools.count(1)  # next() is atomic in CPython
+        self._shards: Dict[str, _ZoneShard] = {}
+        self._shards_lock = threading.Lock()
+        # Changes on every restart, so versions from a previous run never match
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def get_zone_checkins(self, zone: str, limit: int = 20,
+                          since_id: Optional[int] = None, before_id: Optional[int] = None) -> List[Dict]:
+        """
+        Get recent check-ins for a zone, newest first.
+
+        Args:
+            since_id: Only check-ins with a greater id (newer). If more than
+                ``limit`` match, the oldest of them are returned so the next
+                poll from the newest id continues without a gap.
+            before_id: Only check-ins with a smaller id (older history page)
+        """
+        shard = self._shards.get(zone)
+        node = shard.head if shard else None
+        # With since_id, walk down to the cursor and keep the last (oldest) matches
+        records = deque(maxlen=limit) if since_id is not None else []
+        # Walk at most zone_capacity links; older ones are awaiting trimming
+        for _ in range(self.zone_capacity):
+            if node is None or (since_id is None and len(records) >= limit):
+                break
+            record = node.record
+            if since_id is not None and record.id <= since_id:
+                break
+            if before_id is None or record.id < before_id:
+                records.append(record)
+            node = node.next
+        return [record.to_dict() for record in records]
+
+    def recent_checkins(self, since: str) -> List[Dict]:
+        """Every retained check-in with a timestamp at or after ``since`` (ISO), oldest first ("" for all)."""
+        checkins = [record.to_dict() for record in self._retained() if record.timestamp >= since]
+        checkins.sort(key=lambda c: c["timestamp"])
+        return checkins
+
+    def venue_counts(self) -> List[Tuple[float, float, int]]:
+        """(lat, lon, count) for every retained check-in location."""
+        counts = Counter((record.poi_lat, record.poi_lon) for record in self._retained())
+        return [(lat, lon, count) for (lat, lon), count in counts.items()]
+
+    def latest_per_venue(self, limit: int) -> List[Dict]:
+        """The ``limit`` newest retained check-ins at each venue, oldest first."""
+        by_venue: Dict[Tuple[str, str], List[CheckinRecord]] = {}
+        for record in self._retained():
+            by_venue.setdefault((record.zone_name, record.poi_id), []).append(record)
+        checkins = []
+        for records in by_venue.values():
+            records.sort(key=lambda r: r.timestamp)
+            checkins.extend(record.to_dict() for record in records[-limit:])
+        checkins.sort(key=lambda c: c["timestamp"])
+        return checkins
+
+    def _retained(self) -> Iterator[CheckinRecord]:
+        """Every zone's feed, newest first per zone (at most zone_capacity each)."""
+        for shard in list(self._shards.values()):
+            node = shard.head
+            for _ in range(self.zone_capacity):
+                if node is None:
+                    break
+                yield node.record
+                node = node.next
+
+    def zone_version(self, zone: str) -> int:
+        """Counter bumped by every write to the zone."""
+        shard = self._shards.get(zone)
+        return shard.version if shard else 0
+
+    def get_top_locations(self, zone: str, limit: int = 10) -> List[Dict]:
+        """Get a zone's venues with the most check-ins."""
+        shard = self._shards.get(zone)
+        if shard is None or limit <= 0:
+            return []
+        version, complete, venues = shard.top_snapshot
+        if version != shard.version or (len(venues) < limit and not complete):
+            with shard.lock:
+                venues = shard.leaderboard.top(limit)
+                shard.top_snapshot = (shard.version, len(venues) < limit, venues)
+        return [dict(venue) for venue in venues[:limit]]
+
+    def add_checkins(self, checkins: Iterable[Dict]) -> List[Dict]:
+        """
+        Add a batch of check-ins.
+
+        Args:
+            checkins: Check-in dicts without "id" / "photo_url"
+
+        Returns:
+            The stored check-ins with id and photo_url filled in
+        """
+        return self._add(checkins, history=False)
+
+    def import_checkins(self, checkins: Iterable[Dict]) -> List[Dict]:
+        """
+        Add imported check-ins, which may be historical.
+
+        A check-in older than its zone's newest feed entry still counts
+        towards top locations but is kept out of the feed, so history never
+        displaces recent check-ins or shows up as new to since_id pollers.
+
+        Returns:
+            The stored check-ins with id and photo_url filled in
+        """
+        return self._add(checkins, history=True)
+
+    def _add(self, checkins: Iterable[Dict], history: bool) -> List[Dict]:
+        stored = []
+        for fields in checkins:
+            shard = self._shard(fields["zone_name"])
+            with shard.lock:
+                # Ids are taken under the lock so each zone's feed stays in id order
+                record = CheckinRecord(next(self._ids), fields)
+                if not history or shard.head is None or record.timestamp >= shard.head.record.timestamp:
+                    self._push(shard, record)
+                shard.leaderboard.increment({
+                    "poi_name": record.poi_name,
+                    "poi_id": record.poi_id,
+                    "lat": record.poi_lat,
+                    "lon": record.poi_lon,
+                    "amenity_type": record.amenity_type
+                })
+                shard.version += 1
+            stored.append(record.to_dict())
+        return stored
+
+    def seed(self, checkins: List[Dict], top_locations: Dict[str, List[Dict]]) -> bool:
+        """
+        Load initial data if the store is still empty.
+
+        Args:
+            checkins: Check-ins without "id" / "photo_url", oldest first
+            top_locations: zone -> venues with their starting check-in counts
+
+        Returns:
+            True if the data was loaded
+        """
+        with self._shards_lock:
+            if self._shards:
+                return False
+            for zone in set(top_locations) | {c["zone_name"] for c in checkins}:
+                self._shards[zone] = _ZoneShard()
+        for fields in checkins:
+            shard = self._shards[fields["zone_name"]]
+            with shard.lock:
+                record = CheckinRecord(next(self._ids), fields)
+                self._push(shard, record)
+                shard.version += 1
+        for zone, locations in top_locations.items():
+            shard = self._shards[zone]
+            with shard.lock:
+                shard.leaderboard.load(locations)
+                shard.version += 1
+        return True
+
+    def close(self):
+        pass
+
+    def _shard(self, zone: str) -> _ZoneShard:
+        shard = self._shards.get(zone)
+        if shard is None:
+            with self._shards_lock:
+                shard = self._shards.get(zone)
+                if shard is None:
+                    shard = self._shards[zone] = _ZoneShard()
+        return shard
+
+    def _push(self, shard: _ZoneShard, record: CheckinRecord):
+        """Prepend to the feed (caller holds the shard lock)."""
+        head = _FeedNode(record, shard.head)
+        if head.length >= 2 * self.zone_capacity:
+            # Rebuild the newest zone_capacity links so the old tail can be
+            # freed; readers holding the previous head are unaffected
+            records = []
+            node = head
+            while len(records) < self.zone_capacity:
+                records.append(node.record)
+                node = node.next
+            head = None
+            for kept in reversed(records):
+                head = _FeedNode(kept, head)
+        shard.head = head
@@ -0,0 +1,109 @@
+"""
+Grid-hash spatial index of recent check-ins for "what's happening near me".
+
+The map is cut into cells of NEARBY_CELL_DEG degrees. Each cell keeps its
+most recent NEARBY_CELL_CAPACITY check-ins in timestamp order, so a radius
+query only looks at the handful of cells overlapping the circle. Queries copy
+those cells under the lock and measure distances after releasing it.
+"""
+
+import math
+import threading
+from bisect import bisect_right
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Tuple
+
+from app.config import NEARBY_CELL_CAPACITY, NEARBY_CELL_DEG
+
+# Metres per degree of latitude (and of longitude at the equator)
+_M_PER_DEG = 111_320.0
+
+SORT_ORDERS = ("distance", "recent")
+
+
+class NearbyCheckinIndex:
+    """Recent check-ins bucketed by grid cell."""
+
+    def __init__(self, cell_deg: float = NEARBY_CELL_DEG, cell_capacity: int = NEARBY_CELL_CAPACITY):
+        self.cell_deg = cell_deg
+        self.cell_capacity = cell_capacity
+        self._cells: Dict[Tuple[int, int], Deque[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def add_many(self, checkins: Iterable[Dict]):
+        """Index stored check-ins (dicts as returned by the store)."""
+        with self._lock:
+            for checkin in checkins:
+                key = self._cell(checkin["poi_lat"], checkin["poi_lon"])
+                cell = self._cells.get(key)
+                if cell is None:
+                    cell = self._cells[key] = deque(maxlen=self.cell_capacity)
+                self._insert(cell, checkin)
+
+    @staticmethod
+    def _insert(cell: Deque[Dict], checkin: Dict):
+        """Add to a cell kept oldest first by timestamp, dropping the oldest when full."""
+        timestamp = checkin["timestamp"]
+        if not cell or cell[-1]["timestamp"] <= timestamp:
+            cell.append(checkin)  # the usual case: newer than everything held
+            return
+        # Imported history: keep it only if it is among the cell's newest
+        if len(cell) == cell.maxlen:
+            if timestamp <= cell[0]["timestamp"]:
+                return
+            cell.popleft()
+        cell.insert(bisect_right(cell, timestamp, key=lambda c: c["timestamp"]), checkin)
+
+    def near(self, lat: float, lon: float, radius_m: float, limit: int = 20,
+             sort: str = "distance") -> List[Dict]:
+        """
+        Check-ins within ``radius_m`` metres of a point.
+
+        Args:
+            sort: "distance" (closest first) or "recent" (newest first)
+
+        Returns:
+            Copies of the check-ins with an added "distance_m"
+        """
+        # Equirectangular distance: accurate to well under 1% at these radii
+        cos_lat = math.cos(math.radians(lat))
+        lat_span = radius_m / _M_PER_DEG
+        lon_span = radius_m / (_M_PER_DEG * max(cos_lat, 1e-6))
+        min_x, min_y = self._cell(lat - lat_span, lon - lon_span)
+        max_x, max_y = self._cell(lat + lat_span, lon + lon_span)
+        radius_sq = radius_m * radius_m
+
+        # Copying the cells is a C-level list copy; distances are measured
+        # after the lock is released so writers are not held up
+        cells = []
+        with self._lock:
+            for x in range(min_x, max_x + 1):
+                for y in range(min_y, max_y + 1):
+                    cell = self._cells.get((x, y))
+                    if cell:
+                        cells.append(list(cell))
+
+        matches = []
+        for cell in cells:
+            for checkin in cell:
+                dy = (checkin["poi_lat"] - lat) * _M_PER_DEG
+                dx = (checkin["poi_lon"] - lon) * _M_PER_DEG * cos_lat
+                dist_sq = dx * dx + dy * dy
+                if dist_sq <= radius_sq:
+                    matches.append((dist_sq, checkin))
+
+        if sort == "recent":
+            matches.sort(key=lambda m: m[1]["timestamp"], reverse=True)
+        else:
+            matches.sort(key=lambda m: m[0])
+        return [
+            {**checkin, "distance_m": round(math.sqrt(dist_sq), 1)}
+            for dist_sq, checkin in matches[:limit]
+        ]
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lon / self.cell_deg)), int(math.floor(lat / self.cell_deg))
+
+
+# Shared by the check-in store and routes
+nearby_index = NearbyCheckinIndex()
@@ -0,0 +1,320 @@
+"""
+SQLite-backed persistent store for check-ins and top locations.
+Survives restarts. The database runs in WAL mode so reads proceed during
+writes; trending, heatmap and nearby aggregates and live streams stay in
+process memory, so it backs a single worker.
+"""
+
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkins (
+    id INTEGER PRIMARY KEY,
+    user_name TEXT NOT NULL,
+    poi_name TEXT NOT NULL,
+    poi_id TEXT NOT NULL,
+    poi_lat REAL NOT NULL,
+    poi_lon REAL NOT NULL,
+    zone_name TEXT NOT NULL,
+    caption TEXT,
+    timestamp TEXT NOT NULL,
+    amenity_type TEXT NOT NULL,
+    -- 0 for imported history kept out of the zone feed
+    in_feed INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_checkins_zone_feed ON checkins (zone_name, in_feed, id);
+-- Startup warming of trending, the nearby index and the heatmap reads these
+-- indexes in order instead of scanning and sorting the table
+CREATE INDEX IF NOT EXISTS idx_checkins_time ON checkins (timestamp);
+CREATE INDEX IF NOT EXISTS idx_checkins_zone_poi_recent ON checkins (zone_name, poi_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_checkins_location ON checkins (poi_lat, poi_lon);
+
+CREATE TABLE IF NOT EXISTS top_locations (
+    zone_name TEXT NOT NULL,
+    poi_id TEXT NOT NULL,
+    poi_name TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    amenity_type TEXT NOT NULL,
+    checkin_count INTEGER NOT NULL,
+    PRIMARY KEY (zone_name, poi_id)
+);
+CREATE INDEX IF NOT EXISTS idx_top_zone_count ON top_locations (zone_name, checkin_count);
+
+-- Bumped by every write to a zone; clients use it for conditional GETs
+CREATE TABLE IF NOT EXISTS zone_versions (
+    zone_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache reuses the compiled (prepared) form on every call
+SELECT_ZONE_CHECKINS = """
+SELECT id, user_name, poi_name, poi_id, poi_lat, poi_lon, zone_name, caption, timestamp, amenity_type
+FROM checkins WHERE zone_name = ? AND in_feed = 1 AND id > ? AND id < ?
+ORDER BY id DESC LIMIT ?
+"""
+
+# Polling with since_id: the oldest rows after the cursor, so none are skipped
+SELECT_ZONE_CHECKINS_AFTER = """
+SELECT id, user_name, poi_name, poi_id, poi_lat, poi_lon, zone_name, caption, timestamp, amenity_type
+FROM checkins WHERE zone_name = ? AND in_feed = 1 AND id > ? AND id < ?
+ORDER BY id ASC LIMIT ?
+"""
+
+SELECT_TOP_LOCATIONS = """
+SELECT poi_name, poi_id, lat, lon, amenity_type, checkin_count
+FROM top_locations WHERE zone_name = ?
+ORDER BY checkin_count DESC LIMIT ?
+"""
+
+INSERT_CHECKIN = """
+INSERT INTO checkins (user_name, poi_name, poi_id, poi_lat, poi_lon, zone_name, caption, timestamp, amenity_type)
+VALUES (:user_name, :poi_name, :poi_id, :poi_lat, :poi_lon, :zone_name, :caption, :timestamp, :amenity_type)
+"""
+
+INSERT_IMPORTED_CHECKIN = """
+INSERT INTO checkins (user_name, poi_name, poi_id, poi_lat, poi_lon, zone_name, caption, timestamp, amenity_type, in_feed)
+VALUES (:user_name, :poi_name, :poi_id, :poi_lat, :poi_lon, :zone_name, :caption, :timestamp, :amenity_type, :in_feed)
+"""
+
+SELECT_NEWEST_FEED_TIMESTAMP = """
+SELECT timestamp FROM checkins WHERE zone_name = ? AND in_feed = 1 ORDER BY id DESC LIMIT 1
+"""
+
+UPSERT_TOP_LOCATION = """
+INSERT INTO top_locations (zone_name, poi_id, poi_name, lat, lon, amenity_type, checkin_count)
+VALUES (:zone_name, :poi_id, :poi_name, :lat, :lon, :amenity_type, :checkin_count)
+ON CONFLICT (zone_name, poi_id) DO UPDATE SET checkin_count = checkin_count + excluded.checkin_count
+"""
+
+BUMP_ZONE_VERSION = """
+INSERT INTO zone_versions (zone_name, version) VALUES (?, 1)
+ON CONFLICT (zone_name) DO UPDATE SET version = version + 1
+"""
+
+SELECT_RECENT_CHECKINS = """
+SELECT id, user_name, poi_name, poi_id, poi_lat, poi_lon, zone_name, caption, timestamp, amenity_type
+FROM checkins WHERE timestamp >= ? ORDER BY timestamp
+"""
+
+SELECT_VENUE_COUNTS = "SELECT poi_lat, poi_lon, COUNT(*) FROM checkins GROUP BY poi_lat, poi_lon"
+
+# Ranked in idx_checkins_zone_poi_recent order (no sort), then only the kept rows are read
+SELECT_LATEST_PER_VENUE = """
+SELECT id, user_name, poi_name, poi_id, poi_lat, poi_lon, zone_name, caption, timestamp, amenity_type
+FROM checkins WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (PARTITION BY zone_name, poi_id ORDER BY timestamp DESC) AS venue_rank
+        FROM checkins
+    ) WHERE venue_rank <= ?
+) ORDER BY timestamp
+"""
+
+SELECT_ZONE_VERSION = "SELECT version FROM zone_versions WHERE zone_name = ?"
+
+# SQLite's largest INTEGER, the open upper bound for id ranges
+_MAX_ID = 2 ** 63 - 1
+
+
+class SQLiteCheckinStore:
+    """Check-in store persisted in a SQLite database in WAL mode."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (uuid.uuid4().hex[:8],))
+        # Identifies this database, so versions from a recreated one never match
+        self.epoch = conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+
+    def get_zone_checkins(self, zone: str, limit: int = 20,
+                          since_id: Optional[int] = None, before_id: Optional[int] = None) -> List[Dict]:
+        """
+        Get recent check-ins for a zone, newest first.
+
+        Args:
+            since_id: Only check-ins with a greater id (newer). If more than
+                ``limit`` match, the oldest of them are returned so the next
+                poll from the newest id continues without a gap.
+            before_id: Only check-ins with a smaller id (older history page)
+        """
+        params = (
+            zone,
+            since_id if since_id is not None else -1,
+            before_id if before_id is not None else _MAX_ID,
+            limit
+        )
+        if since_id is not None:
+            rows = self._conn().execute(SELECT_ZONE_CHECKINS_AFTER, params).fetchall()
+            rows.reverse()
+        else:
+            rows = self._conn().execute(SELECT_ZONE_CHECKINS, params).fetchall()
+        return [_row_to_checkin(row) for row in rows]
+
+    def recent_checkins(self, since: str) -> Iterator[Dict]:
+        """Every check-in with a timestamp at or after ``since`` (ISO), oldest first ("" for all)."""
+        # Rows are streamed from the cursor rather than fetched all at once
+        for row in self._conn().execute(SELECT_RECENT_CHECKINS, (since,)):
+            yield _row_to_checkin(row)
+
+    def venue_counts(self) -> Iterator[Tuple[float, float, int]]:
+        """(lat, lon, count) for every check-in location."""
+        return iter(self._conn().execute(SELECT_VENUE_COUNTS))
+
+    def latest_per_venue(self, limit: int) -> Iterator[Dict]:
+        """The ``limit`` newest check-ins at each venue, oldest first."""
+        for row in self._conn().execute(SELECT_LATEST_PER_VENUE, (limit,)):
+            yield _row_to_checkin(row)
+
+    def zone_version(self, zone: str) -> int:
+        """Counter bumped by every write to the zone."""
+        row = self._conn().execute(SELECT_ZONE_VERSION, (zone,)).fetchone()
+        return row[0] if row else 0
+
+    def get_top_locations(self, zone: str, limit: int = 10) -> List[Dict]:
+        """Get a zone's venues with the most check-ins."""
+        rows = self._conn().execute(SELECT_TOP_LOCATIONS, (zone, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def add_checkins(self, checkins: Iterable[Dict]) -> List[Dict]:
+        """
+        Insert a batch of check-ins in a single transaction.
+
+        Args:
+            checkins: Check-in dicts without "id" / "photo_url"
+
+        Returns:
+            The stored check-ins with id and photo_url filled in
+        """
+        return self._insert(checkins, history=False)
+
+    def import_checkins(self, checkins: Iterable[Dict]) -> List[Dict]:
+        """
+        Insert imported check-ins, which may be historical, in one transaction.
+
+        A check-in older than its zone's newest feed entry still counts
+        towards top locations but is kept out of the feed (in_feed = 0), so
+        history never displaces recent check-ins or shows up as new to
+        since_id pollers.
+
+        Returns:
+            The stored check-ins with id and photo_url filled in
+        """
+        return self._insert(checkins, history=True)
+
+    def _insert(self, checkins: Iterable[Dict], history: bool) -> List[Dict]:
+        stored = []
+        counts: Dict[tuple, Dict] = {}
+        newest: Dict[str, str] = {}  # zone -> newest feed timestamp, when importing
+        with self._transaction() as conn:
+            cur = conn.cursor()
+            for checkin in checkins:
+                if history:
+                    zone = checkin["zone_name"]
+                    if zone not in newest:
+                        row = cur.execute(SELECT_NEWEST_FEED_TIMESTAMP, (zone,)).fetchone()
+                        newest[zone] = row[0] if row else ""
+                    in_feed = checkin["timestamp"] >= newest[zone]
+                    if in_feed:
+                        newest[zone] = checkin["timestamp"]
+                    cur.execute(INSERT_IMPORTED_CHECKIN, {**checkin, "in_feed": int(in_feed)})
+                else:
+                    cur.execute(INSERT_CHECKIN, checkin)
+                checkin_id = str(cur.lastrowid)
+                stored.append({
+                    **checkin,
+                    "id": checkin_id,
+                    "photo_url": _photo_url(checkin_id)
+                })
+                key = (checkin["zone_name"], checkin["poi_id"])
+                if key not in counts:
+                    counts[key] = {
+                        "zone_name": checkin["zone_name"],
+                        "poi_id": checkin["poi_id"],
+                        "poi_name": checkin["poi_name"],
+                        "lat": checkin["poi_lat"],
+                        "lon": checkin["poi_lon"],
+                        "amenity_type": checkin["amenity_type"],
+                        "checkin_count": 0
+                    }
+                counts[key]["checkin_count"] += 1
+            cur.executemany(UPSERT_TOP_LOCATION, counts.values())
+            cur.executemany(BUMP_ZONE_VERSION, {(zone,) for zone, _ in counts})
+        return stored
+
+    def seed(self, checkins: List[Dict], top_locations: Dict[str, List[Dict]]) -> bool:
+        """
+        Load initial data if the database is still empty.
+
+        Runs in one write-locked transaction so concurrently starting workers
+        seed only once.
+
+        Returns:
+            True if the data was loaded
+        """
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM checkins LIMIT 1").fetchone() is not None:
+                return False
+            conn.executemany(INSERT_CHECKIN, checkins)
+            conn.executemany(UPSERT_TOP_LOCATION, [
+                {**loc, "zone_name": zone}
+                for zone, locations in top_locations.items()
+                for loc in locations
+            ])
+            conn.executemany(BUMP_ZONE_VERSION, {(c["zone_name"],) for c in checkins} | {(z,) for z in top_locations})
+            return True
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the database write lock up front."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; FastAPI runs sync handlers on a threadpool
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def _photo_url(checkin_id: str) -> str:
+    return f"https://picsum.photos/400/300?random={checkin_id}"
+
+
+def _row_to_checkin(row: sqlite3.Row) -> Dict:
+    checkin = dict(row)
+    checkin["id"] = str(checkin["id"])
+    checkin["photo_url"] = _photo_url(checkin["id"])
+    return checkin
@@ -1,75 +1,18 @@
 """
-In-memory mock data store for check-ins and top locations.
-For hackathon demo only - data resets on server restart.
+Data store for check-ins and top locations.
+Defaults to in-memory mock data that resets on server restart; set
+CHECKIN_STORE=sqlite to persist to a SQLite database instead.
 """
 from datetime import datetime, timedelta
 import random
-
-# LA neighborhoods and their popular venues (real locations)
-LA_VENUES = {
-    "Long Beach Zone": [
-        {"name": "Aquarium of the Pacific", "lat": 33.7621, "lon": -118.1975, "type": "attraction"},
-        {"name": "The Queen Mary", "lat": 33.7526, "lon": -118.1906, "type": "attraction"},
-        {"name": "Long Beach Museum of Art", "lat": 33.7642, "lon": -118.1790, "type": "museum"},
-        {"name": "Shoreline Village", "lat": 33.7622, "lon": -118.1900, "type": "attraction"},
-        {"name": "El Dorado Nature Center", "lat": 33.8293, "lon": -118.0857, "type": "park"},
-        {"name": "The Pike Outlets", "lat": 33.7633, "lon": -118.1926, "type": "shopping"},
-        {"name": "Parkers' Lighthouse", "lat": 33.7617, "lon": -118.1899, "type": "restaurant"}
-    ],
-    "Pasadena Zone": [
-        {"name": "Rose Bowl Stadium", "lat": 34.1613, "lon": -118.1677, "type": "stadium"},
-        {"name": "Norton Simon Museum", "lat": 34.1463, "lon": -118.1587, "type": "museum"},
-        {"name": "The Huntington Library", "lat": 34.1285, "lon": -118.1140, "type": "attraction"},
-        {"name": "Old Pasadena", "lat": 34.1461, "lon": -118.1514, "type": "attraction"},
-        {"name": "Eaton Canyon Nature Center", "lat": 34.1783, "lon": -118.0952, "type": "park"},
-        {"name": "Gamble House", "lat": 34.1516, "lon": -118.1588, "type": "attraction"}
-    ],
-    "Universal City Zone": [
-        {"name": "Universal Studios Hollywood", "lat": 34.1381, "lon": -118.3534, "type": "theme_park"},
-        {"name": "Universal CityWalk", "lat": 34.1367, "lon": -118.3513, "type": "entertainment"},
-        {"name": "Studio Tour", "lat": 34.1391, "lon": -118.3533, "type": "attraction"},
-        {"name": "The Wizarding World of Harry Potter", "lat": 34.1385, "lon": -118.3521, "type": "attraction"},
-        {"name": "Universal Cinema", "lat": 34.1369, "lon": -118.3516, "type": "entertainment"}
-    ],
-    "Anaheim Zone": [
-        {"name": "Disneyland Park", "lat": 33.8121, "lon": -117.9190, "type": "theme_park"},
-        {"name": "Disney California Adventure", "lat": 33.8061, "lon": -117.9215, "type": "theme_park"},
-        {"name": "Downtown Disney", "lat": 33.8088, "lon": -117.9252, "type": "entertainment"},
-        {"name": "Anaheim Convention Center", "lat": 33.8019, "lon": -117.9228, "type": "convention_center"},
-        {"name": "Angel Stadium", "lat": 33.8003, "lon": -117.8827, "type": "stadium"},
-        {"name": "Honda Center", "lat": 33.8078, "lon": -117.8768, "type": "stadium"}
-    ],
-    "Carson Zone": [
-        {"name": "Dignity Health Sports Park", "lat": 33.8644, "lon": -118.2611, "type": "stadium"},
-        {"name": "International Printing Museum", "lat": 33.8507, "lon": -118.2820, "type": "museum"},
-        {"name": "SouthBay Pavilion", "lat": 33.8606, "lon": -118.2820, "type": "shopping"},
-        {"name": "Goodyear Blimp Base", "lat": 33.8671, "lon": -118.2567, "type": "attraction"}
-    ]
-}
-
-# Update caption templates to reference new locations
-CAPTIONS = [
-    "Best spot in LA! 🌟",
-    "Amazing vibes here ✨",
-    "Had to check this place out 👀",
-    "Finally made it! Worth the hype 🙌",
-    "Can't beat these views 📸",
-    "Hidden gem in {zone} 💎",
-    "My new favorite spot 🎯",
-    "So much history here 🏛️",
-    "The food was incredible 😋",
-    "Perfect evening out 🌅",
-    "Already planning my next visit! 🗓️",
-    "A must-visit in LA 🌴",
-    "{venue} never disappoints ⭐",
-    "Tourist mode activated 📸",
-    "Living my best LA life 🌞"
-    "Loving {zone} vibes 🌟",
-    "Perfect day at {venue} 🎡",
-    "SoCal adventures continue! 🌴",
-    "Weekend fun in {zone} 🎉",
-    "Tourist mode: activated 📸"
-]
+from app.config import CHECKIN_DB_PATH, CHECKIN_STORE, CHECKIN_ZONE_CAPACITY, MOCK_DATA_SEED
+from app.services.checkin_events import broadcaster
+from app.services.checkin_memory import MemoryCheckinStore
+from app.services.checkin_nearby import nearby_index
+from app.services.checkin_sqlite import SQLiteCheckinStore
+from app.services.heatmap import heatmap
+from app.services.trending import trending
+from app.services.venues import CAPTIONS, LA_VENUES
 
 USERS = [
     "Alex Chen", "Maria Garcia", "James Kim", "Sarah Lee", "David Patel",
@@ -77,17 +20,23 @@ USERS = [
     "Chris Wong", "Olivia Brown", "Daniel Lee", "Isabella Martinez", "Kevin Tran"
 ]
 
-# In-memory stores (reset on server restart)
+# Generated demo data, used to seed the store
 MOCK_CHECKINS = {}  # zone_name -> list of check-ins
 TOP_LOCATIONS = {}  # zone_name -> list of top venues with counts
 
+if CHECKIN_STORE == "sqlite":
+    _store = SQLiteCheckinStore(CHECKIN_DB_PATH)
+else:
+    _store = MemoryCheckinStore(CHECKIN_ZONE_CAPACITY)
+
 
-def generate_mock_checkins():
-    """Generate 20-30 check-ins per zone with realistic data."""
+def generate_mock_checkins(seed: int = None):
+    """Generate 20-30 check-ins per zone with realistic data (reproducible when seeded)."""
     global MOCK_CHECKINS, TOP_LOCATIONS
     MOCK_CHECKINS.clear()
     TOP_LOCATIONS.clear()
     
+    rng = random.Random(seed)
     now = datetime.now()
     checkin_id = 1
 
@@ -96,29 +45,29 @@ def generate_mock_checkins():
         venue_counts = {v["name"]: 0 for v in venues}
         
         # Generate 20-30 check-ins per zone
-        num_checkins = random.randint(20, 30)
+        num_checkins = rng.randint(20, 30)
         for _ in range(num_checkins):
-            venue = random.choice(venues)
+            venue = rng.choice(venues)
             venue_counts[venue["name"]] += 1
             
             # Random time in last 7 days
             time_ago = timedelta(
-                days=random.randint(0, 6),
-                hours=random.randint(0, 23),
-                minutes=random.randint(0, 59)
+                days=rng.randint(0, 6),
+                hours=rng.randint(0, 23),
+                minutes=rng.randint(0, 59)
             )
             checkin_time = now - time_ago
 
             checkin = {
                 "id": str(checkin_id),
-                "user_name": random.choice(USERS),
+                "user_name": rng.choice(USERS),
                 "poi_name": venue["name"],
                 "poi_id": f"{zone}-{venue['name'].lower().replace(' ', '-')}",
                 "poi_lat": venue["lat"],
                 "poi_lon": venue["lon"],
                 "zone_name": zone,
                 "photo_url": f"https://picsum.photos/400/300?random={checkin_id}",
-                "caption": random.choice(CAPTIONS).format(zone=zone, venue=venue["name"]),
+                "caption": rng.choice(CAPTIONS).format(zone=zone, venue=venue["name"]),
                 "timestamp": checkin_time.isoformat(),
                 "amenity_type": venue["type"]
             }
@@ -131,7 +80,7 @@ def generate_mock_checkins():
         # Generate top locations based on check-in counts
         top_venues = []
         for venue in venues:
-            base_count = random.randint(15, 75)  # Base popularity
+            base_count = rng.randint(15, 75)  # Base popularity
             bonus = venue_counts[venue["name"]] * 2  # Bonus from recent check-ins
             top_venues.append({
                 "poi_name": venue["name"],
@@ -147,61 +96,164 @@ def generate_mock_checkins():
         TOP_LOCATIONS[zone] = top_venues[:10]
 
 
-def get_zone_checkins(zone: str, limit: int = 20) -> list:
-    """Get recent check-ins for a zone."""
-    if zone not in MOCK_CHECKINS:
-        return []
-    return MOCK_CHECKINS[zone][:limit]
+def get_zone_checkins(zone: str, limit: int = 20, since_id: int = None, before_id: int = None) -> list:
+    """
+    Get recent check-ins for a zone, newest first.
+    
+    Args:
+        since_id: Only return check-ins newer than this id
+        before_id: Only return check-ins older than this id (next history page)
+    """
+    return _store.get_zone_checkins(zone, limit, since_id, before_id)
 
 
 def get_top_locations(zone: str, limit: int = 10) -> list:
     """Get top locations for a zone."""
-    if zone not in TOP_LOCATIONS:
-        return []
-    return TOP_LOCATIONS[zone][:limit]
+    return _store.get_top_locations(zone, limit)
+
+
+def get_trending_locations(zone: str, window: str = "hour", limit: int = 10) -> list:
+    """Get venues trending in a zone (see trending.TrendingTracker.top)."""
+    return trending.top(zone, window, limit)
+
+
+def get_heatmap_tile(z: int, x: int, y: int) -> dict:
+    """Get check-in density cells for a map tile."""
+    return heatmap.tile(z, x, y)
+
+
+def get_nearby_checkins(lat: float, lon: float, radius_m: float, limit: int = 20, sort: str = "distance") -> list:
+    """Get recent check-ins within radius_m metres of a point."""
+    return nearby_index.near(lat, lon, radius_m, limit, sort)
+
+
+def get_zone_version(zone: str) -> str:
+    """Opaque token that changes whenever the zone's check-ins or top locations change."""
+    return f"{_store.epoch}-{_store.zone_version(zone)}"
 
 
 def add_checkin(user_name: str, poi_data: dict, caption: str = None) -> dict:
-    """Add a new check-in to the in-memory store."""
-    global MOCK_CHECKINS, TOP_LOCATIONS
-    
-    zone = poi_data["zone_name"]
-    if zone not in MOCK_CHECKINS:
-        MOCK_CHECKINS[zone] = []
+    """Add a new check-in to the store."""
+    checkin = _store.add_checkins([_new_checkin_fields(user_name, poi_data, caption)])[0]
+    _record_aggregates([checkin])
+    broadcaster.publish_checkin(checkin)
+    return checkin
+
+
+def add_checkins(checkins: list) -> list:
+    """
+    Add a batch of check-ins, written in one transaction when persisted.
     
-    # Get next ID
-    max_id = max((int(c["id"]) for checkins in MOCK_CHECKINS.values() for c in checkins), default=0)
-    new_id = str(max_id + 1)
+    Args:
+        checkins: List of (user_name, poi_data, caption) tuples
     
-    # Create check-in with random photo
-    checkin = {
-        "id": new_id,
+    Returns:
+        List of stored check-ins
+    """
+    stored = _store.add_checkins(
+        _new_checkin_fields(user_name, poi_data, caption)
+        for user_name, poi_data, caption in checkins
+    )
+    _record_aggregates(stored)
+    for checkin in stored:
+        broadcaster.publish_checkin(checkin)
+    return stored
+
+
+def import_checkins(checkins: list) -> list:
+    """
+    Add a batch of imported check-ins (bulk ingest, migrated history).
+
+    Unlike add_checkins nothing is pushed to live subscribers, and check-ins
+    older than their zone's feed stay out of it (see the store's
+    import_checkins); top locations and the aggregates still count them.
+
+    Args:
+        checkins: List of (user_name, poi_data, caption) tuples
+
+    Returns:
+        List of stored check-ins
+    """
+    stored = _store.import_checkins(
+        _new_checkin_fields(user_name, poi_data, caption)
+        for user_name, poi_data, caption in checkins
+    )
+    _record_aggregates(stored)
+    return stored
+
+
+def load_checkins(checkins: list, record_aggregates: bool = False) -> int:
+    """
+    Write check-in records straight to the store in one transaction, for
+    offline loading. Live subscribers are skipped, and so are the aggregates
+    unless asked for; a persistent store's aggregates are rebuilt from it at
+    the next startup.
+
+    Args:
+        checkins: Check-in dicts without "id" / "photo_url"
+        record_aggregates: Also update trending, heatmap and nearby (when the
+            loaded data is used in this process)
+
+    Returns:
+        Number of check-ins written
+    """
+    stored = _store.add_checkins(checkins)
+    if record_aggregates:
+        _record_aggregates(stored)
+    return len(stored)
+
+
+def _new_checkin_fields(user_name: str, poi_data: dict, caption: str = None) -> dict:
+    """Build a check-in record (without id / photo_url) from POI data."""
+    zone = poi_data["zone_name"]
+    return {
         "user_name": user_name,
         "poi_name": poi_data["poi_name"],
         "poi_id": poi_data.get("poi_id") or f"{zone}-{poi_data['poi_name'].lower().replace(' ', '-')}",
         "poi_lat": poi_data["lat"],
         "poi_lon": poi_data["lon"],
         "zone_name": zone,
-        "photo_url": f"https://picsum.photos/400/300?random={new_id}",
         "caption": caption,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": poi_data.get("timestamp") or datetime.now().isoformat(),
         "amenity_type": poi_data.get("amenity_type", "attraction")
     }
-    
-    # Add to start of zone's list
-    MOCK_CHECKINS[zone].insert(0, checkin)
-    
-    # Update top locations
-    if zone in TOP_LOCATIONS:
-        for loc in TOP_LOCATIONS[zone]:
-            if loc["poi_name"] == poi_data["poi_name"]:
-                loc["checkin_count"] += 1
-                break
-        # Re-sort by count
-        TOP_LOCATIONS[zone].sort(key=lambda x: x["checkin_count"], reverse=True)
-    
-    return checkin
+
+
+def _seed_store():
+    """Load the generated mock data into the store if it is empty."""
+    checkins = sorted(
+        (c for zone_checkins in MOCK_CHECKINS.values() for c in zone_checkins),
+        key=lambda c: c["timestamp"]
+    )
+    _store.seed(
+        [{k: v for k, v in c.items() if k not in ("id", "photo_url")} for c in checkins],
+        TOP_LOCATIONS
+    )
+
+
+def _record_aggregates(checkins: list):
+    """Update the incrementally maintained views (trending, heatmap, nearby index)."""
+    for checkin in checkins:
+        trending.record_checkin(checkin)
+    heatmap.record_many((c["poi_lat"], c["poi_lon"]) for c in checkins)
+    nearby_index.add_many(checkins)
+
+
+def _warm_aggregates():
+    """
+    Rebuild the incrementally maintained views from the store, reading only
+    what each one keeps: per-location counts for the heatmap, the newest
+    check-ins at each location for the nearby index and the last day for
+    trending (older check-ins have left its windows and decayed away).
+    """
+    heatmap.record_counts(_store.venue_counts())
+    nearby_index.add_many(_store.latest_per_venue(nearby_index.cell_capacity))
+    since = (datetime.now() - timedelta(days=1)).isoformat()
+    for checkin in _store.recent_checkins(since):
+        trending.record_checkin(checkin)
 
 
 # Generate initial mock data
-generate_mock_checkins()
\ No newline at end of file
+generate_mock_checkins(MOCK_DATA_SEED)
+_seed_store()
+_warm_aggregates()
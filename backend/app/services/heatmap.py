@@ -0,0 +1,79 @@
+"""
+Check-in density tiles for the map heatmap layer.
+
+Every check-in is binned as it arrives into a grid of RESOLUTION x RESOLUTION
+cells inside its slippy-map tile, at every zoom up to HEATMAP_MAX_ZOOM. Tiles
+are keyed by quadkey, so serving a tile reads at most RESOLUTION^2 counters
+however many check-ins have been recorded.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+
+from app.config import HEATMAP_MAX_ZOOM
+from app.utils.geo_utils import lat_lon_to_pixel, tile_to_quadkey
+
+# Cells per tile side = 2^CELL_BITS
+CELL_BITS = 5
+RESOLUTION = 1 << CELL_BITS
+
+
+class CheckinHeatmap:
+    """Multi-resolution check-in counts, one cell grid per non-empty tile."""
+
+    def __init__(self, max_zoom: int = HEATMAP_MAX_ZOOM):
+        self.max_zoom = max_zoom
+        self._tiles: Dict[str, Dict[Tuple[int, int], int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, lat: float, lon: float):
+        """Add one check-in at a point to every zoom level."""
+        self.record_many([(lat, lon)])
+
+    def record_many(self, points: Iterable[Tuple[float, float]]):
+        """Add check-ins at many (lat, lon) points; repeated venues are binned once."""
+        self.record_counts((lat, lon, count) for (lat, lon), count in Counter(points).items())
+
+    def record_counts(self, counts: Iterable[Tuple[float, float, int]]):
+        """Add ``count`` check-ins at each (lat, lon, count) point."""
+        # Cells at the finest level; coarser levels are bit shifts of them
+        fine_cells: Counter = Counter()
+        for lat, lon, count in counts:
+            fine_cells[lat_lon_to_pixel(lat, lon, self.max_zoom + CELL_BITS)] += count
+        mask = RESOLUTION - 1
+        with self._lock:
+            for (fine_x, fine_y), count in fine_cells.items():
+                # A tile's quadkey is a prefix of its descendants' quadkeys
+                fine_quadkey = tile_to_quadkey(fine_x >> CELL_BITS, fine_y >> CELL_BITS, self.max_zoom)
+                for zoom in range(self.max_zoom + 1):
+                    shift = self.max_zoom - zoom
+                    quadkey = fine_quadkey[:zoom]
+                    cells = self._tiles.get(quadkey)
+                    if cells is None:
+                        cells = self._tiles[quadkey] = {}
+                    key = ((fine_x >> shift) & mask, (fine_y >> shift) & mask)
+                    cells[key] = cells.get(key, 0) + count
+
+    def tile(self, z: int, x: int, y: int) -> Dict:
+        """
+        Counts for one tile.
+
+        Returns:
+            Dict with resolution, max_count and cells as [column, row, count]
+            triplets (row 0 is the tile's northern edge); empty cells omitted
+        """
+        with self._lock:
+            cells = list(self._tiles.get(tile_to_quadkey(x, y, z), {}).items())
+        return {
+            "z": z,
+            "x": x,
+            "y": y,
+            "resolution": RESOLUTION,
+            "max_count": max((count for _, count in cells), default=0),
+            "cells": [[col, row, count] for (col, row), count in cells]
+        }
+
+
+# Shared by the check-in store and routes
+heatmap = CheckinHeatmap()
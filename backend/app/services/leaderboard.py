@@ -0,0 +1,90 @@
+"""
+Per-zone venue leaderboard ordered by check-in count.
+
+Venues live in one array sorted by count (descending). Each count value owns a
+contiguous block of that array, so a +1 only swaps the venue to the front of
+its block and moves the block boundary: O(1) per check-in. Reading the top k
+is a slice, O(k), however many venues the zone has.
+"""
+
+from typing import Dict, Iterable, List
+
+
+class _Entry:
+    __slots__ = ("count", "location")
+
+    def __init__(self, count: int, location: Dict):
+        self.count = count
+        self.location = location
+
+
+class Leaderboard:
+    """Check-in counts per venue, keyed by poi_id."""
+
+    def __init__(self, locations: Iterable[Dict] = ()):
+        """
+        Args:
+            locations: Starting venues with a "checkin_count" each
+        """
+        self._entries: List[_Entry] = []
+        self._pos: Dict[str, int] = {}          # poi_id -> index in _entries
+        self._block_start: Dict[int, int] = {}  # count -> first index with that count
+        self.load(locations)
+
+    def load(self, locations: Iterable[Dict]):
+        """Replace the leaderboard contents."""
+        entries = [
+            _Entry(loc["checkin_count"], {k: v for k, v in loc.items() if k != "checkin_count"})
+            for loc in locations
+        ]
+        entries.sort(key=lambda e: e.count, reverse=True)
+        self._entries = entries
+        self._pos = {}
+        self._block_start = {}
+        for i, entry in enumerate(entries):
+            self._pos[entry.location["poi_id"]] = i
+            self._block_start.setdefault(entry.count, i)
+
+    def increment(self, location: Dict):
+        """
+        Count one check-in at a venue, adding the venue if it is new.
+
+        Args:
+            location: Venue fields (poi_name, poi_id, lat, lon, amenity_type)
+        """
+        poi_id = location["poi_id"]
+        i = self._pos.get(poi_id)
+        if i is None:
+            i = len(self._entries)
+            self._entries.append(_Entry(0, dict(location)))
+            self._pos[poi_id] = i
+            self._block_start.setdefault(0, i)
+
+        entry = self._entries[i]
+        count = entry.count
+        j = self._block_start[count]
+
+        # Swap to the front of its block...
+        if i != j:
+            other = self._entries[j]
+            self._entries[i], self._entries[j] = other, entry
+            self._pos[other.location["poi_id"]] = i
+            self._pos[poi_id] = j
+
+        # ...which then becomes the last slot of the next-higher block
+        if j + 1 < len(self._entries) and self._entries[j + 1].count == count:
+            self._block_start[count] = j + 1
+        else:
+            del self._block_start[count]
+        entry.count = count + 1
+        self._block_start.setdefault(count + 1, j)
+
+    def top(self, limit: int = 10) -> List[Dict]:
+        """The venues with the most check-ins, highest first."""
+        return [
+            {**entry.location, "checkin_count": entry.count}
+            for entry in self._entries[:max(limit, 0)]
+        ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,659 @@
+"""
+Offline routing engine built from an OpenStreetMap extract.
+
+Graphs are built ahead of time with build_routing_graph.py: routable ways are
+read from an OSM XML file, chains of shape points between junctions are
+collapsed into single edges, and the result is stored as flat arrays (CSR
+adjacency) together with ALT landmark distances. Queries run A* with the
+landmark lower bounds, so only a small corridor of the graph is explored.
+"""
+
+import gzip
+import heapq
+import logging
+import math
+import os
+import pickle
+import random
+import xml.etree.ElementTree as ET
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.utils.geo_utils import calculate_distance, encode_polyline, simplify_path
+
+logger = logging.getLogger("local_router")
+
+GRAPH_FORMAT_VERSION = 1
+
+# Speeds (km/h) used for drive-time weights when a way has no maxspeed tag
+DRIVE_SPEEDS_KMH = {
+    "motorway": 100, "motorway_link": 60,
+    "trunk": 80, "trunk_link": 50,
+    "primary": 60, "primary_link": 40,
+    "secondary": 50, "secondary_link": 40,
+    "tertiary": 40, "tertiary_link": 30,
+    "unclassified": 30, "residential": 30,
+    "living_street": 10, "service": 15,
+}
+
+FOOT_HIGHWAYS = {
+    "footway", "path", "pedestrian", "steps", "track", "living_street",
+    "residential", "service", "unclassified", "tertiary", "tertiary_link",
+    "secondary", "secondary_link", "primary", "primary_link", "cycleway",
+}
+FOOT_SPEED_KMH = 5.0
+
+PROFILES = ("driving", "foot")
+
+# Grid cell size (degrees) for snapping coordinates to graph nodes
+SNAP_CELL_DEG = 0.01
+
+
+class RoadGraph:
+    """Read-only road graph for one routing profile."""
+
+    def __init__(self, data: Dict):
+        self.profile = data["profile"]
+        self.lat: array = data["lat"]
+        self.lon: array = data["lon"]
+        # CSR adjacency: edges of node u are offsets[u]..offsets[u + 1]
+        self.offsets: array = data["offsets"]
+        self.sources: array = data["sources"]
+        self.targets: array = data["targets"]
+        self.weights: array = data["weights"]  # seconds
+        self.lengths: array = data["lengths"]  # meters
+        self.name_ids: array = data["name_ids"]
+        self.names: List[str] = data["names"]
+        # Intermediate shape points of edge e: geom_offsets[e]..geom_offsets[e + 1]
+        self.geom_offsets: array = data["geom_offsets"]
+        self.geom_lat: array = data["geom_lat"]
+        self.geom_lon: array = data["geom_lon"]
+        self.landmarks: List[int] = data["landmarks"]
+        self.lm_from: List[array] = data["lm_from"]  # d(landmark, v)
+        self.lm_to: List[array] = data["lm_to"]  # d(v, landmark)
+        self.max_speed_mps: float = data["max_speed_mps"]
+
+        self._grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for v in range(len(self.lat)):
+            self._grid[self._cell(self.lat[v], self.lon[v])].append(v)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported routing graph format in {path}")
+        return cls(data)
+
+    def nearest_node(self, lat: float, lon: float, max_rings: int = 3) -> Optional[int]:
+        """Snap a coordinate to the closest graph node within a few grid cells."""
+        ci, cj = self._cell(lat, lon)
+        best, best_d = None, float("inf")
+        last_ring = max_rings
+        ring = 0
+        while ring <= last_ring:
+            for i in range(ci - ring, ci + ring + 1):
+                for j in range(cj - ring, cj + ring + 1):
+                    if max(abs(i - ci), abs(j - cj)) != ring:
+                        continue
+                    for v in self._grid.get((i, j), ()):
+                        d = calculate_distance(lat, lon, self.lat[v], self.lon[v])
+                        if d < best_d:
+                            best, best_d = v, d
+            # A diagonal hit can be farther than a node one ring out, so
+            # look at one more ring before settling
+            if best is not None and last_ring > ring + 1:
+                last_ring = ring + 1
+            ring += 1
+        return best
+
+    def shortest_path(self, source: int, target: int) -> Optional[List[int]]:
+        """
+        A* search using ALT landmark bounds.
+
+        Returns:
+            List of edge indices from source to target, or None if unreachable
+        """
+        if source == target:
+            return []
+
+        heuristic = self._heuristic(target)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        dist = {source: 0.0}
+        parent_edge: Dict[int, int] = {}
+        heap = [(heuristic(source), 0.0, source)]
+        while heap:
+            _, g, u = heapq.heappop(heap)
+            if u == target:
+                break
+            if g > dist[u]:
+                continue
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                ng = g + weights[e]
+                if ng < dist.get(v, float("inf")):
+                    dist[v] = ng
+                    parent_edge[v] = e
+                    heapq.heappush(heap, (ng + heuristic(v), ng, v))
+        else:
+            return None
+
+        path = []
+        v = target
+        while v != source:
+            e = parent_edge[v]
+            path.append(e)
+            v = self.sources[e]
+        path.reverse()
+        return path
+
+    def one_to_many(self, source: int, targets: set) -> Dict[int, Tuple[float, float]]:
+        """
+        Dijkstra from one node until every target is settled.
+
+        Returns:
+            Dictionary of reached target -> (seconds, meters)
+        """
+        offsets, edge_targets, weights, lengths = self.offsets, self.targets, self.weights, self.lengths
+        remaining = set(targets)
+        dist = {source: 0.0}
+        meters = {source: 0.0}
+        found = {}
+        heap = [(0.0, source)]
+        while heap and remaining:
+            g, u = heapq.heappop(heap)
+            if g > dist[u]:
+                continue
+            if u in remaining:
+                remaining.discard(u)
+                found[u] = (g, meters[u])
+            for e in range(offsets[u], offsets[u + 1]):
+                v = edge_targets[e]
+                ng = g + weights[e]
+                if ng < dist.get(v, float("inf")):
+                    dist[v] = ng
+                    meters[v] = meters[u] + lengths[e]
+                    heapq.heappush(heap, (ng, v))
+        return found
+
+    def edge_coords(self, e: int) -> Iterator[Tuple[float, float]]:
+        """(lon, lat) points of an edge, excluding its target node."""
+        u = self.sources[e]
+        yield (self.lon[u], self.lat[u])
+        for i in range(self.geom_offsets[e], self.geom_offsets[e + 1]):
+            yield (self.geom_lon[i], self.geom_lat[i])
+
+    def _heuristic(self, target: int):
+        """Build a lower bound on travel time from any node to ``target``."""
+        lm_from, lm_to = self.lm_from, self.lm_to
+        from_t = [d[target] for d in lm_from]
+        to_t = [d[target] for d in lm_to]
+        t_lat, t_lon = self.lat[target], self.lon[target]
+        lat, lon, max_speed = self.lat, self.lon, self.max_speed_mps
+        pairs = list(zip(lm_from, from_t, lm_to, to_t))
+
+        def heuristic(v: int) -> float:
+            # Straight line at top speed is always a valid bound
+            best = calculate_distance(lat[v], lon[v], t_lat, t_lon) * 1000 / max_speed
+            for d_from, f_t, d_to, t_t in pairs:
+                # Triangle inequality in both directions around the landmark
+                bound = f_t - d_from[v]
+                if bound > best:
+                    best = bound
+                bound = d_to[v] - t_t
+                if bound > best:
+                    best = bound
+            return best
+
+        return heuristic
+
+    @staticmethod
+    def _cell(lat: float, lon: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / SNAP_CELL_DEG)), int(math.floor(lon / SNAP_CELL_DEG)))
+
+
+class LocalRouter:
+    """Answers route queries from prebuilt graphs in the OSRM base-route shape."""
+
+    def __init__(self, graph_dir: str):
+        self.graph_dir = graph_dir
+        self._graphs: Dict[str, RoadGraph] = {}
+
+    def get_graph(self, profile: str) -> RoadGraph:
+        graph = self._graphs.get(profile)
+        if graph is None:
+            path = graph_path(self.graph_dir, profile)
+            if not os.path.exists(path):
+                raise FileNotFoundError(
+                    f"No routing graph for profile '{profile}' at {path}; "
+                    "build one with build_routing_graph.py"
+                )
+            graph = RoadGraph.load(path)
+            logger.info("Loaded %s graph with %d nodes", profile, len(graph))
+            self._graphs[profile] = graph
+        return graph
+
+    def route(
+        self,
+        profile: str,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float,
+        geometry: str = "none",
+        steps: bool = True
+    ) -> Optional[Dict]:
+        """
+        Route between two coordinates.
+
+        Args:
+            geometry: "none", "simplified" or "full" polyline6 route shape
+            steps: Whether to build step instructions
+
+        Returns:
+            Dict with distance_km, duration_s, instructions and geometry (same
+            shape as TransitService base routes), or None
+        """
+        graph = self.get_graph(profile)
+        source = graph.nearest_node(start_lat, start_lon)
+        target = graph.nearest_node(end_lat, end_lon)
+        if source is None or target is None:
+            return None
+
+        path = graph.shortest_path(source, target)
+        if path is None:
+            return None
+
+        encoded = None
+        if geometry != "none":
+            coords = []
+            for e in path:
+                coords.extend((lat, lon) for lon, lat in graph.edge_coords(e))
+            coords.append((graph.lat[target], graph.lon[target]))
+            if geometry == "simplified":
+                coords = simplify_path(coords)
+            encoded = encode_polyline(coords)
+
+        return {
+            "distance_km": sum(graph.lengths[e] for e in path) / 1000.0,
+            "duration_s": int(sum(graph.weights[e] for e in path)),
+            "instructions": _describe_path(graph, path) if steps else "",
+            "geometry": encoded
+        }
+
+    def table(
+        self,
+        profile: str,
+        sources: List[Tuple[float, float]],
+        destinations: List[Tuple[float, float]]
+    ) -> Dict[str, List[List[Optional[float]]]]:
+        """
+        Many-to-many travel times, in the OSRM table response shape.
+
+        Returns:
+            {"durations": seconds, "distances": meters}, None where unreachable
+        """
+        graph = self.get_graph(profile)
+        dest_nodes = [graph.nearest_node(lat, lon) for lat, lon in destinations]
+        wanted = {v for v in dest_nodes if v is not None}
+        durations, distances = [], []
+        for lat, lon in sources:
+            source = graph.nearest_node(lat, lon)
+            found = graph.one_to_many(source, wanted) if source is not None else {}
+            durations.append([found[v][0] if v in found else None for v in dest_nodes])
+            distances.append([found[v][1] if v in found else None for v in dest_nodes])
+        return {"durations": durations, "distances": distances}
+
+
+def _describe_path(graph: RoadGraph, path: List[int]) -> str:
+    """Turn an edge path into OSRM-style joined step instructions."""
+    steps = []
+    current = None
+    for e in path:
+        name = graph.names[graph.name_ids[e]]
+        if name != current:
+            road = name or "unnamed road"
+            steps.append(f"Head on {road}" if not steps else f"Continue onto {road}")
+            current = name
+    steps.append("Arrive at destination")
+    return " / ".join(steps)
+
+
+def graph_path(graph_dir: str, profile: str) -> str:
+    return os.path.join(graph_dir, f"{profile}.graph")
+
+
+# ---------------- Graph building ----------------
+
+def build_graphs(
+    osm_path: str,
+    out_dir: str,
+    profiles: Tuple[str, ...] = PROFILES,
+    num_landmarks: int = 8,
+    seed: int = 0
+) -> Dict[str, int]:
+    """
+    Build routing graphs from an OSM XML extract (.osm or .osm.gz).
+
+    Args:
+        osm_path: Path to the OSM XML file
+        out_dir: Directory to write <profile>.graph files to
+        profiles: Profiles to build ("driving", "foot")
+        num_landmarks: Number of ALT landmarks per graph
+        seed: Seed for landmark selection
+
+    Returns:
+        Dictionary of profile -> node count
+    """
+    ways = _read_routable_ways(osm_path, profiles)
+    needed = {ref for way in ways for ref in way["refs"]}
+    coords = _read_node_coords(osm_path, needed)
+    logger.info("Read %d routable ways, %d nodes", len(ways), len(coords))
+
+    os.makedirs(out_dir, exist_ok=True)
+    sizes = {}
+    for profile in profiles:
+        data = _build_profile_graph(ways, coords, profile, num_landmarks, random.Random(seed))
+        with open(graph_path(out_dir, profile), "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        sizes[profile] = len(data["lat"])
+        logger.info("Wrote %s graph: %d nodes, %d edges", profile, sizes[profile], len(data["targets"]))
+    return sizes
+
+
+def _open_osm(path: str):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def _read_routable_ways(path: str, profiles: Tuple[str, ...]) -> List[Dict]:
+    ways = []
+    with _open_osm(path) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag == "way":
+                tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+                modes = {p: _way_speed_kmh(tags, p) for p in profiles}
+                if any(modes.values()):
+                    ways.append({
+                        "refs": [int(nd.get("ref")) for nd in elem.iter("nd")],
+                        "name": tags.get("name") or tags.get("ref") or "",
+                        "speeds": modes,
+                        "oneway": _oneway(tags),
+                    })
+            if elem.tag in ("node", "way", "relation"):
+                elem.clear()
+    return ways
+
+
+def _read_node_coords(path: str, needed: set) -> Dict[int, Tuple[float, float]]:
+    coords = {}
+    with _open_osm(path) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag == "node":
+                node_id = int(elem.get("id"))
+                if node_id in needed:
+                    coords[node_id] = (float(elem.get("lat")), float(elem.get("lon")))
+            if elem.tag in ("node", "way", "relation"):
+                elem.clear()
+    return coords
+
+
+def _way_speed_kmh(tags: Dict[str, str], profile: str) -> Optional[float]:
+    """Travel speed on a way for a profile, or None if it is not routable."""
+    highway = tags.get("highway")
+    if not highway or tags.get("area") == "yes":
+        return None
+    access = tags.get("access")
+    if profile == "foot":
+        if tags.get("foot") in ("yes", "designated", "permissive"):
+            return FOOT_SPEED_KMH
+        if tags.get("foot") == "no" or access in ("no", "private"):
+            return None
+        return FOOT_SPEED_KMH if highway in FOOT_HIGHWAYS else None
+
+    if highway not in DRIVE_SPEEDS_KMH:
+        return None
+    if access in ("no", "private") or tags.get("motor_vehicle") == "no":
+        return None
+    return _parse_maxspeed(tags.get("maxspeed")) or DRIVE_SPEEDS_KMH[highway]
+
+
+def _parse_maxspeed(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    parts = value.split()
+    try:
+        speed = float(parts[0])
+    except ValueError:
+        return None
+    return speed * 1.609344 if len(parts) > 1 and parts[1] == "mph" else speed
+
+
+def _oneway(tags: Dict[str, str]) -> int:
+    """1 for forward-only, -1 for reverse-only, 0 for two-way (driving)."""
+    value = tags.get("oneway")
+    if value in ("yes", "true", "1"):
+        return 1
+    if value == "-1":
+        return -1
+    if value == "no":
+        return 0
+    if tags.get("highway") == "motorway" or tags.get("junction") == "roundabout":
+        return 1
+    return 0
+
+
+def _build_profile_graph(
+    ways: List[Dict],
+    coords: Dict[int, Tuple[float, float]],
+    profile: str,
+    num_landmarks: int,
+    rng: random.Random
+) -> Dict:
+    profile_ways = [w for w in ways if w["speeds"].get(profile)]
+
+    # Junctions: way endpoints and nodes shared by several ways
+    usage = Counter(ref for w in profile_ways for ref in w["refs"])
+    junctions = set(ref for ref, count in usage.items() if count > 1)
+    for w in profile_ways:
+        junctions.add(w["refs"][0])
+        junctions.add(w["refs"][-1])
+
+    node_ids: Dict[int, int] = {}
+    names: Dict[str, int] = {}
+    # (u, v, seconds, meters, name_id, [(lat, lon), ...])
+    edges = []
+
+    def node_index(ref: int) -> int:
+        if ref not in node_ids:
+            node_ids[ref] = len(node_ids)
+        return node_ids[ref]
+
+    for w in profile_ways:
+        speed_mps = w["speeds"][profile] / 3.6
+        oneway = w["oneway"] if profile == "driving" else 0
+        name_id = names.setdefault(w["name"], len(names))
+        start, length, shape = None, 0.0, []
+        prev = None
+        for ref in w["refs"]:
+            point = coords.get(ref)
+            if point is None:
+                # Way leaves the extract; restart at the next known junction
+                start, length, shape, prev = None, 0.0, [], None
+                continue
+            if prev is not None:
+                length += calculate_distance(prev[0], prev[1], point[0], point[1]) * 1000
+            prev = point
+            if ref not in junctions:
+                if start is not None:
+                    shape.append(point)
+                continue
+            if start is not None and ref != start:
+                u, v = node_index(start), node_index(ref)
+                seconds = length / speed_mps
+                if oneway >= 0:
+                    edges.append((u, v, seconds, length, name_id, shape))
+                if oneway <= 0:
+                    edges.append((v, u, seconds, length, name_id, shape[::-1]))
+            start, length, shape = ref, 0.0, []
+
+    # Keep the largest strongly connected component so every pair is routable
+    keep = _largest_scc(len(node_ids), edges)
+    remap = {old: new for new, old in enumerate(sorted(keep))}
+    edges = [
+        (remap[u], remap[v], s, m, n, g) for (u, v, s, m, n, g) in edges
+        if u in keep and v in keep
+    ]
+    edges.sort(key=lambda e: e[0])
+
+    n = len(remap)
+    lat = array("d", bytes(8 * n))
+    lon = array("d", bytes(8 * n))
+    for ref, old in node_ids.items():
+        if old in remap:
+            lat[remap[old]], lon[remap[old]] = coords[ref]
+
+    offsets = array("l", [0] * (n + 1))
+    sources, targets = array("l"), array("l")
+    weights, lengths = array("d"), array("d")
+    name_ids = array("l")
+    geom_offsets, geom_lat, geom_lon = array("l", [0]), array("d"), array("d")
+    for u, v, seconds, meters, name_id, shape in edges:
+        offsets[u + 1] += 1
+        sources.append(u)
+        targets.append(v)
+        weights.append(seconds)
+        lengths.append(meters)
+        name_ids.append(name_id)
+        for p_lat, p_lon in shape:
+            geom_lat.append(p_lat)
+            geom_lon.append(p_lon)
+        geom_offsets.append(len(geom_lat))
+    for u in range(n):
+        offsets[u + 1] += offsets[u]
+
+    reverse = _reverse_csr(n, sources, targets, weights)
+    landmarks, lm_from, lm_to = _select_landmarks(
+        n, (offsets, targets, weights), reverse, num_landmarks, rng
+    )
+
+    max_speed_kmh = max((w["speeds"][profile] for w in profile_ways), default=FOOT_SPEED_KMH)
+    name_list = [""] * len(names)
+    for name, i in names.items():
+        name_list[i] = name
+
+    return {
+        "version": GRAPH_FORMAT_VERSION,
+        "profile": profile,
+        "lat": lat, "lon": lon,
+        "offsets": offsets, "sources": sources, "targets": targets,
+        "weights": weights, "lengths": lengths,
+        "name_ids": name_ids, "names": name_list,
+        "geom_offsets": geom_offsets, "geom_lat": geom_lat, "geom_lon": geom_lon,
+        "landmarks": landmarks, "lm_from": lm_from, "lm_to": lm_to,
+        "max_speed_mps": max_speed_kmh / 3.6,
+    }
+
+
+def _largest_scc(n: int, edges: List[Tuple]) -> set:
+    """Nodes of the largest strongly connected component (iterative Kosaraju)."""
+    fwd, rev = defaultdict(list), defaultdict(list)
+    for u, v, *_ in edges:
+        fwd[u].append(v)
+        rev[v].append(u)
+
+    order, seen = [], [False] * n
+    for root in range(n):
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [(root, iter(fwd[root]))]
+        while stack:
+            node, it = stack[-1]
+            for nxt in it:
+                if not seen[nxt]:
+                    seen[nxt] = True
+                    stack.append((nxt, iter(fwd[nxt])))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+
+    best, assigned = set(), [False] * n
+    for root in reversed(order):
+        if assigned[root]:
+            continue
+        component, stack = set(), [root]
+        assigned[root] = True
+        while stack:
+            node = stack.pop()
+            component.add(node)
+            for prev in rev[node]:
+                if not assigned[prev]:
+                    assigned[prev] = True
+                    stack.append(prev)
+        if len(component) > len(best):
+            best = component
+    return best
+
+
+def _reverse_csr(n: int, sources: array, targets: array, weights: array) -> Tuple[array, array, array]:
+    order = sorted(range(len(targets)), key=lambda e: targets[e])
+    offsets = array("l", [0] * (n + 1))
+    rev_targets, rev_weights = array("l"), array("d")
+    for e in order:
+        offsets[targets[e] + 1] += 1
+        rev_targets.append(sources[e])
+        rev_weights.append(weights[e])
+    for u in range(n):
+        offsets[u + 1] += offsets[u]
+    return offsets, rev_targets, rev_weights
+
+
+def _dijkstra_all(n: int, csr: Tuple[array, array, array], source: int) -> array:
+    offsets, targets, weights = csr
+    dist = array("d", [float("inf")]) * n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def _select_landmarks(
+    n: int,
+    forward: Tuple[array, array, array],
+    reverse: Tuple[array, array, array],
+    count: int,
+    rng: random.Random
+) -> Tuple[List[int], List[array], List[array]]:
+    """Farthest-first landmark selection with forward and backward distances."""
+    if n == 0 or count <= 0:
+        return [], [], []
+
+    landmarks, lm_from, lm_to = [], [], []
+    # Start from the node farthest from a random seed node
+    seed_dist = _dijkstra_all(n, forward, rng.randrange(n))
+    candidate = max(range(n), key=lambda v: seed_dist[v])
+    closest = array("d", [float("inf")]) * n
+    for _ in range(min(count, n)):
+        landmarks.append(candidate)
+        d_from = _dijkstra_all(n, forward, candidate)
+        lm_from.append(d_from)
+        lm_to.append(_dijkstra_all(n, reverse, candidate))
+        for v in range(n):
+            if d_from[v] < closest[v]:
+                closest[v] = d_from[v]
+        candidate = max(range(n), key=lambda v: closest[v])
+    return landmarks, lm_from, lm_to
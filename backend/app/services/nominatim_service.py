@@ -2,21 +2,47 @@
 Updated search service that returns multiple results for user selection.
 """
 
+import asyncio
 import httpx
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+from app.config import NOMINATIM_BASE_URL, OVERPASS_URL
 from app.utils.geo_utils import calculate_distance
+from app.services.upstream_scheduler import Priority, upstream_scheduler
+from app.utils.metrics import span, upstream_call
 import math
 import logging
 
+# Places closer than this are treated as one result
+DEDUPE_DISTANCE_KM = 0.1
+# Grid cell side in degrees of latitude, a little over DEDUPE_DISTANCE_KM
+_DEDUPE_CELL_DEG = DEDUPE_DISTANCE_KM / 110.0
+
+
 class NominatimService:
     """Service for interacting with Nominatim API for place search."""
+
+    # Map common POI queries to Overpass tags
+    POI_MAP = {
+        "coffee": "cafe",
+        "cafe": "cafe",
+        "restaurant": "restaurant",
+        "restroom": "toilets",
+        "bathroom": "toilets",
+        "gas": "fuel",
+        "parking": "parking",
+        "atm": "atm",
+        "pharmacy": "pharmacy",
+        "bar": "bar",
+        "gym": "fitness_centre",
+        "hospital": "hospital",
+    }
     
     def __init__(self):
-        self.base_url = "https://nominatim.openstreetmap.org/search"
+        self.base_url = f"{NOMINATIM_BASE_URL}/search"
         self.headers = {
             "User-Agent": "LA-Interactive-Map/1.0"
         }
-        self.overpass_url = "https://overpass-api.de/api/interpreter"
+        self.overpass_url = OVERPASS_URL
         self.logger = logging.getLogger("nominatim_service")
     
     async def search_places(
@@ -40,29 +66,8 @@ class NominatimService:
         Returns:
             List of place dictionaries sorted by distance
         """
-        # Map common POI queries to Overpass tags
-        poi_map = {
-            "coffee": "cafe",
-            "cafe": "cafe",
-            "restaurant": "restaurant",
-            "restroom": "toilets",
-            "bathroom": "toilets",
-            "gas": "fuel",
-            "parking": "parking",
-            "atm": "atm",
-            "pharmacy": "pharmacy",
-            "bar": "bar",
-            "gym": "fitness_centre",
-            "hospital": "hospital",
-        }
-
         # Check if query matches a POI category
-        poi_tag = None
-        query_lower = query.lower()
-        for keyword, tag in poi_map.items():
-            if keyword in query_lower:
-                poi_tag = tag
-                break
+        poi_tag = self._match_poi_tag(query)
 
         results = []
 
@@ -97,31 +102,126 @@ class NominatimService:
             return []
 
         # Remove duplicates (places within 100m of each other)
-        unique_results = self._deduplicate_results(results)
+        with span("deduplicate"):
+            unique_results = self._deduplicate_results(results)
 
         # Sort by distance and limit
         unique_results.sort(key=lambda x: x["distance_km"])
         return unique_results[:limit]
 
-    def _deduplicate_results(self, results: List[Dict]) -> List[Dict]:
-        """Remove duplicate results that are very close to each other."""
-        if not results:
-            return []
+    async def search_places_stream(
+        self,
+        query: str,
+        user_lat: float,
+        user_lon: float,
+        limit: int = 10,
+        radius_km: float = 32.0
+    ) -> AsyncIterator[Dict]:
+        """
+        Search all sources concurrently and yield results as each one responds.
+        
+        Args:
+            query: Search query
+            user_lat: User's latitude
+            user_lon: User's longitude
+            limit: Maximum number of results per batch and in the final snapshot
+            radius_km: Search radius in km (default 32km / 20 miles)
+        
+        Yields:
+            ``{"type": "batch", "source", "results"}`` events holding only results
+            not already sent, ``{"type": "error", "source", "detail"}`` when a
+            source fails, and finally ``{"type": "final", "results"}`` with the
+            ranked top ``limit`` results across all sources.
+        """
+        sources = {}
+        poi_tag = self._match_poi_tag(query)
+        if poi_tag:
+            sources[asyncio.create_task(self._search_overpass(
+                amenity=poi_tag,
+                lat=user_lat,
+                lon=user_lon,
+                radius_km=radius_km,
+                limit=limit
+            ))] = "overpass"
+        sources[asyncio.create_task(self._search_nominatim(
+            query=query,
+            lat=user_lat,
+            lon=user_lon,
+            limit=limit,
+            radius_km=radius_km
+        ))] = "nominatim"
+
+        sent: List[Dict] = []
+        sent_grid: Dict = {}
+        pending = set(sources)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = sources[task]
+                    try:
+                        batch = task.result()
+                    except Exception as e:
+                        self.logger.exception("%s search failed: %s", source.title(), e)
+                        yield {"type": "error", "source": source, "detail": str(e)}
+                        continue
+
+                    # Dedupe against everything already streamed to the client
+                    batch.sort(key=lambda x: x["distance_km"])
+                    with span("deduplicate"):
+                        new_results = self._deduplicate_results(batch, sent_grid, limit)
+                    sent.extend(new_results)
+                    yield {"type": "batch", "source": source, "results": new_results}
+        finally:
+            # Client went away before every source answered
+            for task in pending:
+                task.cancel()
+
+        sent.sort(key=lambda x: x["distance_km"])
+        yield {"type": "final", "results": sent[:limit]}
+
+    def _match_poi_tag(self, query: str) -> Optional[str]:
+        """Return the Overpass amenity tag for a query, if it names a POI category."""
+        query_lower = query.lower()
+        for keyword, tag in self.POI_MAP.items():
+            if keyword in query_lower:
+                return tag
+        return None
+
+    def _deduplicate_results(self, results: List[Dict], kept: Optional[Dict] = None,
+                             limit: Optional[int] = None) -> List[Dict]:
+        """
+        Remove duplicate results that are very close to each other.
+        
+        Kept places are hashed into a grid of ~100 m cells, so each result is
+        only compared with places in the neighbouring cells.
+        
+        Args:
+            results: Results in order of preference
+            kept: Grid from earlier calls, to also drop places close to results
+                already returned (updated in place)
+            limit: Stop after this many unique results
+        """
+        if kept is None:
+            kept = {}
         
         unique = []
         for result in results:
-            is_duplicate = False
-            for existing in unique:
-                distance = calculate_distance(
-                    result["lat"], result["lon"],
-                    existing["lat"], existing["lon"]
-                )
-                # Consider places within 100m as duplicates
-                if distance < 0.1:
-                    is_duplicate = True
-                    break
-            
+            if limit is not None and len(unique) >= limit:
+                break
+            lat, lon = result["lat"], result["lon"]
+            row = math.floor(lat / _DEDUPE_CELL_DEG)
+            col = math.floor(lon / _DEDUPE_CELL_DEG)
+            # Cells are narrower in km away from the equator
+            reach = math.ceil(1 / max(math.cos(math.radians(lat)), 1e-6))
+            is_duplicate = any(
+                calculate_distance(lat, lon, existing["lat"], existing["lon"]) < DEDUPE_DISTANCE_KM
+                for r in range(row - 1, row + 2)
+                for c in range(col - reach, col + reach + 1)
+                for existing in kept.get((r, c), ())
+            )
             if not is_duplicate:
+                kept.setdefault((row, col), []).append(result)
                 unique.append(result)
         
         return unique
@@ -145,13 +245,16 @@ class NominatimService:
 out body center;
 """
 
+        await upstream_scheduler.acquire(self.overpass_url, Priority.INTERACTIVE)
         async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                self.overpass_url,
-                data=overpass_query,
-                headers=self.headers,
-                timeout=30.0
-            )
+            with upstream_call("overpass") as call:
+                resp = await client.post(
+                    self.overpass_url,
+                    data=overpass_query,
+                    headers=self.headers,
+                    timeout=30.0
+                )
+                call.status = resp.status_code
             resp.raise_for_status()
             data = resp.json()
 
@@ -223,13 +326,16 @@ out body center;
             "bounded": 1
         }
 
+        await upstream_scheduler.acquire(self.base_url, Priority.INTERACTIVE)
         async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                self.base_url,
-                params=params,
-                headers=self.headers,
-                timeout=10.0
-            )
+            with upstream_call("nominatim") as call:
+                resp = await client.get(
+                    self.base_url,
+                    params=params,
+                    headers=self.headers,
+                    timeout=10.0
+                )
+                call.status = resp.status_code
             resp.raise_for_status()
             nominatim_results = resp.json()
 
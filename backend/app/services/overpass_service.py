@@ -1,20 +1,32 @@
 import httpx
 import asyncio
+import logging
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from app.config import OVERPASS_URL
 from app.models.schemas import ZonePolygon
+from app.utils.geo_utils import PointIndex
+from app.services.upstream_scheduler import Priority, upstream_scheduler
+from app.utils.logging_setup import SampledLogger
+from app.utils.metrics import record_cache, span, upstream_call
 
 
 class OverpassService:
     """Service for interacting with Overpass API to fetch POI data within zone boundaries."""
 
     def __init__(self):
-        self.base_url = "https://overpass-api.de/api/interpreter"
+        self.base_url = OVERPASS_URL
         self.headers = {"User-Agent": "LA-Interactive-Map/1.0"}
+        self.logger = logging.getLogger("overpass_service")
+        self.sampled_logger = SampledLogger(self.logger)
 
         # In-memory cache
         self._cache: Dict[str, Dict] = {}
         self._cache_ttl = timedelta(hours=1)
+        self._cache_version = 0
+
+        # Nearest-neighbour indexes built from cached POIs, per category
+        self._nearest_indexes: Dict[str, Dict] = {}
 
         # POI category mappings
         self.poi_categories = {
@@ -50,10 +62,10 @@ class OverpassService:
         zone: ZonePolygon,
         categories: Optional[List[str]] = None,
         user_lat: Optional[float] = None,
-        user_lon: Optional[float] = None
+        user_lon: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> Dict[str, List[Dict]]:
-        print(f"🔍 Querying zone: {zone.name}")
-        print(f"📍 Zone coordinates: {zone.coordinates}")
+        self.sampled_logger.info("Querying zone %s for %s", zone.name, categories)
 
         # Default to all categories
         if categories is None:
@@ -61,38 +73,39 @@ class OverpassService:
 
         valid_categories = [c for c in categories if c in self.poi_categories]
         if not valid_categories:
-            print("❌ No valid categories found")
+            self.logger.warning("No valid categories in %s", categories)
             return {}
 
         cache_key = f"{zone.name}_{','.join(sorted(valid_categories))}"
         cached = self._get_from_cache(cache_key)
+        record_cache("overpass_pois", bool(cached))
         if cached:
-            print(f"💾 Using cached result for {cache_key}")
             return cached
 
         try:
             query = self._build_overpass_query(zone, valid_categories)
-            print(f"🔧 Built Overpass query:\n{query}")
+            # Zone polygons make the query several KB; only logged at DEBUG
+            self.logger.debug("Overpass query for %s:\n%s", zone.name, query)
 
+            await upstream_scheduler.acquire(self.base_url, priority)
             async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.base_url,
-                    data={"data": query},
-                    headers=self.headers,
-                    timeout=45.0
-                )
-                print(f"📡 Response status: {response.status_code}")
+                with upstream_call("overpass") as call:
+                    response = await client.post(
+                        self.base_url,
+                        data={"data": query},
+                        headers=self.headers,
+                        timeout=45.0
+                    )
+                    call.status = response.status_code
                 response.raise_for_status()
 
                 data = response.json()
                 if not isinstance(data, dict) or "elements" not in data:
-                    print("⚠️ Unexpected response format:")
-                    print(response.text[:2000])
+                    self.logger.warning("Unexpected Overpass response format: %.500s", response.text)
                     return {}
 
-                print(f"🎯 Found {len(data['elements'])} elements")
-
-                pois = self._process_overpass_results(data, valid_categories)
+                with span("process_pois"):
+                    pois = self._process_overpass_results(data, valid_categories)
 
                 # Compute distance if available
                 if user_lat is not None and user_lon is not None:
@@ -100,19 +113,20 @@ class OverpassService:
 
                 # Only cache non-empty results
                 if any(pois.values()):
-                    self._cache_result(cache_key, pois)
+                    self._cache_result(cache_key, pois, zone.name)
                 else:
-                    print("⚠️ Empty result — skipping cache")
+                    self.logger.info("Empty Overpass result for %s, not cached", zone.name)
 
-                total = sum(len(v) for v in pois.values())
-                print(f"✅ Processed {total} POIs total")
+                self.sampled_logger.info(
+                    "Processed %d POIs for %s from %d elements",
+                    sum(len(v) for v in pois.values()), zone.name, len(data["elements"])
+                )
                 return pois
 
         except httpx.RequestError as e:
-            print(f"❌ Overpass request error: {e}")
-        except Exception as e:
-            print(f"❌ Unexpected error: {e}")
-            import traceback; traceback.print_exc()
+            self.logger.error("Overpass request error: %s", e)
+        except Exception:
+            self.logger.exception("Unexpected error querying Overpass for %s", zone.name)
 
         return {}
 
@@ -150,7 +164,6 @@ out center meta;"""
     def _process_overpass_results(self, data: Dict, categories: List[str]) -> Dict[str, List[Dict]]:
         pois_by_cat = {c: [] for c in categories}
         elements = data.get("elements", [])
-        print(f"📊 Processing {len(elements)} elements")
 
         for el in elements:
             poi = self._extract_poi_data(el)
@@ -163,7 +176,6 @@ out center meta;"""
 
         for c in pois_by_cat:
             pois_by_cat[c].sort(key=lambda x: x.get("distance", float('inf')))
-            print(f"📋 Category {c}: {len(pois_by_cat[c])} POIs")
 
         return pois_by_cat
 
@@ -229,6 +241,59 @@ out center meta;"""
                 poi["distance"] = round(calculate_distance(user_lat, user_lon, poi["lat"], poi["lon"]), 2)
         return pois
 
+    # ---------------- Nearest POIs ----------------
+
+    def get_nearest_pois(self, category: str, lat: float, lon: float, k: int = 5) -> List[Dict]:
+        """
+        Find the k cached POIs of a category closest to a location.
+
+        Args:
+            category: POI category name
+            lat, lon: Query coordinates
+            k: Number of POIs to return
+
+        Returns:
+            List of POI dictionaries with distance (km), closest first
+        """
+        index = self._get_nearest_index(category)
+        return [
+            {**poi, "distance": round(distance, 2)}
+            for distance, poi in index.nearest(lat, lon, k)
+        ]
+
+    def is_zone_cached(self, zone_name: str, category: str) -> bool:
+        """Check whether POIs of a category are cached for a zone."""
+        now = datetime.now()
+        for entry in self._cache.values():
+            if entry["zone"] == zone_name and category in entry["data"] and now < entry["expires_at"]:
+                return True
+        return False
+
+    def _get_nearest_index(self, category: str) -> PointIndex:
+        """Return the index for a category, rebuilding it if the cache changed."""
+        now = datetime.now()
+        built = self._nearest_indexes.get(category)
+        if built and built["version"] == self._cache_version and now < built["expires_at"]:
+            return built["index"]
+
+        points = {}
+        expires_at = datetime.max
+        for entry in self._cache.values():
+            if now >= entry["expires_at"] or category not in entry["data"]:
+                continue
+            expires_at = min(expires_at, entry["expires_at"])
+            for poi in entry["data"][category]:
+                # Same POI can be cached under several category combinations
+                points[(poi["name"], poi["lat"], poi["lon"])] = poi
+
+        index = PointIndex(list(points.values()))
+        self._nearest_indexes[category] = {
+            "version": self._cache_version,
+            "expires_at": expires_at,
+            "index": index
+        }
+        return index
+
     # ---------------- Caching ----------------
 
     def _get_from_cache(self, key: str) -> Optional[Dict]:
@@ -237,30 +302,32 @@ out center meta;"""
             return entry["data"]
         if entry:
             del self._cache[key]
+            self._cache_version += 1
         return None
 
-    def _cache_result(self, key: str, data: Dict):
+    def _cache_result(self, key: str, data: Dict, zone_name: str):
         self._cache[key] = {
+            "zone": zone_name,
             "data": data,
             "expires_at": datetime.now() + self._cache_ttl
         }
+        self._cache_version += 1
 
     # ---------------- Testing ----------------
 
     async def test_simple_query(self) -> Dict:
-        print("🧪 Testing simple Overpass query...")
         query = """[out:json][timeout:25];
 (
   node["amenity"="restaurant"](34.0,-118.5,34.2,-118.2);
 );
 out center meta;"""
 
+        await upstream_scheduler.acquire(self.base_url, Priority.INTERACTIVE)
         async with httpx.AsyncClient() as client:
             resp = await client.post(self.base_url, data={"data": query}, headers=self.headers)
-            print(f"📡 Status: {resp.status_code}")
             resp.raise_for_status()
             data = resp.json()
-            print(f"🎯 Found {len(data.get('elements', []))} elements")
+            self.logger.info("Test query found %d elements", len(data.get("elements", [])))
             return data
 
     def get_all_categories(self) -> List[str]:
@@ -0,0 +1,192 @@
+"""
+Seeded synthetic check-in data for load and scale testing.
+
+Generates POIs, users and check-ins for every zone with realistic skew:
+POIs cluster around real venues and zone centres, a few zones, venues and
+users account for most activity (Zipf-like weights), and check-ins follow a
+daily rhythm with evening peaks and busier weekends. The same seed and end
+time always produce the same data. Check-ins are generated day by day in
+time order, so millions can be streamed without holding them in memory.
+"""
+
+import gzip
+import json
+import random
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional
+
+from app.services.venues import CAPTIONS, LA_VENUES
+from app.services.zone_service import ZONE_CENTERS, get_zone_name
+
+AMENITY_TYPES = {
+    "restaurant": 30, "cafe": 20, "bar": 12, "park": 10, "shopping": 8,
+    "attraction": 8, "museum": 4, "entertainment": 4, "stadium": 2, "theme_park": 2,
+}
+
+FIRST_NAMES = [
+    "Alex", "Maria", "James", "Sarah", "David", "Emma", "Michael", "Sofia", "Ryan", "Lisa",
+    "Chris", "Olivia", "Daniel", "Isabella", "Kevin", "Priya", "Jordan", "Mei", "Carlos", "Aisha",
+]
+LAST_NAMES = [
+    "Chen", "Garcia", "Kim", "Lee", "Patel", "Wilson", "Lopez", "Rodriguez", "Park", "Nguyen",
+    "Wong", "Brown", "Martinez", "Tran", "Singh", "Johnson", "Cohen", "Okafor", "Silva", "Ali",
+]
+
+# Relative check-in volume per hour of day (local time)
+HOURLY_WEIGHTS = [
+    2, 1, 1, 0.5, 0.5, 1, 2, 4, 6, 6, 7, 9,
+    11, 10, 8, 8, 9, 11, 14, 15, 13, 10, 7, 4,
+]
+WEEKEND_BOOST = 1.4
+
+# Spread of POIs around their anchor, in degrees (~1.5 km)
+POI_SPREAD_DEG = 0.0135
+
+
+def _zipf_weights(n: int, exponent: float) -> List[float]:
+    return [1.0 / (rank ** exponent) for rank in range(1, n + 1)]
+
+
+class SyntheticDataset:
+    """A reproducible population of POIs and users that emits check-ins."""
+
+    def __init__(self, seed: int = 42, num_users: int = 10_000, pois_per_zone: int = 200,
+                 zones: Optional[List[str]] = None):
+        self.seed = seed
+        rng = random.Random(seed)
+        self.zones = list(zones or get_zone_name(""))
+        self.users = [
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}" for i in range(num_users)
+        ]
+        self.pois = {zone: self._make_pois(rng, zone, pois_per_zone) for zone in self.zones}
+
+        # Skewed activity: shuffle so the busiest zone / POI / user varies by seed
+        zone_order = self.zones[:]
+        rng.shuffle(zone_order)
+        self._zone_order = zone_order
+        self._zone_cum = list(accumulate(_zipf_weights(len(zone_order), 0.8)))
+        self._poi_cum = {zone: list(accumulate(_zipf_weights(len(pois), 1.1)))
+                         for zone, pois in self.pois.items()}
+        self._user_cum = list(accumulate(_zipf_weights(num_users, 0.9)))
+        self._hour_cum = list(accumulate(HOURLY_WEIGHTS))
+
+    def iter_checkins(self, count: int, days: int = 30, end: Optional[datetime] = None) -> Iterator[Dict]:
+        """
+        Yield ``count`` check-ins spread over the ``days`` before ``end``, oldest first.
+
+        Records use the store's field names without "id" / "photo_url".
+        """
+        end = end or datetime.now().replace(microsecond=0)
+        start = end - timedelta(days=days)
+        rng = random.Random(f"{self.seed}-checkins-{count}-{days}")
+
+        day_weights = [WEEKEND_BOOST if (start + timedelta(days=d)).weekday() >= 5 else 1.0
+                       for d in range(days)]
+        for day, day_count in enumerate(_apportion(count, day_weights)):
+            day_start = start + timedelta(days=day)
+            offsets = sorted(
+                3600 * self._pick(rng, self._hour_cum) + rng.random() * 3600
+                for _ in range(day_count)
+            )
+            for offset in offsets:
+                yield self._checkin(rng, day_start + timedelta(seconds=offset))
+
+    def write_ndjson(self, path: str, count: int, days: int = 30, end: Optional[datetime] = None) -> int:
+        """
+        Write check-ins as NDJSON (gzip-compressed if ``path`` ends in .gz),
+        in the format accepted by POST /api/checkins/bulk.
+
+        Returns:
+            Number of records written
+        """
+        if path.endswith(".gz"):
+            f = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        else:
+            f = open(path, "w", encoding="utf-8")
+        written = 0
+        with f:
+            for checkin in self.iter_checkins(count, days, end):
+                f.write(json.dumps(checkin, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+                written += 1
+        return written
+
+    def load_into_store(self, count: int, days: int = 30, end: Optional[datetime] = None,
+                        batch_size: int = 5000, record_aggregates: bool = False) -> int:
+        """
+        Write check-ins straight to the configured check-in store in batches,
+        without notifying live subscribers (see checkin_store.load_checkins).
+
+        Returns:
+            Number of check-ins added
+        """
+        # Imported here: the store is opened (and seeded) when its module loads
+        from app.services.checkin_store import load_checkins
+
+        batch, added = [], 0
+        for checkin in self.iter_checkins(count, days, end):
+            batch.append(checkin)
+            if len(batch) >= batch_size:
+                added += load_checkins(batch, record_aggregates)
+                batch = []
+        if batch:
+            added += load_checkins(batch, record_aggregates)
+        return added
+
+    def _checkin(self, rng: random.Random, when: datetime) -> Dict:
+        zone = self._zone_order[self._pick(rng, self._zone_cum)]
+        poi = self.pois[zone][self._pick(rng, self._poi_cum[zone])]
+        return {
+            "user_name": self.users[self._pick(rng, self._user_cum)],
+            "poi_name": poi["name"],
+            "poi_id": poi["poi_id"],
+            "poi_lat": poi["lat"],
+            "poi_lon": poi["lon"],
+            "zone_name": zone,
+            "caption": rng.choice(CAPTIONS).format(zone=zone, venue=poi["name"]) if rng.random() < 0.7 else None,
+            "timestamp": when.isoformat(),
+            "amenity_type": poi["type"]
+        }
+
+    @staticmethod
+    def _pick(rng: random.Random, cum_weights: List[float]) -> int:
+        return bisect_right(cum_weights, rng.random() * cum_weights[-1])
+
+    @staticmethod
+    def _make_pois(rng: random.Random, zone: str, count: int) -> List[Dict]:
+        """Real venues first, then synthetic ones clustered around them and the zone centre."""
+        anchors = [
+            {"name": v["name"], "lat": v["lat"], "lon": v["lon"], "type": v["type"]}
+            for v in LA_VENUES.get(zone, [])
+        ]
+        center_lat, center_lon = ZONE_CENTERS.get(zone, (34.05, -118.25))
+        spots = [(a["lat"], a["lon"]) for a in anchors] or [(center_lat, center_lon)]
+        types, type_weights = list(AMENITY_TYPES), list(AMENITY_TYPES.values())
+        short = zone.replace(" Zone", "")
+
+        pois = anchors[:count]
+        while len(pois) < count:
+            lat, lon = rng.choice(spots + [(center_lat, center_lon)])
+            amenity = rng.choices(types, type_weights)[0]
+            pois.append({
+                "name": f"{short} {amenity.replace('_', ' ').title()} {len(pois) + 1}",
+                "lat": round(rng.gauss(lat, POI_SPREAD_DEG), 6),
+                "lon": round(rng.gauss(lon, POI_SPREAD_DEG), 6),
+                "type": amenity
+            })
+        for poi in pois:
+            poi["poi_id"] = f"{zone}-{poi['name'].lower().replace(' ', '-')}"
+        return pois
+
+
+def _apportion(total: int, weights: List[float]) -> List[int]:
+    """Split ``total`` into integer parts proportional to ``weights`` (largest remainder)."""
+    scale = total / sum(weights)
+    shares = [w * scale for w in weights]
+    parts = [int(s) for s in shares]
+    by_remainder = sorted(range(len(weights)), key=lambda i: shares[i] - parts[i], reverse=True)
+    for i in by_remainder[:total - sum(parts)]:
+        parts[i] += 1
+    return parts
@@ -1,10 +1,75 @@
-from typing import Dict, List, Tuple, Any
-import requests
+from typing import Dict, List, Tuple, Any, Optional
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import httpx
+from app.config import (
+    LOCAL_GRAPH_DIR,
+    OSRM_BASE_URL,
+    OSRM_MAX_CONNECTIONS,
+    OSRM_MAX_RETRIES,
+    OSRM_RETRY_BACKOFF_SEC,
+    OSRM_TABLE_MAX_COORDS,
+    OSRM_TIMEOUT_SEC,
+    ROUTE_CACHE_MAX_ENTRIES,
+    ROUTE_CACHE_TTL_SEC,
+    ROUTE_SNAP_DECIMALS,
+    ROUTING_BACKEND,
+    TRAVEL_TIME_RERANK_CANDIDATES,
+)
+from app.services.local_router import LocalRouter
+from app.services.upstream_scheduler import Priority, UpstreamQueueTimeout, upstream_scheduler
+from app.utils.geo_utils import calculate_distance
+from app.utils.metrics import record_cache, upstream_call
+
+# Upstream responses worth retrying
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Route geometry detail -> OSRM overview parameter
+GEOMETRY_OVERVIEW = {"none": "false", "simplified": "simplified", "full": "full"}
+
+# Cached variants that can answer a request for each geometry level
+GEOMETRY_SATISFIED_BY = {
+    "none": ("none", "simplified", "full"),
+    "simplified": ("simplified",),
+    "full": ("full",),
+}
+
+# OSRM profile each travel mode is routed with; modes sharing a profile
+# share one cached base route
+PROFILE_BY_MODE = {
+    "driving": "driving",
+    "carpool": "driving",
+    "transit": "foot",
+    "walking": "foot",
+}
 
 class TransitService:
-    def __init__(self):
+    def __init__(self, osrm_base: Optional[str] = None, backend: Optional[str] = None):
         self.base_url = "https://api.metro.net/api/v1"  # LA Metro API base URL
-        self.osrm_base = "http://router.project-osrm.org/route/v1"
+        self.osrm_root = osrm_base or OSRM_BASE_URL
+        self.osrm_base = f"{self.osrm_root}/route/v1"
+        self.logger = logging.getLogger("transit_service")
+
+        # Offline graphs replace OSRM when the local backend is selected
+        backend = backend or ROUTING_BACKEND
+        self._local_router = LocalRouter(LOCAL_GRAPH_DIR) if backend == "local" else None
+
+        # Shared client so routing calls reuse pooled keep-alive connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # LRU cache of base routes: (profile, start, end, geometry, steps) -> route
+        self._route_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        # Base routes being fetched, same keys; concurrent misses await these
+        self._route_fetches: Dict[Tuple, "asyncio.Task"] = {}
+
+    async def aclose(self):
+        """Close pooled upstream connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
         
     async def get_transit_directions(
     self,
@@ -13,57 +78,379 @@ class TransitService:
     end_lat: float,
     end_lon: float,
     mode: str = "driving",
-    passengers: int = 1
+    passengers: int = 1,
+    geometry: str = "none",
+    steps: bool = True
 ) -> Dict[str, Any]:
-        """Get directions based on mode with realistic time estimates."""
+        """
+        Get directions based on mode with realistic time estimates.
+        
+        ``geometry`` ("none", "simplified" or "full") selects the polyline6 route
+        shape to return; step instructions are only fetched when ``steps`` is set.
+        """
     
-        # Get base route from OSRM
-        profile = "foot" if mode in ("transit", "walking") else "driving"
-        coords = f"{start_lon},{start_lat};{end_lon},{end_lat}"
-        url = f"{self.osrm_base}/{profile}/{coords}"
-        params = {"overview": "full", "geometries": "geojson", "steps": "true"}
+        # Get base route for the mode's OSRM profile (cached)
+        profile = PROFILE_BY_MODE.get(mode, "driving")
+        try:
+            base = await self._get_base_route(
+                profile, start_lat, start_lon, end_lat, end_lon, geometry, steps
+            )
+        except Exception as e:
+            self.logger.error("OSRM Error: %s", e)
+            raise
+
+        if base is None:
+            return {"routes": [], "total_distance": 0.0, "total_duration": 0}
+
+        route_item = self._apply_mode(base, mode, geometry, steps)
+        return {
+            "routes": [route_item],
+            "total_distance": route_item["distance"],
+            "total_duration": route_item["duration"]
+        }
+
+    async def compare_modes(
+        self,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float,
+        modes: Optional[List[str]] = None,
+        geometry: str = "none",
+        steps: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get directions for several travel modes in one go.
+        
+        Each distinct OSRM profile is fetched once, all concurrently, and every
+        mode is derived from its profile's base route.
+        
+        Returns:
+            Dictionary of mode -> directions (same shape as get_transit_directions)
+        """
+        modes = modes or list(PROFILE_BY_MODE)
+        profiles = sorted({PROFILE_BY_MODE.get(mode, "driving") for mode in modes})
+        try:
+            bases = await asyncio.gather(*(
+                self._get_base_route(profile, start_lat, start_lon, end_lat, end_lon, geometry, steps)
+                for profile in profiles
+            ))
+        except Exception as e:
+            self.logger.error("OSRM Error: %s", e)
+            raise
+        base_by_profile = dict(zip(profiles, bases))
+
+        results = {}
+        for mode in modes:
+            base = base_by_profile[PROFILE_BY_MODE.get(mode, "driving")]
+            if base is None:
+                results[mode] = {"routes": [], "total_distance": 0.0, "total_duration": 0}
+                continue
+            route_item = self._apply_mode(base, mode, geometry, steps)
+            results[mode] = {
+                "routes": [route_item],
+                "total_distance": route_item["distance"],
+                "total_duration": route_item["duration"]
+            }
+        return results
+
+    async def get_travel_time_matrix(
+        self,
+        sources: List[Tuple[float, float]],
+        destinations: List[Tuple[float, float]],
+        mode: str = "driving"
+    ) -> List[List[Optional[int]]]:
+        """
+        Get travel times from every source to every destination.
+        
+        Uses one OSRM table request (split only when it would exceed the
+        server's coordinate limit) or the local routing engine.
+        
+        Args:
+            sources: List of (lat, lon) origins
+            destinations: List of (lat, lon) targets
+            mode: Travel mode; durations get the same adjustments as routes
+        
+        Returns:
+            durations[i][j] in seconds from sources[i] to destinations[j],
+            None where no route exists
+        """
+        if not sources or not destinations:
+            return [[] for _ in sources]
+
+        profile = PROFILE_BY_MODE.get(mode, "driving")
+        if self._local_router is not None:
+            table = await asyncio.to_thread(self._local_router.table, profile, sources, destinations)
+        else:
+            chunk = max(1, OSRM_TABLE_MAX_COORDS - len(sources))
+            parts = await asyncio.gather(*(
+                self._fetch_osrm_table(profile, sources, destinations[i:i + chunk])
+                for i in range(0, len(destinations), chunk)
+            ))
+            table = {
+                "durations": [sum((part["durations"][i] for part in parts), []) for i in range(len(sources))],
+                "distances": [sum((part["distances"][i] for part in parts), []) for i in range(len(sources))],
+            }
+
+        return [
+            [
+                None if duration is None
+                else self._adjust_duration(duration, (distance or 0.0) / 1000.0, mode)
+                for duration, distance in zip(durations, distances)
+            ]
+            for durations, distances in zip(table["durations"], table["distances"])
+        ]
+
+    async def rank_by_travel_time(
+        self,
+        origin_lat: float,
+        origin_lon: float,
+        items: List[Dict],
+        mode: str = "driving",
+        max_candidates: int = TRAVEL_TIME_RERANK_CANDIDATES
+    ) -> List[Dict]:
+        """
+        Re-rank places by travel time from the origin.
         
+        The closest ``max_candidates`` by straight-line distance are timed with a
+        single matrix call and sorted by ``travel_time_s``; unreachable places and
+        the rest follow in distance order with ``travel_time_s`` set to None.
+        If the matrix call fails, every place keeps its distance order.
+        
+        Returns:
+            New list of copies of the items with travel_time_s added
+        """
+        by_distance = sorted(
+            (dict(item) for item in items),
+            key=lambda item: calculate_distance(origin_lat, origin_lon, item["lat"], item["lon"])
+        )
+        candidates = by_distance[:max_candidates]
+        rest = by_distance[max_candidates:]
+
         try:
-            resp = requests.get(url, params=params, timeout=10)
-            resp.raise_for_status()
-            osrm = resp.json()
-            
-            if not osrm.get("routes"):
-                return {"routes": [], "total_distance": 0.0, "total_duration": 0}
-
-            r0 = osrm["routes"][0]
-            dist_km = r0["distance"] / 1000.0
-            dur_seconds = int(r0["duration"])
-            
-            # Adjust duration based on mode
-            if mode == "transit":
-                # Public transit is slower: add waiting time + slower speed
-                dur_seconds = int(dur_seconds * 1.5 + 300)  # 50% slower + 5 min wait
-            elif mode == "walking":
-                # Walking is slower than driving: ~5 km/h vs 50 km/h
-                dur_seconds = int((dist_km / 5) * 3600)  # Calculate from distance
-            elif mode == "carpool":
-                # Carpool same as driving
-                dur_seconds = int(r0["duration"])
-            
+            durations = await self.get_travel_time_matrix(
+                [(origin_lat, origin_lon)],
+                [(item["lat"], item["lon"]) for item in candidates],
+                mode=mode
+            )
+        except (httpx.HTTPError, UpstreamQueueTimeout, ValueError, OSError) as e:
+            # OSError: the local backend has no graph for this profile
+            self.logger.warning("Travel-time matrix failed, keeping distance order: %s", e)
+            durations = [[None] * len(candidates)]
+        for item, duration in zip(candidates, durations[0]):
+            item["travel_time_s"] = duration
+        for item in rest:
+            item["travel_time_s"] = None
+
+        reachable = [item for item in candidates if item.get("travel_time_s") is not None]
+        reachable.sort(key=lambda item: item["travel_time_s"])
+        unreachable = [item for item in candidates if item.get("travel_time_s") is None]
+        return reachable + unreachable + rest
+
+    async def _fetch_osrm_table(
+        self,
+        profile: str,
+        sources: List[Tuple[float, float]],
+        destinations: List[Tuple[float, float]]
+    ) -> Dict[str, List[List[Optional[float]]]]:
+        """Fetch one duration/distance table from the OSRM table service."""
+        coords = ";".join(f"{lon},{lat}" for lat, lon in sources + destinations)
+        url = f"{self.osrm_root}/table/v1/{profile}/{coords}"
+        params = {
+            "sources": ";".join(str(i) for i in range(len(sources))),
+            "destinations": ";".join(str(len(sources) + i) for i in range(len(destinations))),
+            "annotations": "duration,distance",
+        }
+        data = await self._get_json(url, params)
+        empty = [[None] * len(destinations) for _ in sources]
+        return {
+            "durations": data.get("durations") or empty,
+            "distances": data.get("distances") or empty,
+        }
+
+    @staticmethod
+    def _adjust_duration(duration_s: float, dist_km: float, mode: str) -> int:
+        """Turn a profile travel time into a mode-specific estimate."""
+        if mode == "transit":
+            # Public transit is slower: add waiting time + slower speed
+            return int(duration_s * 1.5 + 300)  # 50% slower + 5 min wait
+        if mode == "walking":
+            # Walking is slower than driving: ~5 km/h vs 50 km/h
+            return int((dist_km / 5) * 3600)  # Calculate from distance
+        # Driving and carpool use the profile duration as is
+        return int(duration_s)
+
+    def _apply_mode(self, base: Dict[str, Any], mode: str, geometry: str, steps: bool) -> Dict[str, Any]:
+        """Derive a mode-specific route from a cached base route."""
+        dist_km = base["distance_km"]
+        dur_seconds = self._adjust_duration(base["duration_s"], dist_km, mode)
+
+        return {
+            "mode": mode,
+            "distance": dist_km,
+            "duration": dur_seconds,
+            "instructions": self._instructions(base) if steps else "",
+            "geometry": base["geometry"] if geometry != "none" else None
+        }
+
+    @staticmethod
+    def _instructions(base: Dict[str, Any]) -> str:
+        """Join step instructions, parsing raw OSRM steps on first use."""
+        if base.get("instructions") is None:
             instr = []
-            for leg in r0.get("legs", []):
+            for leg in base.get("legs") or []:
                 for step in leg.get("steps", []):
                     instr.append(step.get("maneuver", {}).get("instruction", step.get("name", "")))
-            instructions = " / ".join([s for s in instr if s])
-            
-            route_item = {
-                "mode": mode,
-                "distance": dist_km,
-                "duration": dur_seconds,
-                "instructions": instructions,
-                "geometry": r0.get("geometry")
-            }
-            return {"routes": [route_item], "total_distance": dist_km, "total_duration": dur_seconds}
-            
-        except Exception as e:
-            print(f"OSRM Error: {e}")
-            raise
+            base["instructions"] = " / ".join([s for s in instr if s])
+        return base["instructions"]
+
+    async def _get_base_route(
+        self,
+        profile: str,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float,
+        geometry: str = "none",
+        steps: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the OSRM route for a profile, served from cache when possible.
+        
+        Endpoints are snapped to a small grid so nearby requests share one
+        cache entry; OSRM is queried with the snapped points so the cached
+        route matches its key exactly. A cached route fetched with more detail
+        (geometry or steps) also answers requests needing less, and concurrent
+        misses for the same route share one fetch.
+        
+        Returns:
+            Base route dict, or None if OSRM found no route
+        """
+        start = (round(start_lat, ROUTE_SNAP_DECIMALS), round(start_lon, ROUTE_SNAP_DECIMALS))
+        end = (round(end_lat, ROUTE_SNAP_DECIMALS), round(end_lon, ROUTE_SNAP_DECIMALS))
+        keys = [
+            (profile, start, end, cached_geometry, cached_steps)
+            for cached_geometry in GEOMETRY_SATISFIED_BY[geometry]
+            for cached_steps in ((True,) if steps else (False, True))
+        ]
+
+        for key in keys:
+            entry = self._route_cache.get(key)
+            if entry and datetime.now() < entry["expires_at"]:
+                self._route_cache.move_to_end(key)
+                record_cache("osrm_routes", True)
+                return entry["route"]
+
+        fetch = next((self._route_fetches[key] for key in keys if key in self._route_fetches), None)
+        record_cache("osrm_routes", fetch is not None)
+        if fetch is None:
+            key = (profile, start, end, geometry, steps)
+            fetch = asyncio.ensure_future(self._fetch_base_route(key))
+            self._route_fetches[key] = fetch
+            fetch.add_done_callback(lambda done: self._route_fetch_done(key, done))
+        # Shielded so one caller giving up does not cancel the fetch for the others
+        return await asyncio.shield(fetch)
+
+    async def _fetch_base_route(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Fetch and cache the base route for a cache key."""
+        profile, start, end, geometry, steps = key
+        if self._local_router is not None:
+            # CPU-bound graph search runs off the event loop
+            route = await asyncio.to_thread(
+                self._local_router.route, profile, start[0], start[1], end[0], end[1], geometry, steps
+            )
+        else:
+            route = await self._fetch_osrm_route(profile, start, end, geometry, steps)
+
+        self._cache_route(key, route)
+        return route
+
+    def _route_fetch_done(self, key: Tuple, fetch: "asyncio.Task"):
+        self._route_fetches.pop(key, None)
+        if not fetch.cancelled():
+            # Mark a failure as retrieved even if every waiter gave up
+            fetch.exception()
+
+    async def _fetch_osrm_route(
+        self,
+        profile: str,
+        start: Tuple[float, float],
+        end: Tuple[float, float],
+        geometry: str,
+        steps: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch a base route from the OSRM HTTP API, downloading only what is needed."""
+        coords = f"{start[1]},{start[0]};{end[1]},{end[0]}"
+        url = f"{self.osrm_base}/{profile}/{coords}"
+        params = {
+            "overview": GEOMETRY_OVERVIEW[geometry],
+            "geometries": "polyline6",
+            "steps": "true" if steps else "false"
+        }
+        osrm = await self._get_json(url, params)
+
+        if not osrm.get("routes"):
+            return None
+
+        r0 = osrm["routes"][0]
+        return {
+            "distance_km": r0["distance"] / 1000.0,
+            "duration_s": int(r0["duration"]),
+            # Steps stay raw until instructions are actually requested
+            "legs": r0.get("legs") if steps else None,
+            "instructions": None if steps else "",
+            "geometry": r0.get("geometry") if geometry != "none" else None
+        }
+
+    def _cache_route(self, key: Tuple, route: Optional[Dict[str, Any]]):
+        self._route_cache[key] = {
+            "route": route,
+            "expires_at": datetime.now() + timedelta(seconds=ROUTE_CACHE_TTL_SEC)
+        }
+        self._route_cache.move_to_end(key)
+        # Evict least recently used entries
+        while len(self._route_cache) > ROUTE_CACHE_MAX_ENTRIES:
+            self._route_cache.popitem(last=False)
+
+    async def _get_json(self, url: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        GET an OSRM endpoint over the pooled client, retrying with backoff.
+        
+        Connection errors, timeouts, 429 and 5xx responses are retried up to
+        OSRM_MAX_RETRIES times with exponential backoff and jitter.
+        """
+        client = self._get_client()
+        attempt = 0
+        while True:
+            await upstream_scheduler.acquire(url, Priority.INTERACTIVE)
+            try:
+                with upstream_call("osrm") as call:
+                    resp = await client.get(url, params=params)
+                    call.status = resp.status_code
+                if resp.status_code not in RETRYABLE_STATUS or attempt >= OSRM_MAX_RETRIES:
+                    resp.raise_for_status()
+                    return resp.json()
+                self.logger.warning("OSRM returned %s, retrying", resp.status_code)
+            except httpx.TransportError as e:
+                if attempt >= OSRM_MAX_RETRIES:
+                    raise
+                self.logger.warning("OSRM request failed (%s), retrying", e)
+
+            delay = OSRM_RETRY_BACKOFF_SEC * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            attempt += 1
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=OSRM_TIMEOUT_SEC,
+                headers={"User-Agent": "LA-Interactive-Map/1.0"},
+                limits=httpx.Limits(
+                    max_connections=OSRM_MAX_CONNECTIONS,
+                    max_keepalive_connections=OSRM_MAX_CONNECTIONS
+                )
+            )
+        return self._client
 
     def calculate_carbon_savings(self, distance_km: float, mode: str, passengers: int = 1) -> Dict[str, float]:
         """
@@ -0,0 +1,159 @@
+"""
+Trending venues per zone, maintained incrementally as check-ins arrive.
+
+Each zone keeps sliding windows of time buckets (per-minute buckets for the
+last hour, per-hour buckets for the last day) with a running total per venue,
+so a window's counts are updated when a check-in lands or a bucket expires,
+never recomputed from history. An exponentially decayed score per venue
+favours venues that are busy right now.
+"""
+
+import heapq
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config import TRENDING_HALF_LIFE_SEC
+
+WINDOWS = ("hour", "day", "decay")
+
+# Rebase decayed scores before exp() gets anywhere near float overflow
+_MAX_DECAY_EXPONENT = 500.0
+
+
+class _Window:
+    """Ring of ``slots`` buckets of ``slot_seconds`` each, with running totals."""
+
+    def __init__(self, slot_seconds: int, slots: int):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self.buckets: List[Dict[str, int]] = [{} for _ in range(slots)]
+        self.totals: Dict[str, int] = {}
+        self.current: Optional[int] = None  # absolute index of the newest bucket
+
+    def add(self, poi_id: str, ts: float):
+        slot = int(ts // self.slot_seconds)
+        self.advance(ts)
+        if slot <= self.current - self.slots:
+            return  # already outside the window
+        bucket = self.buckets[slot % self.slots]
+        bucket[poi_id] = bucket.get(poi_id, 0) + 1
+        self.totals[poi_id] = self.totals.get(poi_id, 0) + 1
+
+    def advance(self, now: float):
+        """Expire buckets that have slid out of the window by ``now``."""
+        slot = int(now // self.slot_seconds)
+        if self.current is None:
+            self.current = slot
+            return
+        if slot <= self.current:
+            return
+        for expired in range(max(self.current + 1, slot - self.slots + 1), slot + 1):
+            bucket = self.buckets[expired % self.slots]
+            for poi_id, count in bucket.items():
+                remaining = self.totals[poi_id] - count
+                if remaining:
+                    self.totals[poi_id] = remaining
+                else:
+                    del self.totals[poi_id]
+            bucket.clear()
+        self.current = slot
+
+
+class ZoneTrending:
+    """Trending state for one zone."""
+
+    def __init__(self, half_life_sec: float, now: float):
+        self._lock = threading.Lock()
+        self._windows = {"hour": _Window(60, 60), "day": _Window(3600, 24)}
+        self._decay_rate = math.log(2) / half_life_sec
+        # Scores are stored relative to _base_time so they never need decaying
+        # in place; ordering is the same at any moment
+        self._base_time = now
+        self._scores: Dict[str, float] = {}
+        self._venues: Dict[str, Dict] = {}
+
+    def record(self, venue: Dict, ts: float):
+        poi_id = venue["poi_id"]
+        with self._lock:
+            if poi_id not in self._venues:
+                self._venues[poi_id] = venue
+            for window in self._windows.values():
+                window.add(poi_id, ts)
+            exponent = self._decay_rate * (ts - self._base_time)
+            if exponent > _MAX_DECAY_EXPONENT:
+                self._rebase(ts)
+                exponent = 0.0
+            self._scores[poi_id] = self._scores.get(poi_id, 0.0) + math.exp(exponent)
+
+    def top(self, window: str, limit: int, now: float) -> List[Dict]:
+        with self._lock:
+            if window == "decay":
+                scale = math.exp(-self._decay_rate * (now - self._base_time))
+                scores = self._scores
+            else:
+                scale = 1
+                self._windows[window].advance(now)
+                scores = self._windows[window].totals
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [
+                {**self._venues[poi_id], "score": round(score * scale, 4)}
+                for poi_id, score in best
+            ]
+
+    def _rebase(self, now: float):
+        factor = math.exp(-self._decay_rate * (now - self._base_time))
+        self._scores = {poi_id: score * factor for poi_id, score in self._scores.items()}
+        self._base_time = now
+
+
+class TrendingTracker:
+    """Trending venues for every zone."""
+
+    def __init__(self, half_life_sec: float = TRENDING_HALF_LIFE_SEC):
+        self.half_life_sec = half_life_sec
+        self._zones: Dict[str, ZoneTrending] = {}
+        self._zones_lock = threading.Lock()
+
+    def record_checkin(self, checkin: Dict):
+        """Count a stored check-in at the time it happened."""
+        zone = checkin["zone_name"]
+        tracker = self._zones.get(zone)
+        if tracker is None:
+            with self._zones_lock:
+                tracker = self._zones.get(zone)
+                if tracker is None:
+                    tracker = self._zones[zone] = ZoneTrending(self.half_life_sec, time.time())
+        tracker.record({
+            "poi_name": checkin["poi_name"],
+            "poi_id": checkin["poi_id"],
+            "lat": checkin["poi_lat"],
+            "lon": checkin["poi_lon"],
+            "amenity_type": checkin["amenity_type"]
+        }, _timestamp(checkin["timestamp"]))
+
+    def top(self, zone: str, window: str = "hour", limit: int = 10) -> List[Dict]:
+        """
+        Venues trending in a zone.
+
+        Args:
+            window: "hour" / "day" (check-ins in the last hour or day) or
+                "decay" (exponentially decayed score, TRENDING_HALF_LIFE_SEC)
+            limit: Maximum venues to return
+        """
+        tracker = self._zones.get(zone)
+        if tracker is None or limit <= 0:
+            return []
+        return tracker.top(window, limit, time.time())
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+# Shared by the check-in store and routes
+trending = TrendingTracker()
@@ -0,0 +1,243 @@
+"""
+Shared rate limiter for public upstream APIs (Nominatim, Overpass).
+
+Every outgoing request first takes a token from its host's bucket. When the
+bucket is empty, callers queue by priority class so interactive searches are
+served before background prefetch and zone refreshes. Works from both async
+handlers and sync code running in worker threads.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from enum import IntEnum
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.config import UPSTREAM_QUEUE_TIMEOUTS, UPSTREAM_RATE_LIMITS
+
+logger = logging.getLogger("upstream_scheduler")
+
+
+class Priority(IntEnum):
+    """Priority classes for upstream requests (lower value is served first)."""
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BACKGROUND = 2
+
+
+class UpstreamQueueTimeout(Exception):
+    """Raised when a request waited longer than its queue timeout for a slot."""
+
+
+class _Waiter:
+    """A queued request waiting for a token."""
+
+    __slots__ = ("priority", "granted", "cancelled", "future", "loop", "event", "enqueued_at")
+
+    def __init__(self, priority: Priority, loop=None):
+        self.priority = priority
+        self.granted = False
+        self.cancelled = False
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.enqueued_at = time.monotonic()
+
+    def wake(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+        else:
+            self.event.set()
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class TokenBucket:
+    """Token bucket for one upstream host with a priority queue of waiters."""
+
+    def __init__(self, host: str, rate: float, burst: float):
+        self.host = host
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._queue = []  # heap of (priority, seq, waiter)
+        self._seq = itertools.count()
+
+        # Metrics
+        self._queued = {p: 0 for p in Priority}
+        self._granted = {p: 0 for p in Priority}
+        self._timeouts = {p: 0 for p in Priority}
+        self._wait_total = {p: 0.0 for p in Priority}
+        self._wait_max = {p: 0.0 for p in Priority}
+
+    async def acquire(self, priority: Priority, timeout: float):
+        """Wait (without blocking the event loop) until a token is granted."""
+        waiter = self._enqueue(priority, asyncio.get_running_loop())
+        deadline = waiter.enqueued_at + timeout
+        try:
+            while True:
+                delay = self._poll(waiter, deadline)
+                if delay is None:
+                    return
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            self._cancel(waiter)
+            raise
+
+    def acquire_sync(self, priority: Priority, timeout: float):
+        """Block the calling thread until a token is granted."""
+        waiter = self._enqueue(priority)
+        deadline = waiter.enqueued_at + timeout
+        while True:
+            delay = self._poll(waiter, deadline)
+            if delay is None:
+                return
+            waiter.event.wait(delay)
+
+    def snapshot(self) -> Dict:
+        """Current queue depth and wait statistics for this host."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate_per_sec": self.rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 3),
+                "queue_depth": {p.name.lower(): self._queued[p] for p in Priority},
+                "granted": {p.name.lower(): self._granted[p] for p in Priority},
+                "timeouts": {p.name.lower(): self._timeouts[p] for p in Priority},
+                "avg_wait_ms": {
+                    p.name.lower(): round(1000 * self._wait_total[p] / self._granted[p], 1)
+                    if self._granted[p] else 0.0
+                    for p in Priority
+                },
+                "max_wait_ms": {p.name.lower(): round(1000 * self._wait_max[p], 1) for p in Priority},
+            }
+
+    # ---------------- Internals (all state changes happen under the lock) ----------------
+
+    def _enqueue(self, priority: Priority, loop=None) -> _Waiter:
+        waiter = _Waiter(priority, loop)
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+            self._queued[priority] += 1
+        return waiter
+
+    def _poll(self, waiter: _Waiter, deadline: float) -> Optional[float]:
+        """
+        Hand out available tokens, then report on ``waiter``.
+
+        Returns None once the waiter holds a token, otherwise how long to sleep
+        before polling again. Raises UpstreamQueueTimeout past the deadline.
+        """
+        with self._lock:
+            now = time.monotonic()
+            next_token_in = self._dispatch(now)
+            if waiter.granted:
+                return None
+            remaining = deadline - now
+            if remaining <= 0:
+                self._drop(waiter)
+                self._timeouts[waiter.priority] += 1
+                logger.warning(
+                    "Upstream queue timeout for %s (%s priority)",
+                    self.host, waiter.priority.name.lower()
+                )
+                raise UpstreamQueueTimeout(
+                    f"Timed out waiting for a request slot to {self.host}"
+                )
+            return min(remaining, next_token_in)
+
+    def _dispatch(self, now: float) -> float:
+        """Grant tokens to the highest-priority waiters; return time to next token."""
+        self._refill(now)
+        while self._queue and self._tokens >= 1:
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            self._tokens -= 1
+            waiter.granted = True
+            self._queued[waiter.priority] -= 1
+            self._granted[waiter.priority] += 1
+            waited = now - waiter.enqueued_at
+            self._wait_total[waiter.priority] += waited
+            self._wait_max[waiter.priority] = max(self._wait_max[waiter.priority], waited)
+            waiter.wake()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _drop(self, waiter: _Waiter):
+        # Lazy deletion: the heap entry is skipped when it reaches the top
+        waiter.cancelled = True
+        self._queued[waiter.priority] -= 1
+
+    def _cancel(self, waiter: _Waiter):
+        with self._lock:
+            if waiter.granted:
+                # Caller gave up after being granted; give the token back
+                self._tokens = min(self.burst, self._tokens + 1)
+            elif not waiter.cancelled:
+                self._drop(waiter)
+
+
+class UpstreamScheduler:
+    """Routes upstream requests to the token bucket for their host."""
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]]):
+        self._buckets = {
+            host: TokenBucket(host, rate, burst)
+            for host, (rate, burst) in limits.items()
+        }
+
+    async def acquire(self, url: str, priority: Priority = Priority.INTERACTIVE, timeout: Optional[float] = None):
+        """
+        Wait for permission to send a request to ``url``.
+
+        Args:
+            url: Upstream URL; hosts (host[:port]) without a configured limit pass straight through
+            priority: Priority class of the request
+            timeout: Seconds to wait before giving up (defaults by priority)
+
+        Raises:
+            UpstreamQueueTimeout: If no slot became available in time
+        """
+        bucket = self._bucket_for(url)
+        if bucket:
+            await bucket.acquire(priority, self._timeout(priority, timeout))
+
+    def acquire_sync(self, url: str, priority: Priority = Priority.BACKGROUND, timeout: Optional[float] = None):
+        """Blocking variant of acquire() for code that uses sync HTTP clients."""
+        bucket = self._bucket_for(url)
+        if bucket:
+            bucket.acquire_sync(priority, self._timeout(priority, timeout))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Queue depth and wait metrics for every rate-limited host."""
+        return {host: bucket.snapshot() for host, bucket in self._buckets.items()}
+
+    def _bucket_for(self, url: str) -> Optional[TokenBucket]:
+        return self._buckets.get(urlsplit(url).netloc)
+
+    @staticmethod
+    def _timeout(priority: Priority, timeout: Optional[float]) -> float:
+        if timeout is not None:
+            return timeout
+        return UPSTREAM_QUEUE_TIMEOUTS[priority.name.lower()]
+
+
+# Shared by every service in the process
+upstream_scheduler = UpstreamScheduler(UPSTREAM_RATE_LIMITS)
@@ -0,0 +1,71 @@
+"""
+Real LA venues and check-in caption templates, shared by the demo check-ins
+and the synthetic dataset generator. Plain data: importing this module does
+not create or touch the check-in store.
+"""
+
+# LA neighborhoods and their popular venues (real locations)
+LA_VENUES = {
+    "Long Beach Zone": [
+        {"name": "Aquarium of the Pacific", "lat": 33.7621, "lon": -118.1975, "type": "attraction"},
+        {"name": "The Queen Mary", "lat": 33.7526, "lon": -118.1906, "type": "attraction"},
+        {"name": "Long Beach Museum of Art", "lat": 33.7642, "lon": -118.1790, "type": "museum"},
+        {"name": "Shoreline Village", "lat": 33.7622, "lon": -118.1900, "type": "attraction"},
+        {"name": "El Dorado Nature Center", "lat": 33.8293, "lon": -118.0857, "type": "park"},
+        {"name": "The Pike Outlets", "lat": 33.7633, "lon": -118.1926, "type": "shopping"},
+        {"name": "Parkers' Lighthouse", "lat": 33.7617, "lon": -118.1899, "type": "restaurant"}
+    ],
+    "Pasadena Zone": [
+        {"name": "Rose Bowl Stadium", "lat": 34.1613, "lon": -118.1677, "type": "stadium"},
+        {"name": "Norton Simon Museum", "lat": 34.1463, "lon": -118.1587, "type": "museum"},
+        {"name": "The Huntington Library", "lat": 34.1285, "lon": -118.1140, "type": "attraction"},
+        {"name": "Old Pasadena", "lat": 34.1461, "lon": -118.1514, "type": "attraction"},
+        {"name": "Eaton Canyon Nature Center", "lat": 34.1783, "lon": -118.0952, "type": "park"},
+        {"name": "Gamble House", "lat": 34.1516, "lon": -118.1588, "type": "attraction"}
+    ],
+    "Universal City Zone": [
+        {"name": "Universal Studios Hollywood", "lat": 34.1381, "lon": -118.3534, "type": "theme_park"},
+        {"name": "Universal CityWalk", "lat": 34.1367, "lon": -118.3513, "type": "entertainment"},
+        {"name": "Studio Tour", "lat": 34.1391, "lon": -118.3533, "type": "attraction"},
+        {"name": "The Wizarding World of Harry Potter", "lat": 34.1385, "lon": -118.3521, "type": "attraction"},
+        {"name": "Universal Cinema", "lat": 34.1369, "lon": -118.3516, "type": "entertainment"}
+    ],
+    "Anaheim Zone": [
+        {"name": "Disneyland Park", "lat": 33.8121, "lon": -117.9190, "type": "theme_park"},
+        {"name": "Disney California Adventure", "lat": 33.8061, "lon": -117.9215, "type": "theme_park"},
+        {"name": "Downtown Disney", "lat": 33.8088, "lon": -117.9252, "type": "entertainment"},
+        {"name": "Anaheim Convention Center", "lat": 33.8019, "lon": -117.9228, "type": "convention_center"},
+        {"name": "Angel Stadium", "lat": 33.8003, "lon": -117.8827, "type": "stadium"},
+        {"name": "Honda Center", "lat": 33.8078, "lon": -117.8768, "type": "stadium"}
+    ],
+    "Carson Zone": [
+        {"name": "Dignity Health Sports Park", "lat": 33.8644, "lon": -118.2611, "type": "stadium"},
+        {"name": "International Printing Museum", "lat": 33.8507, "lon": -118.2820, "type": "museum"},
+        {"name": "SouthBay Pavilion", "lat": 33.8606, "lon": -118.2820, "type": "shopping"},
+        {"name": "Goodyear Blimp Base", "lat": 33.8671, "lon": -118.2567, "type": "attraction"}
+    ]
+}
+
+# Update caption templates to reference new locations
+CAPTIONS = [
+    "Best spot in LA! 🌟",
+    "Amazing vibes here ✨",
+    "Had to check this place out 👀",
+    "Finally made it! Worth the hype 🙌",
+    "Can't beat these views 📸",
+    "Hidden gem in {zone} 💎",
+    "My new favorite spot 🎯",
+    "So much history here 🏛️",
+    "The food was incredible 😋",
+    "Perfect evening out 🌅",
+    "Already planning my next visit! 🗓️",
+    "A must-visit in LA 🌴",
+    "{venue} never disappoints ⭐",
+    "Tourist mode activated 📸",
+    "Living my best LA life 🌞"
+    "Loving {zone} vibes 🌟",
+    "Perfect day at {venue} 🎡",
+    "SoCal adventures continue! 🌴",
+    "Weekend fun in {zone} 🎉",
+    "Tourist mode: activated 📸"
+]
@@ -2,20 +2,106 @@
 Zone service for managing LA zone definitions and polygon data.
 """
 
+import asyncio
 from typing import List
 import requests
 import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from app.config import NOMINATIM_BASE_URL, ZONE_CACHE_TTL_SEC, ZONE_FETCH_TIMEOUT_SEC, ZONE_RETRY_SEC
 from app.models.schemas import ZonePolygon
+from app.services.upstream_scheduler import Priority, UpstreamQueueTimeout, upstream_scheduler
+from app.utils.metrics import record_cache, upstream_call
 from collections import Counter
 
+logger = logging.getLogger("zone_service")
+
+# Zone polygons barely change, so they are fetched once and reused
+_zone_cache = {"zones": [], "expires_at": datetime.min}
+_zone_refresh_lock = threading.Lock()
+
+
+# Approximate centre of every zone
+ZONE_CENTERS = {
+    "Long Beach Zone": (33.7701, -118.1937),
+    "Pomona Zone": (34.0551, -117.7500),
+    "Whittier Narrows Zone": (34.0350, -118.0600),
+    "City of Industry Zone": (34.0197, -117.9587),
+    "Anaheim Zone": (33.8353, -117.9145),
+    "Valley Zone": (34.2819, -118.4390),
+    "Arcadia Zone": (34.1397, -118.0353),
+    "Carson Zone": (33.8317, -118.2817),
+    "Pasadena Zone": (34.1478, -118.1445),
+    "Universal City Zone": (34.1381, -118.3534),
+    "Inglewood Zone": (33.9617, -118.3531),
+    "Port of Los Angeles Zone": (33.7361, -118.2639),
+}
+
 
 def get_la_zones() -> List[ZonePolygon]:
     """
     Get predefined LA zones with their polygon coordinates and colors.
+    Polygons are cached and only refetched from Nominatim once the cache expires.
+
+    Blocks while a refresh is running; async code should use get_la_zones_async().
+    """
+    if datetime.now() < _zone_cache["expires_at"]:
+        record_cache("zone_polygons", True)
+        return _zone_cache["zones"]
+
+    # Only one caller refreshes; the rest wait and reuse its result
+    with _zone_refresh_lock:
+        if datetime.now() < _zone_cache["expires_at"]:
+            record_cache("zone_polygons", True)
+            return _zone_cache["zones"]
+
+        record_cache("zone_polygons", False)
+        previous = {zone.name: zone for zone in _zone_cache["zones"]}
+        # Nothing to serve yet means requests are waiting on this fetch
+        priority = Priority.BACKGROUND if previous else Priority.PREFETCH
+        fetched = {zone.name: zone for zone in fetch_la_zones(priority)}
+        zone_names = get_zone_name('')
+
+        if len(fetched) == len(zone_names):
+            ttl = ZONE_CACHE_TTL_SEC
+        else:
+            # Keep the old polygon of any zone that failed and try again soon,
+            # rather than caching an incomplete list for a whole TTL
+            logger.warning("Fetched %d of %d zones, retrying in %.0fs", len(fetched), len(zone_names), ZONE_RETRY_SEC)
+            ttl = ZONE_RETRY_SEC
+        merged = {**previous, **fetched}
+        _zone_cache["zones"] = [merged[name] for name in zone_names if name in merged]
+        _zone_cache["expires_at"] = datetime.now() + timedelta(seconds=ttl)
+        return _zone_cache["zones"]
+
+
+async def get_la_zones_async() -> List[ZonePolygon]:
+    """
+    get_la_zones() for async handlers. The refresh runs on a worker thread, and
+    while older polygons are cached they are returned straight away and
+    refreshed in the background.
+    """
+    if datetime.now() < _zone_cache["expires_at"]:
+        record_cache("zone_polygons", True)
+        return _zone_cache["zones"]
+
+    if _zone_cache["zones"]:
+        if not _zone_refresh_lock.locked():
+            asyncio.get_running_loop().run_in_executor(None, get_la_zones)
+        record_cache("zone_polygons", True)
+        return _zone_cache["zones"]
+    return await asyncio.get_running_loop().run_in_executor(None, get_la_zones)
+
+
+def fetch_la_zones(priority: Priority = Priority.BACKGROUND) -> List[ZonePolygon]:
+    """
+    Fetch zone polygons from Nominatim, one rate-limited request per zone.
+    Zones that time out or fail are left out of the result.
     """
     zones = []
     headers = {"User-Agent": "BuilHackAgent/1.0"}
-    search_url = "https://nominatim.openstreetmap.org/search"
+    search_url = f"{NOMINATIM_BASE_URL}/search"
     zones_list = get_zone_name('')
     for zone in zones_list:
         zone_info = get_zone_name(zone)
@@ -25,9 +111,22 @@ def get_la_zones() -> List[ZonePolygon]:
             "limit": 1,
             "polygon_geojson": 1,
         }
-        print(f"Full URL: {search_url}?{requests.compat.urlencode(search_params)}")
-        response = requests.get(search_url, params=search_params, headers=headers)
-        data = response.json()
+        logger.debug("Fetching zone polygon: %s?%s", search_url, requests.compat.urlencode(search_params))
+        try:
+            upstream_scheduler.acquire_sync(search_url, priority)
+        except UpstreamQueueTimeout as e:
+            logger.warning("Skipping zone %s: %s", zone, e)
+            continue
+        try:
+            with upstream_call("nominatim") as call:
+                response = requests.get(search_url, params=search_params, headers=headers,
+                                        timeout=ZONE_FETCH_TIMEOUT_SEC)
+                call.status = response.status_code
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Skipping zone %s: %s", zone, e)
+            continue
         if data:
             geometry = data[0]["geojson"]
 
@@ -39,7 +138,7 @@ def get_la_zones() -> List[ZonePolygon]:
                 coordinates = max(geometry["coordinates"], key=lambda x: len(x[0]))
 
             if(len(coordinates) == 0):
-                    print("No coordinates found for: ", zone)
+                    logger.warning("No coordinates found for %s", zone)
             zones.append(
                 ZonePolygon(name= zone, color= zone_info[1], coordinates=coordinates)
             )
@@ -2,8 +2,9 @@
 Geographic utility functions for distance calculations and coordinate operations.
 """
 
+import heapq
 import math
-from typing import Tuple
+from typing import List, Tuple
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -63,3 +64,213 @@ def find_closest_point(user_lat: float, user_lon: float, points: list) -> dict:
             closest_point = point
     
     return closest_point
+
+def to_unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    """
+    Convert latitude/longitude to a point on the unit sphere.
+    
+    Args:
+        lat, lon: Coordinates in degrees
+    
+    Returns:
+        (x, y, z) Cartesian coordinates
+    """
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    cos_lat = math.cos(lat_rad)
+    return (cos_lat * math.cos(lon_rad), cos_lat * math.sin(lon_rad), math.sin(lat_rad))
+
+class PointIndex:
+    """
+    KD-tree over points on the unit sphere for nearest-neighbour queries.
+    
+    Straight-line (chord) distance between unit vectors orders points the
+    same way as great-circle distance, so the tree can prune with plain
+    per-axis comparisons and only convert the k winners back to kilometers.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, points: List[dict]):
+        """
+        Args:
+            points: List of dictionaries with 'lat' and 'lon' keys
+        """
+        self.points = points
+        vectors = [to_unit_vector(float(p['lat']), float(p['lon'])) for p in points]
+        self._xyz = vectors
+        # Flat node arrays; leaves store a slice of self._order
+        self._axis: List[int] = []
+        self._split: List[float] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._order = list(range(len(points)))
+        if points:
+            self._build(0, len(points))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[float, dict]]:
+        """
+        Find the k points closest to a location.
+        
+        Args:
+            lat, lon: Query coordinates
+            k: Number of neighbours to return
+        
+        Returns:
+            List of (distance_km, point) tuples sorted by distance
+        """
+        if not self.points or k <= 0:
+            return []
+
+        query = to_unit_vector(lat, lon)
+        best: List[Tuple[float, int]] = []  # max-heap of (-chord², index)
+        self._search(0, query, k, best)
+
+        results = []
+        for neg_d2, i in sorted(best, reverse=True):
+            chord = math.sqrt(-neg_d2)
+            results.append((2 * 6371.0 * math.asin(min(1.0, chord / 2)), self.points[i]))
+        return results
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._axis)
+        self._axis.append(-1)
+        self._split.append(0.0)
+        self._left.append(start)
+        self._right.append(end)
+        if end - start <= self.LEAF_SIZE:
+            return node
+
+        # Split on the axis with the widest spread
+        idx = self._order[start:end]
+        spreads = []
+        for a in range(3):
+            values = [self._xyz[i][a] for i in idx]
+            spreads.append(max(values) - min(values))
+        axis = spreads.index(max(spreads))
+        idx.sort(key=lambda i: self._xyz[i][axis])
+        self._order[start:end] = idx
+        mid = (start + end) // 2
+
+        self._axis[node] = axis
+        self._split[node] = self._xyz[self._order[mid]][axis]
+        self._left[node] = self._build(start, mid)
+        self._right[node] = self._build(mid, end)
+        return node
+
+    def _search(self, node: int, query: Tuple[float, float, float], k: int, best: list):
+        axis = self._axis[node]
+        if axis < 0:
+            qx, qy, qz = query
+            for i in self._order[self._left[node]:self._right[node]]:
+                x, y, z = self._xyz[i]
+                d2 = (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+                if len(best) < k:
+                    heapq.heappush(best, (-d2, i))
+                elif d2 < -best[0][0]:
+                    heapq.heapreplace(best, (-d2, i))
+            return
+
+        diff = query[axis] - self._split[node]
+        near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+        self._search(near, query, k, best)
+        # Only cross the splitting plane if it is closer than the current k-th best
+        if len(best) < k or diff * diff < -best[0][0]:
+            self._search(far, query, k, best)
+
+def encode_polyline(coords: List[Tuple[float, float]], precision: int = 6) -> str:
+    """
+    Encode a path with the Google polyline algorithm (polyline6 by default).
+    
+    Args:
+        coords: List of (lat, lon) tuples
+        precision: Decimal places kept (6 matches OSRM's polyline6)
+    
+    Returns:
+        Encoded polyline string
+    """
+    factor = 10 ** precision
+    out = []
+    prev_lat = prev_lon = 0
+    for lat, lon in coords:
+        ilat, ilon = int(round(lat * factor)), int(round(lon * factor))
+        for delta in (ilat - prev_lat, ilon - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        prev_lat, prev_lon = ilat, ilon
+    return "".join(out)
+
+def simplify_path(coords: List[Tuple[float, float]], tolerance_m: float = 10.0) -> List[Tuple[float, float]]:
+    """
+    Simplify a path with the Douglas-Peucker algorithm.
+    
+    Args:
+        coords: List of (lat, lon) tuples
+        tolerance_m: Maximum deviation in meters of dropped points
+    
+    Returns:
+        Subset of the input points, always keeping both endpoints
+    """
+    if len(coords) < 3:
+        return list(coords)
+
+    # Local equirectangular projection to meters is plenty at city scale
+    lat0 = math.radians(coords[0][0])
+    xy = [(math.radians(lon) * math.cos(lat0) * 6371000.0, math.radians(lat) * 6371000.0) for lat, lon in coords]
+
+    keep = [False] * len(coords)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(coords) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        seg_len2 = dx * dx + dy * dy
+        max_d, index = 0.0, first
+        for i in range(first + 1, last):
+            px, py = xy[i]
+            if seg_len2 == 0:
+                d = math.hypot(px - x1, py - y1)
+            else:
+                t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / seg_len2))
+                d = math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+            if d > max_d:
+                max_d, index = d, i
+        if max_d > tolerance_m:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [c for c, k in zip(coords, keep) if k]
+
+
+# Web Mercator's latitude limit; slippy-map tiles cover only this band
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def lat_lon_to_pixel(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    """
+    Global Web Mercator cell of a point at a zoom level, where the world is
+    2^zoom x 2^zoom cells (so at a tile zoom these are the tile x / y).
+    """
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    n = 1 << zoom
+    x = (lon + 180.0) / 360.0 * n
+    lat_rad = math.radians(lat)
+    y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return min(n - 1, max(0, int(x))), min(n - 1, max(0, int(y)))
+
+
+def tile_to_quadkey(x: int, y: int, zoom: int) -> str:
+    """Bing-style quadkey of a slippy-map tile (one base-4 digit per zoom level)."""
+    digits = []
+    for level in range(zoom, 0, -1):
+        mask = 1 << (level - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return "".join(digits)
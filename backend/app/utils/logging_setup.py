@@ -0,0 +1,75 @@
+"""
+Application logging: leveled, queued and sampled.
+
+Handlers write to stderr from a background thread (QueueHandler ->
+QueueListener), so a log call on the event loop only formats the message and
+puts it on a queue instead of blocking on terminal or pipe I/O.
+
+Per-request DEBUG/INFO messages go through SampledLogger, which drops all but
+LOG_SAMPLE_RATE of them before any formatting happens. Warnings and errors are
+always logged.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+from typing import Optional
+
+from app.config import LOG_LEVEL, LOG_SAMPLE_RATE
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Libraries that log every upstream request at INFO, bypassing the sampling;
+# only their warnings and errors are kept
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: str = LOG_LEVEL):
+    """Route the root logger through a queue to a stderr handler (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class SampledLogger:
+    """
+    Wraps a logger so debug() and info() emit only a ``rate`` fraction of
+    calls. Meant for messages logged on every request.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: float = LOG_SAMPLE_RATE):
+        self.logger = logger
+        self.rate = rate
+
+    def debug(self, msg: str, *args):
+        if self.logger.isEnabledFor(logging.DEBUG) and random.random() < self.rate:
+            self.logger.debug(msg, *args)
+
+    def info(self, msg: str, *args):
+        if self.logger.isEnabledFor(logging.INFO) and random.random() < self.rate:
+            self.logger.info(msg, *args)
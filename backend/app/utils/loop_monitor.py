@@ -0,0 +1,75 @@
+"""
+Event-loop lag monitor.
+
+A background task sleeps for a fixed interval and measures how late it wakes
+up. The overshoot is how long ready callbacks waited behind whatever was
+running on the loop (blocking calls, CPU-heavy handlers), i.e. the delay
+added to every request being served at that moment.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+from app.config import LOOP_LAG_INTERVAL_SEC, LOOP_LAG_WINDOW
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag and keeps the last ``window`` samples."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SEC, window: int = LOOP_LAG_WINDOW,
+                 on_sample: Optional[Callable[[float], None]] = None):
+        self.interval = interval
+        # Called with every lag sample in seconds (e.g. to feed a histogram)
+        self.on_sample = on_sample
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        # Heartbeat for watchdogs in other threads: the loop's thread and the
+        # time.monotonic() of its latest wake-up (None until started)
+        self.thread_id: Optional[int] = None
+        self.last_wake: Optional[float] = None
+
+    def start(self):
+        """Start sampling on the running loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict:
+        """Lag in milliseconds: the latest sample, and p50 / p99 / max over the window."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"current_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "samples": 0}
+        return {
+            "current_ms": round(self._samples[-1] * 1000, 2),
+            "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2),
+            "samples": len(samples),
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        self.thread_id = threading.get_ident()
+        while True:
+            self.last_wake = time.monotonic()
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._samples.append(lag)
+            if self.on_sample is not None:
+                self.on_sample(lag)
+
+
+# Started with the app; reported by /health and /metrics
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,353 @@
+"""
+In-process metrics in the Prometheus text format, and per-request timing spans.
+
+Counters, gauges and histograms are registered on a module-level registry and
+rendered by GET /metrics. Updates are a dict lookup and an addition under a
+lock, cheap enough for every request and upstream call.
+
+Spans time the parts of one request (upstream calls, cache lookups, heavy
+processing). They are collected in a context variable by MetricsMiddleware
+and returned in the Server-Timing response header, so browser dev tools and
+load tests can see where a slow request spent its time.
+"""
+
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.upstream_scheduler import upstream_scheduler
+from app.utils.loop_monitor import loop_monitor
+
+# Latency buckets in seconds, from cache hits to slow Overpass queries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; can instead be read from a callback at render time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> Iterable[str]:
+        if self._callback is not None:
+            values = list(self._callback().items())
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [count per bucket (not cumulative)..., sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * len(self.buckets) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(counts[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class MetricsRegistry:
+    """All metrics exposed by /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric name: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled, by route template and status.", ("method", "route", "status")))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to the end of the response, by route template.", ("method", "route")))
+HTTP_IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled."))
+UPSTREAM_REQUESTS = registry.register(Counter(
+    "upstream_requests_total", "Requests to upstream APIs, by outcome (status code or error).",
+    ("service", "outcome")))
+UPSTREAM_LATENCY = registry.register(Histogram(
+    "upstream_request_duration_seconds", "Upstream API response time, excluding rate-limit queueing.",
+    ("service",)))
+CACHE_REQUESTS = registry.register(Counter(
+    "cache_requests_total", "Cache lookups, by cache and result (hit or miss).", ("cache", "result")))
+LOOP_LAG = registry.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a sleeping task.", (),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)))
+loop_monitor.on_sample = LOOP_LAG.observe
+LOOP_BLOCKS = registry.register(Counter(
+    "event_loop_blocks_total", "Event-loop stalls longer than LOOP_BLOCK_THRESHOLD_SEC."))
+
+
+def _recent_loop_lag() -> Dict[Tuple[str, ...], float]:
+    lag = loop_monitor.snapshot()
+    return {(stat,): lag[f"{stat}_ms"] / 1000 for stat in ("current", "p50", "p99", "max")}
+
+
+def _scheduler_queue_depth() -> Dict[Tuple[str, ...], float]:
+    return {
+        (host, priority): depth
+        for host, bucket in upstream_scheduler.snapshot().items()
+        for priority, depth in bucket["queue_depth"].items()
+    }
+
+
+def _scheduler_tokens() -> Dict[Tuple[str, ...], float]:
+    return {(host,): bucket["tokens"] for host, bucket in upstream_scheduler.snapshot().items()}
+
+
+registry.register(Gauge(
+    "event_loop_lag_recent_seconds", "Event-loop lag over the monitor's recent window.", ("stat",),
+    callback=_recent_loop_lag))
+registry.register(Gauge(
+    "upstream_queue_depth", "Requests waiting for an upstream rate-limit token.", ("host", "priority"),
+    callback=_scheduler_queue_depth))
+registry.register(Gauge(
+    "upstream_tokens_available", "Rate-limit tokens currently available per upstream host.", ("host",),
+    callback=_scheduler_tokens))
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# ---------------- Request spans ----------------
+
+class RequestTrace:
+    """Timing spans of one request, in the order they finished."""
+
+    __slots__ = ("spans",)
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: name;dur=milliseconds, repeated names summed."""
+        totals: Dict[str, float] = {}
+        for name, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("request_trace", default=None)
+
+
+def start_trace() -> Tuple[RequestTrace, contextvars.Token]:
+    trace = RequestTrace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token: contextvars.Token):
+    _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str):
+    """Time a block as a span of the current request (no-op outside a request)."""
+    trace = _current_trace.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.spans.append((name, time.perf_counter() - started))
+
+
+class UpstreamCall:
+    """Set ``status`` inside an upstream_call block to record the response code."""
+
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status: Optional[int] = None
+
+
+@contextmanager
+def upstream_call(service: str):
+    """
+    Time one upstream HTTP request: latency histogram, outcome counter and a
+    request span named after the service.
+    """
+    call = UpstreamCall()
+    outcome = "error"
+    started = time.perf_counter()
+    try:
+        yield call
+        outcome = str(call.status) if call.status is not None else "ok"
+    except BaseException as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_LATENCY.observe(elapsed, service=service)
+        UPSTREAM_REQUESTS.inc(service=service, outcome=outcome)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append((service, elapsed))
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request count and latency by route, plus the Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = start_trace()
+        started = time.perf_counter()
+        status = 500
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                trace.spans.append(("app", time.perf_counter() - started))
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"server-timing", trace.server_timing().encode("latin-1"))
+                ]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            end_trace(token)
+            # Route templates keep label values bounded; unknown paths share one
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - started, method=scope["method"], route=route)
@@ -0,0 +1,387 @@
+"""
+On-demand request profiling and event-loop block detection.
+
+Request profiles (enabled by PROFILE_TOKEN): a request carrying the token in
+the X-Profile-Token header, or as ``?profile=<token>``, gets a sampler thread
+that looks at the request's asyncio task every PROFILE_SAMPLE_INTERVAL_SEC:
+
+- task running: the event-loop thread's stack, i.e. on-CPU work such as JSON
+  parsing, Pydantic validation or POI categorization;
+- task suspended: the chain of coroutines it is awaiting, ending in a
+  ``(waiting)`` frame, i.e. upstream I/O, rate-limit queueing, thread pools.
+
+Tasks started inside the request (e.g. the body of a StreamingResponse) are
+tracked through a task factory and sampled as part of it.
+
+Samples are wall-clock, so the profile adds up to the request's duration. It
+is kept as collapsed stacks ("frame;frame;frame count" lines), the input
+format of flamegraph.pl, speedscope and inferno, and its id is returned in
+the X-Profile-Id response header.
+
+Loop block detection: a watchdog thread checks the loop monitor's heartbeat.
+When the loop has not woken for LOOP_BLOCK_THRESHOLD_SEC it samples the loop
+thread's stack until the loop recovers, then logs the stall with its hottest
+stack and keeps it for /debug/loop-blocks.
+"""
+
+import asyncio
+import contextvars
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from app.config import (
+    LOOP_BLOCK_HISTORY,
+    LOOP_BLOCK_THRESHOLD_SEC,
+    PROFILE_DIR,
+    PROFILE_HISTORY,
+    PROFILE_SAMPLE_INTERVAL_SEC,
+)
+from app.utils.loop_monitor import LoopLagMonitor, loop_monitor
+from app.utils.metrics import LOOP_BLOCKS
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_QUERY_PARAM = "profile"
+
+logger = logging.getLogger("profiling")
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + os.sep
+
+
+# ---------------- Stacks ----------------
+
+def _short_filename(filename: str) -> str:
+    if filename.startswith(_BACKEND_ROOT):
+        return filename[len(_BACKEND_ROOT):]
+    marker = filename.rfind("site-packages" + os.sep)
+    if marker >= 0:
+        return filename[marker + len("site-packages") + 1:]
+    return os.path.basename(filename)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    # ';' separates frames in the collapsed format
+    return f"{code.co_qualname} ({_short_filename(code.co_filename)}:{frame.f_lineno})".replace(";", ",")
+
+
+def thread_stack(thread_id: int, root_frame=None) -> Optional[List[str]]:
+    """
+    Current stack of a thread, outermost frame first. With ``root_frame``,
+    only the frames from it down, or None if it is not on the stack.
+    """
+    frame = sys._current_frames().get(thread_id)
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        if frame is root_frame:
+            break
+        frame = frame.f_back
+    else:
+        if root_frame is not None:
+            return None
+    labels.reverse()
+    return labels
+
+
+def await_chain(coro) -> List[str]:
+    """Frames of a suspended coroutine and everything it is awaiting, outermost first."""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None:
+            labels.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    labels.append("(waiting)")
+    return labels
+
+
+class CollapsedStacks:
+    """Sample counts per stack, rendered in the collapsed (folded) format."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+
+    def add(self, stack: List[str]):
+        self.counts[";".join(stack)] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def hottest(self) -> Optional[str]:
+        """Leaf frame of the most sampled stack."""
+        if not self.counts:
+            return None
+        stack, _ = self.counts.most_common(1)[0]
+        return stack.rsplit(";", 1)[-1]
+
+    def render(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+# ---------------- Request profiles ----------------
+
+class RequestProfile:
+    """Wall-clock samples of one request."""
+
+    def __init__(self, method: str, path: str, query: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.query = query
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.status: Optional[int] = None
+        self.stacks = CollapsedStacks()
+        self.on_cpu_samples = 0
+        # Unfinished tasks created during the request, oldest first
+        self.tasks: Dict[asyncio.Task, None] = {}
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status": self.status,
+            "started_at": round(self.started_at, 3),
+            "duration_ms": round(self.duration_ms, 1),
+            "samples": self.stacks.total,
+            "on_cpu_samples": self.on_cpu_samples,
+            "hottest": self.stacks.hottest(),
+        }
+
+
+class ProfileStore:
+    """The most recent profiles, optionally also written to ``directory``."""
+
+    def __init__(self, history: int = PROFILE_HISTORY, directory: Optional[str] = PROFILE_DIR):
+        self._profiles: Deque[RequestProfile] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.directory = directory
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.append(profile)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{profile.id}.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profile.stacks.render())
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return [p.summary() for p in reversed(self._profiles)]
+
+
+profile_store = ProfileStore()
+
+# The profile of the request being handled; inherited by tasks it starts
+_active_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop):
+    """Record tasks created under a profiled request in its RequestProfile."""
+    inner = loop.get_task_factory()
+    if getattr(inner, "tracks_profiles", False):
+        return
+
+    def factory(loop, coro, **kwargs):
+        if inner is None:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        else:
+            task = inner(loop, coro, **kwargs)
+        profile = _active_profile.get()
+        if profile is not None:
+            profile.tasks[task] = None
+            task.add_done_callback(lambda t: profile.tasks.pop(t, None))
+        return task
+
+    factory.tracks_profiles = True
+    loop.set_task_factory(factory)
+
+
+class _TaskSampler(threading.Thread):
+    """Samples a request's asyncio tasks from outside the event loop until stopped."""
+
+    def __init__(self, task: asyncio.Task, loop_thread_id: int, profile: RequestProfile,
+                 store: ProfileStore, interval: float):
+        super().__init__(name=f"profile-{profile.id}", daemon=True)
+        self.task = task
+        self.loop_thread_id = loop_thread_id
+        self.profile = profile
+        self.store = store
+        self.interval = interval
+        self.finished = threading.Event()
+
+    def run(self):
+        root = self.task.get_coro()
+        profile = self.profile
+        while not self.finished.wait(self.interval):
+            children = [task.get_coro() for task in list(profile.tasks)]
+            running = next((c for c in [root] + children if getattr(c, "cr_running", False)), None)
+            if running is not None:
+                stack = thread_stack(self.loop_thread_id, running.cr_frame)
+                if stack is None:
+                    continue  # the task stepped off the loop mid-sample
+                if running is not root:
+                    # Nest child work under the point where the request awaits it
+                    stack = await_chain(root)[:-1] + stack
+                profile.on_cpu_samples += 1
+            elif children:
+                stack = await_chain(root)[:-1] + await_chain(children[-1])
+            else:
+                stack = await_chain(root)
+            profile.stacks.add(stack)
+        # Stored from this thread, so a PROFILE_DIR write never touches the loop
+        self.store.add(profile)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that carry ``token``. The ``profile``
+    query flag is removed before the request reaches the app, so the token
+    stays out of handlers and access logs. Paths under ``exclude_prefix``
+    (the profile viewer, which takes the same header) are never profiled.
+    """
+
+    def __init__(self, app, token: str, store: ProfileStore = profile_store,
+                 interval: float = PROFILE_SAMPLE_INTERVAL_SEC, exclude_prefix: str = "/debug"):
+        self.app = app
+        self.token = token.encode()
+        self.store = store
+        self.interval = interval
+        self.exclude_prefix = exclude_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        supplied = self._take_token(scope)
+        if supplied is None:
+            await self.app(scope, receive, send)
+            return
+        if not hmac.compare_digest(supplied, self.token):
+            await send({"type": "http.response.start", "status": 403,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": b'{"detail":"Invalid profile token"}'})
+            return
+
+        _install_task_factory(asyncio.get_running_loop())
+        profile = RequestProfile(scope["method"], scope["path"], scope["query_string"].decode("latin-1"))
+        sampler = _TaskSampler(asyncio.current_task(), threading.get_ident(), profile, self.store, self.interval)
+
+        async def profiled_send(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        token = _active_profile.set(profile)
+        sampler.start()
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            profile.duration_ms = (time.perf_counter() - started) * 1000
+            sampler.finished.set()
+            _active_profile.reset(token)
+
+    @staticmethod
+    def _take_token(scope) -> Optional[bytes]:
+        """The profile token from the header or query flag; the flag is stripped from the scope."""
+        token = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                token = value
+        query = scope["query_string"]
+        if PROFILE_QUERY_PARAM.encode() in query:
+            params = parse_qsl(query.decode("latin-1"), keep_blank_values=True)
+            kept = [(k, v) for k, v in params if k != PROFILE_QUERY_PARAM]
+            if len(kept) != len(params):
+                token = token or next(v for k, v in params if k == PROFILE_QUERY_PARAM).encode("latin-1")
+                # Same dict the server logs from, so the access log loses the token too
+                scope["query_string"] = urlencode(kept).encode("latin-1")
+        return token
+
+
+# ---------------- Event-loop blocks ----------------
+
+class LoopBlockDetector:
+    """
+    Watchdog thread: when ``monitor`` has not woken for ``threshold`` seconds
+    past its interval, samples the loop thread's stack until it recovers.
+    """
+
+    def __init__(self, monitor: LoopLagMonitor = loop_monitor, threshold: float = LOOP_BLOCK_THRESHOLD_SEC,
+                 history: int = LOOP_BLOCK_HISTORY, sample_interval: float = PROFILE_SAMPLE_INTERVAL_SEC):
+        self.monitor = monitor
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self._events: Deque[Dict] = deque(maxlen=history)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.threshold <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="loop-block-detector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def events(self) -> List[Dict]:
+        """Recorded stalls, most recent first."""
+        return list(reversed(self._events))
+
+    def _run(self):
+        check_interval = max(0.01, self.threshold / 2)
+        while not self._stop.wait(check_interval):
+            beat = self.monitor.last_wake
+            if beat is None or self.monitor.thread_id is None:
+                continue
+            if time.monotonic() - beat - self.monitor.interval > self.threshold:
+                self._capture(beat)
+
+    def _capture(self, beat: float):
+        started_at = time.time()
+        stacks = CollapsedStacks()
+        while self.monitor.last_wake == beat and not self._stop.is_set():
+            stack = thread_stack(self.monitor.thread_id)
+            if stack:
+                stacks.add(stack)
+            time.sleep(self.sample_interval)
+
+        # The monitor's wake-up time bounds the stall from above
+        blocked_ms = ((self.monitor.last_wake or time.monotonic()) - beat - self.monitor.interval) * 1000
+        LOOP_BLOCKS.inc()
+        hottest = stacks.hottest()
+        logger.warning("Event loop blocked for %.0f ms, mostly in %s", blocked_ms, hottest)
+        self._events.append({
+            "detected_at": round(started_at, 3),
+            "blocked_ms": round(blocked_ms, 1),
+            "samples": stacks.total,
+            "hottest": hottest,
+            "stacks": stacks.render(),
+        })
+
+
+# Started with the app
+loop_block_detector = LoopBlockDetector()
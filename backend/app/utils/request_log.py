@@ -0,0 +1,69 @@
+"""
+Optional request log for load-test replay (enabled by REQUEST_LOG_PATH).
+
+Each API request is appended to an NDJSON file with its arrival time, method,
+path, query string and JSON body, in the format read by
+``python -m loadtest --replay``. Lines are written by a background thread so
+request handling never waits on the disk.
+"""
+
+import json
+import queue
+import threading
+import time
+
+# Bodies larger than this (bulk imports) are not logged
+MAX_LOGGED_BODY = 64 * 1024
+
+
+class RequestLogMiddleware:
+    """ASGI middleware appending every HTTP request under ``prefix`` to ``path``."""
+
+    def __init__(self, app, path: str, prefix: str = "/api"):
+        self.app = app
+        self.prefix = prefix
+        self._lines: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        threading.Thread(target=self._write, args=(path,), name="request-log", daemon=True).start()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        entry = {
+            "ts": round(time.time(), 3),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope["query_string"].decode("latin-1"),
+        }
+        chunks, size = [], 0
+
+        async def logged_receive():
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request" and size <= MAX_LOGGED_BODY:
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+            return message
+
+        try:
+            await self.app(scope, logged_receive, send)
+        finally:
+            if chunks and size <= MAX_LOGGED_BODY:
+                try:
+                    entry["body"] = json.loads(b"".join(chunks))
+                except ValueError:
+                    pass
+            self._lines.put(json.dumps(entry, separators=(",", ":")))
+
+    def _write(self, path: str):
+        with open(path, "a", encoding="utf-8") as f:
+            while True:
+                f.write(self._lines.get() + "\n")
+                # Drain whatever else is queued before flushing once
+                while True:
+                    try:
+                        f.write(self._lines.get_nowait() + "\n")
+                    except queue.Empty:
+                        break
+                f.flush()
@@ -41,18 +41,21 @@ def point_in_polygon(point: Tuple[float, float], polygon: List[List[Tuple[float,
     
     return inside
 
-def find_zone_for_point(lat: float, lon: float) -> Optional[ZonePolygon]:
+def find_zone_for_point(lat: float, lon: float,
+                        zones: Optional[List[ZonePolygon]] = None) -> Optional[ZonePolygon]:
     """
     Find which zone a point (lat, lon) falls within.
     
     Args:
         lat: Latitude of the point
         lon: Longitude of the point
+        zones: Zones to search (default: get_la_zones(), which may block on a refresh)
     
     Returns:
         ZonePolygon object if point is within a zone, None otherwise
     """
-    zones = get_la_zones()
+    if zones is None:
+        zones = get_la_zones()
     point = (lon, lat)  # Note: polygon coordinates are stored as [lon, lat]
     
     for zone in zones:
@@ -120,3 +123,35 @@ def validate_coordinates(lat: float, lon: float) -> bool:
         True if coordinates are valid, False otherwise
     """
     return -90 <= lat <= 90 and -180 <= lon <= 180
+
+def assign_zones(points: List[Tuple[float, float]]) -> List[Optional[str]]:
+    """
+    Find the zone for many points at once.
+    
+    Zone polygons and their bounding boxes are prepared once for the batch, and
+    the ray-casting test only runs for zones whose box contains the point.
+    
+    Args:
+        points: List of (lat, lon) tuples
+    
+    Returns:
+        Zone name for each point, or None if it is outside every zone
+    """
+    prepared = []
+    for zone in get_la_zones():
+        if not zone.coordinates or not zone.coordinates[0]:
+            continue
+        lons = [p[0] for p in zone.coordinates[0]]
+        lats = [p[1] for p in zone.coordinates[0]]
+        prepared.append((min(lons), max(lons), min(lats), max(lats), zone))
+    
+    names = []
+    for lat, lon in points:
+        name = None
+        for min_lon, max_lon, min_lat, max_lat, zone in prepared:
+            if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat \
+                    and point_in_polygon((lon, lat), zone.coordinates):
+                name = zone.name
+                break
+        names.append(name)
+    return names
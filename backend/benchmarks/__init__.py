@@ -0,0 +1,4 @@
+"""
+Offline micro-benchmarks for the backend's hot paths.
+Run from the backend directory: python -m benchmarks --help
+"""
@@ -0,0 +1,59 @@
+"""
+Run the benchmark suite:
+
+    python -m benchmarks                       # run everything, print a table
+    python -m benchmarks --filter store        # only matching benchmarks
+    python -m benchmarks --save                # save as results/<git commit>.json
+    python -m benchmarks --compare <label>     # compare with a saved run
+
+--compare exits with status 1 if any benchmark is slower than the baseline by
+more than --threshold (default 10%).
+"""
+
+import argparse
+import subprocess
+import sys
+
+from benchmarks import cases  # noqa: F401  (registers the benchmarks)
+from benchmarks.harness import compare, load_results, registered, run, save_results
+
+
+def _git_label() -> str:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"]) != 0
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unversioned"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--round-seconds", type=float, default=0.2)
+    parser.add_argument("--save", nargs="?", const="", metavar="LABEL",
+                        help="Save results (label defaults to the git commit)")
+    parser.add_argument("--compare", metavar="LABEL", help="Saved run (label or .json path) to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before failing")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<48} {'ops/sec':>14} {'us/op':>10} {'B/op kept':>10} {'peak KiB':>9}")
+    for name in registered(args.filter):
+        result = run(name, args.rounds, args.round_seconds)
+        results[name] = result
+        print(f"{name:<48} {result['ops_per_sec']:>14,.1f} {result['us_per_op']:>10.3f} "
+              f"{result['retained_bytes_per_op']:>10.1f} {result['peak_kib']:>9.1f}", flush=True)
+
+    if args.save is not None:
+        print(f"\nSaved {save_results(args.save or _git_label(), results)}")
+
+    if args.compare:
+        rows = compare(load_results(args.compare), results, args.threshold)
+        print(f"\n{'benchmark':<48} {'baseline':>14} {'current':>14} {'change':>8}")
+        for row in rows:
+            flag = "  REGRESSED" if row["regressed"] else ""
+            print(f"{row['name']:<48} {row['baseline']:>14,.1f} {row['current']:>14,.1f} {row['change']:>+8.1%}{flag}")
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
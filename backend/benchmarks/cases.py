@@ -0,0 +1,154 @@
+"""
+Benchmark cases. Each registered function sets up its inputs and returns the
+operation to time.
+"""
+
+import itertools
+import os
+import random
+import tempfile
+
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+
+# Check-ins loaded into the store before the store benchmarks
+SCALE = int(os.getenv("BENCH_CHECKINS", 100_000))
+
+_rng = random.Random(1234)
+_points = [(34.05 + _rng.uniform(-0.4, 0.4), -118.2 + _rng.uniform(-0.5, 0.5)) for _ in range(4096)]
+
+
+def _cycle(items):
+    return itertools.cycle(items).__next__
+
+
+# ---------------- Geometry ----------------
+
+@benchmark("geo.calculate_distance")
+def _calculate_distance():
+    from app.utils.geo_utils import calculate_distance
+    next_point = _cycle(_points)
+    return lambda: calculate_distance(34.05, -118.25, *next_point())
+
+
+@benchmark("zone.point_in_polygon")
+def _point_in_polygon():
+    from app.utils.zone_utils import point_in_polygon
+    polygon = fixtures.install_zone_polygons()[0].coordinates
+    next_point = _cycle([(lon, lat) for lat, lon in _points])
+    return lambda: point_in_polygon(next_point(), polygon)
+
+
+@benchmark("zone.find_zone_for_point")
+def _find_zone_for_point():
+    from app.utils.zone_utils import find_zone_for_point
+    fixtures.install_zone_polygons()
+    next_point = _cycle(_points)
+    return lambda: find_zone_for_point(*next_point())
+
+
+@benchmark("zone.assign_zones[1000]")
+def _assign_zones():
+    from app.utils.zone_utils import assign_zones
+    fixtures.install_zone_polygons()
+    batch = _points[:1000]
+    return lambda: assign_zones(batch)
+
+
+# ---------------- Search / POIs ----------------
+
+@benchmark("search.deduplicate_results[200]")
+def _deduplicate_results():
+    from app.services.nominatim_service import NominatimService
+    service = NominatimService()
+    results = fixtures.search_results(200)
+    return lambda: service._deduplicate_results(results)
+
+
+@benchmark("overpass.categorize_poi")
+def _categorize_poi():
+    from app.services.overpass_service import OverpassService
+    service = OverpassService()
+    payload = next(iter(fixtures.overpass_payloads().values()))
+    next_tags = _cycle([el.get("tags", {}) for el in payload["elements"]])
+    return lambda: service._categorize_poi(next_tags())
+
+
+def _register_process_results():
+    for name, payload in fixtures.overpass_payloads().items():
+        @benchmark(f"overpass.process_results[{name}:{len(payload['elements'])}]")
+        def _process_results(payload=payload):
+            from app.services.overpass_service import OverpassService
+            service = OverpassService()
+            categories = list(service.poi_categories)
+            return lambda: service._process_overpass_results(payload, categories)
+
+
+_register_process_results()
+
+
+# ---------------- Check-in store ----------------
+
+_store_loaded = False
+
+
+def _load_store():
+    """Fill the configured check-in store with SCALE synthetic check-ins (once)."""
+    global _store_loaded
+    if not _store_loaded:
+        from app.services.synthetic_data import SyntheticDataset
+        SyntheticDataset(seed=42).load_into_store(SCALE, record_aggregates=True)
+        _store_loaded = True
+
+
+@benchmark("store.add_checkin")
+def _add_checkin():
+    from app.services import checkin_store
+    _load_store()
+    poi = {"poi_name": "Old Pasadena", "lat": 34.1461, "lon": -118.1514,
+           "zone_name": "Pasadena Zone", "amenity_type": "attraction"}
+    return lambda: checkin_store.add_checkin("Bench User", poi, "benchmark")
+
+
+@benchmark("store.get_top_locations")
+def _get_top_locations():
+    from app.services import checkin_store
+    _load_store()
+    return lambda: checkin_store.get_top_locations("Pasadena Zone", 10)
+
+
+@benchmark("store.get_zone_checkins")
+def _get_zone_checkins():
+    from app.services import checkin_store
+    _load_store()
+    return lambda: checkin_store.get_zone_checkins("Pasadena Zone", 20)
+
+
+@benchmark("store.get_trending_locations")
+def _get_trending_locations():
+    from app.services import checkin_store
+    _load_store()
+    return lambda: checkin_store.get_trending_locations("Pasadena Zone", "hour", 10)
+
+
+@benchmark("store.get_nearby_checkins[500m]")
+def _get_nearby_checkins():
+    from app.services import checkin_store
+    _load_store()
+    return lambda: checkin_store.get_nearby_checkins(34.1478, -118.1445, 500, 20)
+
+
+@benchmark("sqlite.add_checkins[100]")
+def _sqlite_add_checkins():
+    from app.services.checkin_sqlite import SQLiteCheckinStore
+    from app.services.synthetic_data import SyntheticDataset
+    # Deleted once the op (which holds it) is dropped after the run
+    tmp_dir = tempfile.TemporaryDirectory(prefix="bench-sqlite-")
+    store = SQLiteCheckinStore(os.path.join(tmp_dir.name, "bench.db"))
+    records = list(SyntheticDataset(seed=42, num_users=1000, pois_per_zone=50).iter_checkins(10_000))
+    batches = [records[i:i + 100] for i in range(0, len(records), 100)]
+    next_batch = _cycle(batches)
+
+    def op(tmp_dir=tmp_dir):
+        return store.add_checkins(next_batch())
+    return op
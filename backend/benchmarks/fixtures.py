@@ -0,0 +1,97 @@
+"""
+Offline inputs for the benchmarks.
+
+Overpass payloads recorded with ``python -m benchmarks.record_overpass`` are
+read from fixtures/*.json.gz. Without recordings, a seeded payload with the
+same element shapes and tag mix is generated instead. Zone polygons are
+approximated as circles around each zone centre, so nothing hits the network.
+"""
+
+import glob
+import gzip
+import json
+import math
+import os
+import random
+from typing import Dict, List
+
+from app.models.schemas import ZonePolygon
+from app.services import zone_service
+from app.services.synthetic_data import ZONE_CENTERS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# (tags, share of elements) roughly matching an LA Overpass response
+_TAG_MIX = [
+    ({"amenity": "restaurant", "cuisine": "mexican"}, 30),
+    ({"amenity": "fast_food"}, 15),
+    ({"amenity": "bar"}, 6),
+    ({"amenity": "pub"}, 2),
+    ({"tourism": "attraction"}, 4),
+    ({"tourism": "museum"}, 2),
+    ({"tourism": "gallery"}, 1),
+    ({"historic": "monument"}, 1),
+    ({"amenity": "toilets"}, 5),
+    ({"amenity": "drinking_water"}, 4),
+    ({"shop": "convenience"}, 20),
+    ({"amenity": "cafe;restaurant"}, 10),
+]
+
+
+def install_zone_polygons(sides: int = 48, radius_km: float = 5.0):
+    """Put circular zone polygons in the zone cache so lookups stay offline."""
+    zones = []
+    for name, (lat, lon) in ZONE_CENTERS.items():
+        ring = []
+        for i in range(sides + 1):
+            angle = 2 * math.pi * i / sides
+            ring.append((
+                lon + radius_km / (111.32 * math.cos(math.radians(lat))) * math.cos(angle),
+                lat + radius_km / 110.57 * math.sin(angle),
+            ))
+        zones.append(ZonePolygon(name=name, color="#888888", coordinates=[ring]))
+    zone_service._zone_cache["zones"] = zones
+    zone_service._zone_cache["expires_at"] = zone_service.datetime.max
+    return zones
+
+
+def overpass_payloads() -> Dict[str, Dict]:
+    """Recorded payloads by file name, or one generated payload if none are recorded."""
+    payloads = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json.gz"))):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payloads[os.path.basename(path)[:-len(".json.gz")]] = json.load(f)
+    if not payloads:
+        payloads["generated"] = generated_overpass_payload()
+    return payloads
+
+
+def generated_overpass_payload(elements: int = 20_000, seed: int = 7) -> Dict:
+    """Seeded stand-in for a large Overpass response around central LA."""
+    rng = random.Random(seed)
+    tag_sets, weights = zip(*_TAG_MIX)
+    items: List[Dict] = []
+    for i in range(elements):
+        tags = dict(rng.choices(tag_sets, weights)[0])
+        if rng.random() < 0.8:
+            tags["name"] = f"Place {i}"
+        if rng.random() < 0.5:
+            tags.update({"addr:street": f"{rng.randint(1, 9999)} Main St", "addr:city": "Los Angeles", "addr:state": "CA"})
+        lat, lon = 34.05 + rng.uniform(-0.3, 0.3), -118.25 + rng.uniform(-0.3, 0.3)
+        if rng.random() < 0.7:
+            items.append({"type": "node", "id": i, "lat": lat, "lon": lon, "tags": tags})
+        else:
+            items.append({"type": "way", "id": i, "center": {"lat": lat, "lon": lon}, "tags": tags})
+    return {"version": 0.6, "generator": "benchmarks", "elements": items}
+
+
+def search_results(count: int = 200, seed: int = 11) -> List[Dict]:
+    """Search results with clusters of near-duplicates, as fed to _deduplicate_results."""
+    rng = random.Random(seed)
+    results = []
+    while len(results) < count:
+        lat, lon = 34.05 + rng.uniform(-0.2, 0.2), -118.25 + rng.uniform(-0.2, 0.2)
+        for _ in range(rng.randint(1, 4)):
+            results.append({"name": f"Result {len(results)}", "lat": lat + rng.uniform(-0.0005, 0.0005),
+                            "lon": lon + rng.uniform(-0.0005, 0.0005)})
+    return results[:count]
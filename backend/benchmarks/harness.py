@@ -0,0 +1,124 @@
+"""
+Timing, allocation tracking and baseline comparison for the benchmark suite.
+"""
+
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# name -> (setup, function); setup returns the callable that performs one op
+_REGISTRY: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark. The decorated function does any setup and returns a
+    zero-argument callable that performs one operation.
+    """
+    def register(setup: Callable[[], Callable[[], object]]):
+        if name in _REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        _REGISTRY[name] = setup
+        return setup
+    return register
+
+
+def registered(pattern: Optional[str] = None) -> List[str]:
+    return [name for name in _REGISTRY if not pattern or pattern in name]
+
+
+def run(name: str, rounds: int = 5, round_seconds: float = 0.2) -> Dict:
+    """
+    Time one benchmark.
+
+    The op count per round is calibrated so each round lasts about
+    ``round_seconds``; ops/sec is reported from the fastest and the median
+    round. Allocations are measured separately with tracemalloc, since tracing
+    slows the code down.
+    """
+    op = _REGISTRY[name]()
+    op()  # warm caches and lazy initialisation
+
+    # Calibrate
+    ops = 1
+    while True:
+        elapsed = _time_ops(op, ops)
+        if elapsed >= round_seconds / 10 or ops >= 10_000_000:
+            break
+        ops *= 10
+    ops = max(1, int(ops * round_seconds / max(elapsed, 1e-9)))
+
+    timings = [_time_ops(op, ops) for _ in range(rounds)]
+    best, median = min(timings), statistics.median(timings)
+
+    alloc_ops = min(ops, 1000)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(alloc_ops):
+        op()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+
+    return {
+        "ops_per_sec": round(ops / best, 1),
+        "median_ops_per_sec": round(ops / median, 1),
+        "us_per_op": round(1e6 * best / ops, 3),
+        "retained_bytes_per_op": round(sum(s.size_diff for s in stats) / alloc_ops, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _time_ops(op: Callable[[], object], ops: int) -> float:
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(ops):
+            op()
+        return time.perf_counter() - started
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def save_results(label: str, results: Dict[str, Dict]) -> str:
+    """Write results to results/<label>.json and return the path."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(path, "w") as f:
+        json.dump({"label": label, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+    return path
+
+
+def load_results(label_or_path: str) -> Dict[str, Dict]:
+    path = label_or_path if label_or_path.endswith(".json") else os.path.join(RESULTS_DIR, f"{label_or_path}.json")
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(baseline: Dict[str, Dict], current: Dict[str, Dict], threshold: float) -> List[Dict]:
+    """
+    Compare ops/sec against a baseline.
+
+    Returns:
+        One row per benchmark present in both, with "change" (fractional
+        speed change) and "regressed" when slower by more than ``threshold``
+    """
+    rows = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["ops_per_sec"], result["ops_per_sec"]
+        change = (new - old) / old if old else 0.0
+        rows.append({"name": name, "baseline": old, "current": new,
+                     "change": change, "regressed": change < -threshold})
+    return rows
@@ -0,0 +1,42 @@
+"""
+Record real Overpass responses as benchmark fixtures (needs network access):
+
+    python -m benchmarks.record_overpass --name la_center --lat 34.05 --lon -118.25 --radius 5000
+"""
+
+import argparse
+import gzip
+import json
+import os
+
+import requests
+
+from benchmarks.fixtures import FIXTURES_DIR
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", required=True)
+    parser.add_argument("--lat", type=float, default=34.05)
+    parser.add_argument("--lon", type=float, default=-118.25)
+    parser.add_argument("--radius", type=int, default=5000, help="Metres")
+    args = parser.parse_args()
+
+    around = f"around:{args.radius},{args.lat},{args.lon}"
+    query = f"""
+    [out:json][timeout:120];
+    (
+      nwr["amenity"]({around});
+      nwr["tourism"]({around});
+      nwr["historic"]({around});
+    );
+    out center tags;
+    """
+    response = requests.post(OVERPASS_URL, data={"data": query}, headers={"User-Agent": "LA-Interactive-Map/1.0"})
+    response.raise_for_status()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    path = os.path.join(FIXTURES_DIR, f"{args.name}.json.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(response.json(), f)
+    print(f"Saved {len(response.json().get('elements', []))} elements to {path}")
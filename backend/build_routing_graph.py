@@ -0,0 +1,28 @@
+"""
+Build offline routing graphs from an OpenStreetMap XML extract.
+Run this from the backend directory:
+
+    python build_routing_graph.py --osm los-angeles.osm.gz --out data/graphs
+
+PBF extracts can be converted first, e.g. `osmium cat la.osm.pbf -o la.osm.gz`.
+Then start the server with ROUTING_BACKEND=local to route from the graphs.
+"""
+
+import argparse
+import logging
+import time
+
+from app.services.local_router import PROFILES, build_graphs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--osm", required=True, help="OSM XML extract (.osm or .osm.gz)")
+    parser.add_argument("--out", default="data/graphs", help="Output directory for <profile>.graph files")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=PROFILES)
+    parser.add_argument("--landmarks", type=int, default=8, help="ALT landmarks per graph")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    started = time.perf_counter()
+    sizes = build_graphs(args.osm, args.out, tuple(args.profiles), args.landmarks)
+    print(f"Built {sizes} in {time.perf_counter() - started:.1f}s")
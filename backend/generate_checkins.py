@@ -0,0 +1,41 @@
+"""
+Generate a reproducible synthetic check-in dataset.
+Run this from the backend directory:
+
+    python generate_checkins.py --count 1000000 --out data/checkins.ndjson.gz
+    CHECKIN_STORE=sqlite python generate_checkins.py --count 1000000 --load
+
+Files use the NDJSON format accepted by POST /api/checkins/bulk. Pass --end to
+get byte-identical output across runs (timestamps otherwise end now).
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from app.config import CHECKIN_STORE
+from app.services.synthetic_data import SyntheticDataset
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="Check-ins to generate")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--pois-per-zone", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30, help="Days of history")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Timestamp of the end of the history (ISO)")
+    parser.add_argument("--seed", type=int, default=42)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="NDJSON fixture path (.gz to compress)")
+    target.add_argument("--load", action="store_true", help="Add to the configured check-in store")
+    args = parser.parse_args()
+    if args.load and CHECKIN_STORE != "sqlite":
+        parser.error("--load needs CHECKIN_STORE=sqlite (the in-memory store is gone when this script exits)")
+
+    dataset = SyntheticDataset(args.seed, args.users, args.pois_per_zone)
+    started = time.perf_counter()
+    if args.out:
+        count = dataset.write_ndjson(args.out, args.count, args.days, args.end)
+        print(f"Wrote {count} check-ins to {args.out} in {time.perf_counter() - started:.1f}s")
+    else:
+        count = dataset.load_into_store(args.count, args.days, args.end)
+        print(f"Loaded {count} check-ins in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,4 @@
+"""
+End-to-end load generator for the running app: weighted synthetic traffic or
+replayed request logs, reported as throughput and latency percentiles.
+"""
@@ -0,0 +1,78 @@
+"""
+Load-test a running app with realistic mixed traffic:
+
+    python -m loadtest --concurrency 50 --duration 60          # closed loop, peak throughput
+    python -m loadtest --rate 200 --duration 60                # open loop, 200 req/s
+    python -m loadtest --mix search=0,checkin_write=40         # reweight the synthetic mix
+    python -m loadtest --replay requests.ndjson --speed 2      # replay a REQUEST_LOG_PATH log at 2x
+
+Reports throughput and p50/p95/p99 latency per endpoint, plus the app's
+event-loop lag (from /health) and the generator's own, which should stay low
+for the numbers to be trusted. Run the app against the upstream simulator
+(python -m simulator) so no traffic reaches the public services.
+"""
+
+import argparse
+import asyncio
+import json
+
+from loadtest.runner import LoadRun
+from loadtest.scenarios import DEFAULT_MIX, SyntheticMix, parse_mix, read_request_log
+
+
+def _print_report(report: dict):
+    print(f"\n{'endpoint':<16} {'requests':>9} {'ok':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}  errors")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, stats in rows:
+        errors = {status: count for status, count in stats["statuses"].items() if int(status) >= 400}
+        errors.update(stats["exceptions"])
+        if stats["unfinished"]:
+            errors["unfinished"] = stats["unfinished"]
+        print(f"{name:<16} {stats['requests']:>9} {stats['ok']:>8} {stats['rps']:>9.1f} {stats['p50_ms']:>9.1f} "
+              f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}  "
+              f"{', '.join(f'{k}: {v}' for k, v in errors.items()) or '-'}")
+
+    server, client = report["server_loop_lag_ms"], report["client_loop_lag_ms"]
+    print(f"\n{report['elapsed_sec']}s measured, max {report['max_in_flight']} requests in flight")
+    print(f"App event-loop lag:       p50 {server['p50_ms']} ms, worst p99 {server['worst_p99_ms']} ms, "
+          f"max {server['max_ms']} ms ({server['polls']} polls)")
+    print(f"Generator event-loop lag: p99 {client['p99_ms']} ms, max {client['max_ms']} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the app")
+    parser.add_argument("--concurrency", type=int, default=20, help="Maximum requests in flight")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to measure")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Seconds of unmeasured load first")
+    parser.add_argument("--rate", type=float, help="Open loop: Poisson arrivals per second")
+    parser.add_argument("--mix", help=f"Endpoint weights, e.g. search=5,pois=0 ({', '.join(DEFAULT_MIX)})")
+    parser.add_argument("--replay", metavar="LOG", help="Replay a REQUEST_LOG_PATH log instead of the mix")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed-up; 0 sends the log back to back (closed loop)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    run = LoadRun(args.url, args.concurrency, args.duration, args.warmup, args.timeout)
+    if args.replay:
+        entries = read_request_log(args.replay)
+        print(f"Replaying {len(entries)} requests from {args.replay}")
+        if args.speed > 0:
+            report = asyncio.run(run.scheduled((offset / args.speed, request) for offset, request in entries))
+        else:
+            report = asyncio.run(run.closed_loop(request for _, request in entries))
+    else:
+        mix = SyntheticMix(parse_mix(args.mix), args.seed)
+        if args.rate:
+            report = asyncio.run(run.open_loop(mix, args.rate, args.seed))
+        else:
+            report = asyncio.run(run.closed_loop(mix))
+
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {args.json}")
@@ -0,0 +1,236 @@
+"""
+Drive HTTP load at a running app and summarise what happened.
+
+Two ways of sending:
+- Closed loop (no rate): ``concurrency`` workers send requests back to back.
+  This finds peak throughput.
+- Open loop (a rate, or a replay schedule): requests start at fixed times,
+  however slowly the server answers, with at most ``concurrency`` in flight.
+
+Open-loop latency counts from the time a request was due, not the time it was
+sent, so queueing behind a slow server shows up in the percentiles instead of
+silently lowering the offered load.
+"""
+
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from app.utils.loop_monitor import LoopLagMonitor
+from loadtest.scenarios import LoadRequest
+
+# How often the app's /health is polled for event-loop lag
+HEALTH_POLL_SEC = 1.0
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile (``q`` in 0..100) of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(q / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class EndpointStats:
+    """Latencies and outcomes for one endpoint."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.exceptions: Counter = Counter()
+        self.unfinished = 0
+
+    def to_dict(self, elapsed: float) -> Dict:
+        latencies = sorted(self.latencies)
+        ok = sum(count for status, count in self.statuses.items() if status < 400)
+        return {
+            "requests": len(latencies) + sum(self.exceptions.values()),
+            "ok": ok,
+            "unfinished": self.unfinished,
+            "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "exceptions": dict(self.exceptions),
+        }
+
+
+class LoadRun:
+    """One load test against ``base_url``."""
+
+    def __init__(self, base_url: str, concurrency: int = 20, duration: float = 30.0,
+                 warmup: float = 0.0, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.duration = duration
+        self.warmup = warmup
+        self.timeout = timeout
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.server_lag: List[Dict] = []
+        self._client_lag = LoopLagMonitor(interval=0.05)
+        self._measure_from = 0.0
+        self._in_flight = 0
+        self.max_in_flight = 0
+
+    async def closed_loop(self, requests: Iterable[LoadRequest]) -> Dict:
+        """``concurrency`` workers sending back to back for ``duration`` seconds."""
+        source = iter(requests)
+
+        async def worker(client: httpx.AsyncClient, deadline: float):
+            while time.perf_counter() < deadline:
+                request = next(source, None)
+                if request is None:
+                    return
+                await self._send(client, request, time.perf_counter())
+
+        return await self._run(lambda client, deadline: [worker(client, deadline) for _ in range(self.concurrency)])
+
+    async def open_loop(self, requests: Iterable[LoadRequest], rate: float, seed: Optional[int] = None) -> Dict:
+        """Poisson arrivals at ``rate`` requests per second for ``duration`` seconds."""
+        rng = random.Random(seed)
+
+        def schedule():
+            offset = 0.0
+            for request in requests:
+                offset += rng.expovariate(rate)
+                yield offset, request
+
+        return await self.scheduled(schedule())
+
+    async def scheduled(self, schedule: Iterable[Tuple[float, LoadRequest]]) -> Dict:
+        """Send each request ``offset`` seconds after the start (used for replay)."""
+        async def dispatch(client: httpx.AsyncClient, deadline: float):
+            slots = asyncio.Semaphore(self.concurrency)
+            start = time.perf_counter()
+            tasks = set()
+            try:
+                for offset, request in schedule:
+                    due = start + offset
+                    if due >= deadline:
+                        break
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    task = asyncio.create_task(self._send_when_free(client, request, due, slots))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.wait(tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        return await self._run(lambda client, deadline: [dispatch(client, deadline)])
+
+    async def _run(self, make_jobs) -> Dict:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            self._client_lag.start()
+            started = time.perf_counter()
+            self._measure_from = started + self.warmup
+            deadline = started + self.warmup + self.duration
+            poller = asyncio.create_task(self._poll_health())
+            jobs = [asyncio.create_task(job) for job in make_jobs(client, deadline)]
+            try:
+                # Requests still running at the deadline are cancelled and
+                # reported as unfinished, so the window stays exact
+                await asyncio.wait(jobs, timeout=max(0.0, deadline - time.perf_counter()))
+            finally:
+                for task in jobs + [poller]:
+                    task.cancel()
+                await asyncio.gather(*jobs, poller, return_exceptions=True)
+                await self._client_lag.stop()
+            elapsed = min(time.perf_counter(), deadline) - self._measure_from
+        return self.report(elapsed)
+
+    async def _send_when_free(self, client: httpx.AsyncClient, request: LoadRequest, due: float,
+                              slots: asyncio.Semaphore):
+        try:
+            await slots.acquire()
+        except asyncio.CancelledError:
+            # Due but never sent: still queued when the run ended
+            if due >= self._measure_from:
+                self._stats(request.endpoint).unfinished += 1
+            raise
+        try:
+            await self._send(client, request, due)
+        finally:
+            slots.release()
+
+    async def _send(self, client: httpx.AsyncClient, request: LoadRequest, started: float):
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        status, error = None, None
+        try:
+            response = await client.request(request.method, request.path, params=request.params, json=request.body)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        except asyncio.CancelledError:
+            if started >= self._measure_from:
+                self._stats(request.endpoint).unfinished += 1
+            raise
+        finally:
+            self._in_flight -= 1
+        finished = time.perf_counter()
+        if started < self._measure_from:
+            return  # warm-up
+        stats = self._stats(request.endpoint)
+        if error:
+            stats.exceptions[error] += 1
+        else:
+            stats.statuses[status] += 1
+            stats.latencies.append(finished - started)
+
+    def _stats(self, endpoint: str) -> EndpointStats:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    async def _poll_health(self):
+        # Own connection, so polls don't queue behind the load
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=5.0) as client:
+            while True:
+                try:
+                    response = await client.get("/health")
+                    lag = response.json().get("event_loop_lag_ms")
+                    if lag and time.perf_counter() >= self._measure_from:
+                        self.server_lag.append(lag)
+                except (httpx.HTTPError, ValueError):
+                    pass
+                await asyncio.sleep(HEALTH_POLL_SEC)
+
+    def report(self, elapsed: float) -> Dict:
+        """Throughput, latency percentiles per endpoint, and event-loop lag."""
+        total = EndpointStats()
+        for stats in self.endpoints.values():
+            total.latencies.extend(stats.latencies)
+            total.statuses.update(stats.statuses)
+            total.exceptions.update(stats.exceptions)
+            total.unfinished += stats.unfinished
+
+        current = sorted(lag["current_ms"] for lag in self.server_lag)
+        return {
+            "elapsed_sec": round(elapsed, 2),
+            "concurrency": self.concurrency,
+            "max_in_flight": self.max_in_flight,
+            "total": total.to_dict(elapsed),
+            "endpoints": {name: stats.to_dict(elapsed) for name, stats in sorted(self.endpoints.items())},
+            "server_loop_lag_ms": {
+                "polls": len(current),
+                "p50_ms": percentile(current, 50),
+                "worst_p99_ms": max((lag["p99_ms"] for lag in self.server_lag), default=0.0),
+                "max_ms": max((lag["max_ms"] for lag in self.server_lag), default=0.0),
+            },
+            # High client lag means the generator itself was the bottleneck
+            "client_loop_lag_ms": self._client_lag.snapshot(),
+        }
@@ -0,0 +1,187 @@
+"""
+Traffic for the load generator: a weighted synthetic mix of user actions, or
+requests replayed from a log written with REQUEST_LOG_PATH.
+"""
+
+import json
+import random
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.zone_service import ZONE_CENTERS
+
+# Relative frequency of each action in the synthetic mix
+DEFAULT_MIX = {
+    "zone_detect": 20,
+    "pois": 10,
+    "nearest": 5,
+    "search": 10,
+    "transit": 8,
+    "checkin_feed": 15,
+    "top_locations": 6,
+    "trending": 6,
+    "checkins_near": 5,
+    "checkin_write": 15,
+}
+
+POI_CATEGORIES = ["restaurants", "bars", "attractions", "utilities"]
+SEARCH_TERMS = ["coffee", "pizza", "tacos", "museum", "park", "gas", "pharmacy", "bar", "sushi", "parking"]
+TRAVEL_MODES = ["driving", "walking", "transit", "carpool"]
+AMENITY_TYPES = ["restaurant", "cafe", "bar", "park", "shopping", "attraction", "museum"]
+
+# Route templates used to group replayed requests per endpoint
+_ENDPOINTS = [
+    (re.compile(r"^/api/checkins/near$"), "checkins_near"),
+    (re.compile(r"^/api/checkins/bulk$"), "checkin_bulk"),
+    (re.compile(r"^/api/checkins/heatmap/\d+/\d+/\d+$"), "heatmap"),
+    (re.compile(r"^/api/checkins/[^/]+/(stream|ws)$"), "checkin_stream"),
+    (re.compile(r"^/api/checkins/[^/]+$"), "checkin_feed"),
+    (re.compile(r"^/api/checkins$"), "checkin_write"),
+    (re.compile(r"^/api/locations/[^/]+/top$"), "top_locations"),
+    (re.compile(r"^/api/locations/[^/]+/trending$"), "trending"),
+    (re.compile(r"^/api/zone/detect$"), "zone_detect"),
+    (re.compile(r"^/api/pois$"), "pois"),
+    (re.compile(r"^/api/nearest$"), "nearest"),
+    (re.compile(r"^/api/search(/stream)?$"), "search"),
+    (re.compile(r"^/api/transit(/compare)?$"), "transit"),
+]
+
+
+class LoadRequest:
+    """One request to send, tagged with the endpoint it is reported under."""
+
+    __slots__ = ("endpoint", "method", "path", "params", "body")
+
+    def __init__(self, endpoint: str, method: str, path: str,
+                 params: Optional[Dict] = None, body: Optional[Dict] = None):
+        self.endpoint = endpoint
+        self.method = method
+        self.path = path
+        self.params = params
+        self.body = body
+
+
+def endpoint_name(path: str) -> str:
+    """Endpoint a request path is reported under (the path itself if unknown)."""
+    for pattern, name in _ENDPOINTS:
+        if pattern.match(path):
+            return name
+    return path
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    """Weights from "search=5,pois=2"; endpoints not listed keep their default."""
+    mix = dict(DEFAULT_MIX)
+    if spec:
+        for part in spec.split(","):
+            name, _, weight = part.partition("=")
+            name = name.strip()
+            if name not in DEFAULT_MIX:
+                raise ValueError(f"Unknown endpoint {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+            mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+class SyntheticMix:
+    """Endless stream of requests drawn from a weighted mix of user actions."""
+
+    def __init__(self, mix: Dict[str, float], seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._names = list(mix)
+        self._weights = list(mix.values())
+        self._zones = list(ZONE_CENTERS)
+
+    def __iter__(self) -> Iterator[LoadRequest]:
+        while True:
+            name = self._rng.choices(self._names, self._weights)[0]
+            yield getattr(self, f"_{name}")()
+
+    def _point(self, zone: Optional[str] = None, spread: float = 0.03) -> Tuple[str, float, float]:
+        zone = zone or self._rng.choice(self._zones)
+        lat, lon = ZONE_CENTERS[zone]
+        return zone, round(self._rng.gauss(lat, spread), 6), round(self._rng.gauss(lon, spread), 6)
+
+    def _zone_detect(self) -> LoadRequest:
+        _, lat, lon = self._point()
+        return LoadRequest("zone_detect", "GET", "/api/zone/detect", {"lat": lat, "lon": lon})
+
+    def _pois(self) -> LoadRequest:
+        zone, lat, lon = self._point()
+        params = {"zone": zone, "lat": lat, "lon": lon}
+        if self._rng.random() < 0.5:
+            params["categories"] = ",".join(self._rng.sample(POI_CATEGORIES, self._rng.randint(1, 3)))
+        return LoadRequest("pois", "GET", "/api/pois", params)
+
+    def _nearest(self) -> LoadRequest:
+        _, lat, lon = self._point()
+        return LoadRequest("nearest", "GET", "/api/nearest", {
+            "category": self._rng.choice(POI_CATEGORIES), "lat": lat, "lon": lon, "k": 5,
+        })
+
+    def _search(self) -> LoadRequest:
+        _, lat, lon = self._point()
+        return LoadRequest("search", "POST", "/api/search", body={
+            "query": self._rng.choice(SEARCH_TERMS), "lat": lat, "lon": lon,
+        })
+
+    def _transit(self) -> LoadRequest:
+        _, start_lat, start_lon = self._point()
+        _, end_lat, end_lon = self._point()
+        return LoadRequest("transit", "POST", "/api/transit", body={
+            "start_lat": start_lat, "start_lon": start_lon, "end_lat": end_lat, "end_lon": end_lon,
+            "mode": self._rng.choice(TRAVEL_MODES),
+        })
+
+    def _checkin_feed(self) -> LoadRequest:
+        return LoadRequest("checkin_feed", "GET", f"/api/checkins/{self._rng.choice(self._zones)}", {"limit": 20})
+
+    def _top_locations(self) -> LoadRequest:
+        return LoadRequest("top_locations", "GET", f"/api/locations/{self._rng.choice(self._zones)}/top")
+
+    def _trending(self) -> LoadRequest:
+        return LoadRequest("trending", "GET", f"/api/locations/{self._rng.choice(self._zones)}/trending",
+                           {"window": self._rng.choice(["hour", "day", "decay"])})
+
+    def _checkins_near(self) -> LoadRequest:
+        _, lat, lon = self._point()
+        return LoadRequest("checkins_near", "GET", "/api/checkins/near", {"lat": lat, "lon": lon, "radius": 1000})
+
+    def _checkin_write(self) -> LoadRequest:
+        zone, lat, lon = self._point(spread=0.01)
+        amenity = self._rng.choice(AMENITY_TYPES)
+        return LoadRequest("checkin_write", "POST", "/api/checkins", body={
+            "user_name": f"Load Tester {self._rng.randint(1, 5000)}",
+            "poi_name": f"{zone.replace(' Zone', '')} {amenity.title()} {self._rng.randint(1, 200)}",
+            "poi_lat": lat,
+            "poi_lon": lon,
+            "zone_name": zone,
+            "amenity_type": amenity,
+            "caption": "Load test check-in",
+        })
+
+
+def read_request_log(path: str) -> List[Tuple[float, LoadRequest]]:
+    """
+    Requests from a REQUEST_LOG_PATH log, as (seconds since the first request, request).
+
+    Streaming endpoints are skipped; they hold a connection open rather than
+    completing like the other requests.
+    """
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            endpoint = endpoint_name(entry["path"])
+            if endpoint == "checkin_stream":
+                continue
+            path_and_query = entry["path"] + (f"?{entry['query']}" if entry.get("query") else "")
+            entries.append((entry["ts"], LoadRequest(endpoint, entry["method"], path_and_query,
+                                                     body=entry.get("body"))))
+    if not entries:
+        return []
+    # Lines are written as requests finish; replay them in arrival order
+    entries.sort(key=lambda e: e[0])
+    start = entries[0][0]
+    return [(ts - start, request) for ts, request in entries]
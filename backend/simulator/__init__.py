@@ -0,0 +1,4 @@
+"""
+Local stand-in for the public upstream APIs (Nominatim, Overpass, OSRM), so the
+backend can be load-tested without sending traffic to the real services.
+"""
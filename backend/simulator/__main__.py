@@ -0,0 +1,74 @@
+"""
+Run the upstream simulator:
+
+    python -m simulator                              # generated responses, typical latency
+    python -m simulator --error-rate 0.05 --rate-limit 20
+    python -m simulator --mode record --recordings data/recordings   # needs network access
+    python -m simulator --mode replay --recordings data/recordings
+
+Nominatim, Overpass and OSRM are served on --port, --port + 1 and --port + 2
+(every port answers every service, but separate ports keep any per-host rate
+limits configured on the backend apart). --config takes a JSON file of per-service
+profiles, e.g. {"overpass": {"latency_ms": 3000, "error_rate": 0.1}}, applied
+after the command-line options.
+"""
+
+import argparse
+import json
+import socket
+
+import uvicorn
+
+from simulator.server import DEFAULT_PROFILES, MODES, SERVICES, UpstreamSimulator, create_app
+
+
+def _profiles(args) -> dict:
+    profiles = {}
+    for service in SERVICES:
+        profile = dict(DEFAULT_PROFILES[service])
+        profile["latency_ms"] *= args.latency_scale
+        for name in ("latency_sigma", "error_rate", "rate_limit", "burst"):
+            if getattr(args, name) is not None:
+                profile[name] = getattr(args, name)
+        profiles[service] = profile
+    if args.config:
+        with open(args.config) as f:
+            for service, values in json.load(f).items():
+                profiles[service].update(values)
+    return profiles
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    return sock
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101, help="First of three consecutive ports")
+    parser.add_argument("--mode", choices=MODES, default="synthetic")
+    parser.add_argument("--recordings", help="Directory of recorded responses (replay / record modes)")
+    parser.add_argument("--replay-only", action="store_true", help="In replay mode, 404 instead of generating")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for median latencies (0: none)")
+    parser.add_argument("--latency-sigma", type=float, help="Log-normal spread of latency for every service")
+    parser.add_argument("--error-rate", type=float, help="Share of requests failing with 502/503/504")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second before 429s (0: unlimited)")
+    parser.add_argument("--burst", type=float, help="Token bucket size for --rate-limit")
+    parser.add_argument("--config", help="JSON file of per-service profiles")
+    parser.add_argument("--seed", type=int, help="Seed for latency and error sampling")
+    args = parser.parse_args()
+
+    simulator = UpstreamSimulator(args.mode, args.recordings, args.replay_only, _profiles(args), args.seed)
+    app = create_app(simulator)
+    ports = {service: args.port + i for i, service in enumerate(SERVICES)}
+    base = f"http://{args.host}"
+    print("Point the backend at the simulator with:")
+    print(f"  export NOMINATIM_BASE_URL={base}:{ports['nominatim']}")
+    print(f"  export OVERPASS_URL={base}:{ports['overpass']}/api/interpreter")
+    print(f"  export OSRM_BASE_URL={base}:{ports['osrm']}")
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_level="warning")
+    uvicorn.Server(config).run(sockets=[_bind(args.host, port) for port in ports.values()])
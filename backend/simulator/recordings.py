@@ -0,0 +1,62 @@
+"""
+Recorded upstream responses, one gzipped JSON file per distinct request.
+
+A request is identified by service, path, sorted query parameters and body
+(Overpass queries with whitespace collapsed), so the same search or query
+sent again is answered from the same recording.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def request_key(service: str, path: str, query: List[Tuple[str, str]], body: str = "") -> str:
+    canonical = json.dumps([service, path, sorted(query), _WHITESPACE.sub(" ", body).strip()])
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class RecordingStore:
+    """Responses saved under ``<directory>/<service>/<key>.json.gz``."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._cache: Dict[str, Optional[Dict]] = {}
+
+    def get(self, service: str, key: str) -> Optional[Dict]:
+        """The recording for a request key, or None (misses are cached too)."""
+        cache_key = f"{service}/{key}"
+        if cache_key not in self._cache:
+            path = self._path(service, key)
+            if os.path.exists(path):
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    self._cache[cache_key] = json.load(f)
+            else:
+                self._cache[cache_key] = None
+        return self._cache[cache_key]
+
+    def save(self, service: str, key: str, request: Dict, status: int, content_type: str, body: str):
+        recording = {"request": request, "status": status, "content_type": content_type, "body": body}
+        path = self._path(service, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(recording, f)
+        self._cache[f"{service}/{key}"] = recording
+
+    def count(self) -> Dict[str, int]:
+        """Number of recordings per service."""
+        counts = {}
+        if os.path.isdir(self.directory):
+            for service in sorted(os.listdir(self.directory)):
+                folder = os.path.join(self.directory, service)
+                if os.path.isdir(folder):
+                    counts[service] = sum(1 for name in os.listdir(folder) if name.endswith(".json.gz"))
+        return counts
+
+    def _path(self, service: str, key: str) -> str:
+        return os.path.join(self.directory, service, f"{key}.json.gz")
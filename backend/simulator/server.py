@@ -0,0 +1,292 @@
+"""
+The simulator app: Nominatim /search, Overpass /api/interpreter and OSRM
+/route/v1 and /table/v1 behind configurable latency, errors and rate limits.
+
+Each service has a fault profile:
+- latency drawn from a log-normal distribution (median and sigma)
+- a share of requests failing with 502/503/504
+- a token bucket that answers 429 once it runs dry
+
+Profiles can be changed while it runs with PUT /_simulator/config.
+
+Modes:
+- "synthetic": generate every response
+- "replay": serve recordings, falling back to generated responses
+  (or 404 with replay_only)
+- "record": proxy to the real services and save what they return
+"""
+
+import asyncio
+import math
+import random
+import time
+from typing import Dict, Optional
+
+import httpx
+from fastapi import Body, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from simulator import synthetic
+from simulator.recordings import RecordingStore, request_key
+
+SERVICES = ("nominatim", "overpass", "osrm")
+MODES = ("synthetic", "replay", "record")
+
+# Typical latency of the public services
+DEFAULT_PROFILES = {
+    "nominatim": {"latency_ms": 250.0, "latency_sigma": 0.5, "error_rate": 0.0, "rate_limit": 0.0, "burst": 1.0},
+    "overpass": {"latency_ms": 1200.0, "latency_sigma": 0.8, "error_rate": 0.0, "rate_limit": 0.0, "burst": 2.0},
+    "osrm": {"latency_ms": 40.0, "latency_sigma": 0.4, "error_rate": 0.0, "rate_limit": 0.0, "burst": 2.0},
+}
+
+# Where record mode fetches real responses
+REAL_UPSTREAMS = {
+    "nominatim": "https://nominatim.openstreetmap.org",
+    "overpass": "https://overpass-api.de",
+    "osrm": "http://router.project-osrm.org",
+}
+# Minimum gap between recorded requests to one public service
+RECORD_INTERVAL_SEC = 1.0
+
+ERROR_STATUSES = (502, 503, 504)
+
+
+class ServiceProfile:
+    """Latency, error and rate-limit behaviour of one simulated service."""
+
+    FIELDS = ("latency_ms", "latency_sigma", "error_rate", "rate_limit", "burst")
+
+    def __init__(self, latency_ms: float, latency_sigma: float, error_rate: float,
+                 rate_limit: float, burst: float):
+        self.update(latency_ms=latency_ms, latency_sigma=latency_sigma, error_rate=error_rate,
+                    rate_limit=rate_limit, burst=burst)
+
+    def update(self, **values):
+        """Change settings; rate_limit 0 means unlimited."""
+        for name, value in values.items():
+            if name not in self.FIELDS:
+                raise ValueError(f"Unknown setting: {name}")
+            value = float(value)
+            if value < 0 or (name == "error_rate" and value > 1):
+                raise ValueError(f"Out of range: {name}={value}")
+            setattr(self, name, value)
+        self._tokens = max(1.0, self.burst)
+        self._updated = time.monotonic()
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Seconds to wait before answering."""
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.latency_ms / 1000 * math.exp(self.latency_sigma * rng.gauss(0, 1))
+
+    def take_token(self) -> bool:
+        """False if the request is over the rate limit."""
+        if self.rate_limit <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(max(1.0, self.burst), self._tokens + (now - self._updated) * self.rate_limit)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class UpstreamSimulator:
+    """Shared state behind the simulator routes."""
+
+    def __init__(self, mode: str = "synthetic", recordings_dir: Optional[str] = None,
+                 replay_only: bool = False, profiles: Optional[Dict[str, Dict]] = None,
+                 seed: Optional[int] = None):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if mode != "synthetic" and not recordings_dir:
+            raise ValueError(f"{mode} mode needs a recordings directory")
+        self.mode = mode
+        self.replay_only = replay_only
+        self.recordings = RecordingStore(recordings_dir) if recordings_dir else None
+        self.profiles = {
+            service: ServiceProfile(**{**DEFAULT_PROFILES[service], **(profiles or {}).get(service, {})})
+            for service in SERVICES
+        }
+        self._rng = random.Random(seed)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._record_locks = {service: asyncio.Lock() for service in SERVICES}
+        self._last_recorded = {service: 0.0 for service in SERVICES}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {
+            service: {"requests": 0, "rate_limited": 0, "errors_injected": 0, "replayed": 0,
+                      "synthesized": 0, "recorded": 0, "status": {}, "latency_injected_sec": 0.0}
+            for service in SERVICES
+        }
+
+    async def handle(self, service: str, request: Request, synthesize, body: str = "") -> Response:
+        """Answer one upstream request: rate limit, latency, errors, then the response itself."""
+        response = await self._handle(service, request, synthesize, body)
+        stats = self.stats[service]
+        stats["requests"] += 1
+        status = str(response.status_code)
+        stats["status"][status] = stats["status"].get(status, 0) + 1
+        return response
+
+    async def _handle(self, service: str, request: Request, synthesize, body: str) -> Response:
+        stats = self.stats[service]
+        key = request_key(service, request.url.path, list(request.query_params.multi_items()), body)
+        if self.mode == "record":
+            return await self._record(service, key, request, body)
+
+        profile = self.profiles[service]
+        if not profile.take_token():
+            stats["rate_limited"] += 1
+            return PlainTextResponse("Too Many Requests", status_code=429, headers={"Retry-After": "1"})
+
+        delay = profile.sample_latency(self._rng)
+        stats["latency_injected_sec"] += delay
+        await asyncio.sleep(delay)
+
+        if self._rng.random() < profile.error_rate:
+            stats["errors_injected"] += 1
+            status = self._rng.choice(ERROR_STATUSES)
+            return PlainTextResponse(f"Simulated upstream error {status}", status_code=status)
+
+        if self.mode == "replay":
+            recording = self.recordings.get(service, key)
+            if recording is not None:
+                stats["replayed"] += 1
+                return Response(recording["body"], status_code=recording["status"],
+                                media_type=recording["content_type"])
+            if self.replay_only:
+                return JSONResponse({"error": "No recording for this request"}, status_code=404)
+
+        try:
+            # Large Overpass areas take a while to generate; keep the loop free
+            payload = await asyncio.to_thread(synthesize)
+        except synthetic.BadRequest as e:
+            if service == "osrm":
+                return JSONResponse({"code": str(e), "message": str(e)}, status_code=400)
+            return PlainTextResponse(str(e), status_code=400)
+        stats["synthesized"] += 1
+        return JSONResponse(payload)
+
+    async def _record(self, service: str, key: str, request: Request, body: str) -> Response:
+        path = request.url.path
+        if service == "overpass":
+            path = "/api/interpreter"
+        url = REAL_UPSTREAMS[service] + path
+
+        # One request at a time per public service, spaced out per its usage policy
+        async with self._record_locks[service]:
+            wait = self._last_recorded[service] + RECORD_INTERVAL_SEC - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                upstream = await self._get_client().request(
+                    request.method, url, params=list(request.query_params.multi_items()),
+                    data={"data": body} if body else None,
+                )
+            finally:
+                self._last_recorded[service] = time.monotonic()
+
+        content_type = upstream.headers.get("content-type", "application/json")
+        if upstream.status_code == 200:
+            self.recordings.save(service, key, {
+                "method": request.method, "path": request.url.path,
+                "query": list(request.query_params.multi_items()), "body": body,
+            }, upstream.status_code, content_type, upstream.text)
+            self.stats[service]["recorded"] += 1
+        return Response(upstream.content, status_code=upstream.status_code, media_type=content_type)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=180.0, headers={"User-Agent": "LA-Interactive-Map/1.0"})
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+async def _overpass_query(request: Request) -> str:
+    """The QL query from ?data=, a form-encoded data= body, or a raw body."""
+    if request.method == "GET":
+        return request.query_params.get("data", "")
+    if request.headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+        form = await request.form()
+        if "data" in form:
+            return str(form["data"])
+    return (await request.body()).decode("utf-8", errors="replace")
+
+
+def create_app(simulator: UpstreamSimulator) -> FastAPI:
+    """Build the simulator app around shared simulator state."""
+    app = FastAPI(title="Upstream Simulator", description="Local stand-in for Nominatim, Overpass and OSRM")
+    app.state.simulator = simulator
+
+    @app.on_event("shutdown")
+    async def close_client():
+        await simulator.aclose()
+
+    @app.get("/search")
+    async def nominatim_search(request: Request):
+        params = dict(request.query_params)
+        return await simulator.handle("nominatim", request, lambda: synthetic.nominatim_search(params))
+
+    @app.api_route("/api/interpreter", methods=["GET", "POST"])
+    @app.api_route("/interpreter", methods=["GET", "POST"])
+    async def overpass_interpreter(request: Request):
+        query = await _overpass_query(request)
+        return await simulator.handle("overpass", request, lambda: synthetic.overpass_interpreter(query), query)
+
+    @app.get("/route/v1/{profile}/{coords:path}")
+    async def osrm_route(profile: str, coords: str, request: Request):
+        params = dict(request.query_params)
+        return await simulator.handle("osrm", request, lambda: synthetic.osrm_route(profile, coords, params))
+
+    @app.get("/table/v1/{profile}/{coords:path}")
+    async def osrm_table(profile: str, coords: str, request: Request):
+        params = dict(request.query_params)
+        return await simulator.handle("osrm", request, lambda: synthetic.osrm_table(profile, coords, params))
+
+    @app.get("/_simulator/config")
+    async def get_config():
+        return {
+            "mode": simulator.mode,
+            "replay_only": simulator.replay_only,
+            "profiles": {service: profile.to_dict() for service, profile in simulator.profiles.items()},
+        }
+
+    @app.put("/_simulator/config")
+    async def update_config(changes: Dict[str, Dict[str, float]] = Body(...)):
+        """Change fault profiles, e.g. {"overpass": {"error_rate": 0.2}}."""
+        unknown = [service for service in changes if service not in SERVICES]
+        if unknown:
+            return JSONResponse({"error": f"Unknown services: {unknown}"}, status_code=400)
+        try:
+            for service, values in changes.items():
+                simulator.profiles[service].update(**values)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return await get_config()
+
+    @app.get("/_simulator/stats")
+    async def get_stats():
+        stats = {
+            service: {**counts, "latency_injected_sec": round(counts["latency_injected_sec"], 3)}
+            for service, counts in simulator.stats.items()
+        }
+        if simulator.recordings is not None:
+            stats["recordings"] = simulator.recordings.count()
+        return stats
+
+    @app.post("/_simulator/reset")
+    async def reset_stats():
+        simulator.reset_stats()
+        return {"status": "reset"}
+
+    return app
@@ -0,0 +1,433 @@
+"""
+Synthetic Nominatim, Overpass and OSRM responses.
+
+Responses have the same shape as the real services' JSON (only the fields a
+client is likely to read) and are seeded from the request, so repeating a
+request returns the same body, like a real upstream with stable data.
+"""
+
+import hashlib
+import math
+import random
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.services.zone_service import ZONE_CENTERS, get_zone_name
+from app.utils.geo_utils import calculate_distance, encode_polyline
+from app.utils.zone_utils import point_in_polygon
+
+# Area results are drawn from when a search has no viewbox: (south, west, north, east)
+LA_BBOX = (33.70, -118.70, 34.35, -117.70)
+
+# Radius of the polygons returned for zone place names
+ZONE_RADIUS_KM = 5.0
+
+# Overpass nodes generated per km² for each tag value (roughly urban LA), used
+# for unlisted values and key-only filters; ways are rarer than nodes. Each
+# statement is capped (wide real searches return a few thousand elements)
+OVERPASS_DENSITY_PER_KM2 = {
+    "restaurant": 6.0, "fast_food": 4.0, "cafe": 3.0, "bar": 1.5, "pub": 0.5, "toilets": 0.5,
+    "drinking_water": 0.5, "attraction": 0.6, "museum": 0.2, "gallery": 0.2, "monument": 0.2,
+}
+OVERPASS_DEFAULT_DENSITY = 1.0
+OVERPASS_KEY_ONLY_DENSITY = 20.0
+OVERPASS_WAY_SHARE = 0.3
+OVERPASS_MAX_PER_STATEMENT = 2000
+
+# Values used when an Overpass filter names a key but no value
+_TAG_VALUES = {
+    "amenity": ["restaurant", "cafe", "bar", "pub", "fast_food", "toilets", "drinking_water", "parking", "fuel"],
+    "tourism": ["attraction", "museum", "gallery", "viewpoint"],
+    "historic": ["monument", "memorial"],
+    "shop": ["convenience", "supermarket", "clothes", "bakery"],
+}
+_STREETS = ["Main St", "Broadway", "Sunset Blvd", "Colorado Blvd", "Pacific Ave", "Vermont Ave", "Figueroa St"]
+_CITIES = ["Los Angeles", "Pasadena", "Long Beach", "Anaheim", "Inglewood", "Pomona", "Carson"]
+
+# Effective speed (m/s) and road detour factor per OSRM profile
+_PROFILE_SPEEDS = {"driving": 11.0, "car": 11.0, "cycling": 4.5, "bike": 4.5, "foot": 1.35, "walking": 1.35}
+_DETOUR = 1.3
+
+_AROUND = re.compile(r"around:\s*([\d.]+)\s*,\s*(-?[\d.]+)\s*,\s*(-?[\d.]+)")
+_POLY = re.compile(r'poly:\s*"([^"]*)"')
+_STATEMENT = re.compile(r"\b(node|way|relation|nwr)((?:\[[^\]]*\])*)\(([^)]*)\)")
+_OUT_CENTER = re.compile(r"\bout\b[^;]*\bcenter\b")
+_TAG_FILTER = re.compile(r'\[\s*"?([^"=\]]+)"?\s*(?:=\s*"?([^"\]]*)"?)?\s*\]')
+
+
+class BadRequest(ValueError):
+    """The request can't be answered; the message is returned to the client."""
+
+
+def _rng(*parts) -> random.Random:
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+# ---------------- Nominatim ----------------
+
+def _zone_places() -> Dict[str, Tuple[float, float]]:
+    """Nominatim query string used for each zone -> zone centre."""
+    return {get_zone_name(zone)[0].lower(): center for zone, center in ZONE_CENTERS.items()}
+
+
+_PLACES = _zone_places()
+
+
+def nominatim_search(params: Dict[str, str]) -> List[Dict]:
+    """Results for GET /search."""
+    query = (params.get("q") or "").strip()
+    if not query:
+        raise BadRequest("Nothing to search for")
+    limit = min(int(params.get("limit", 10)), 50)
+    details = params.get("addressdetails") == "1"
+    polygon = params.get("polygon_geojson") == "1"
+
+    center = _PLACES.get(query.lower())
+    if center is not None:
+        return [_place_result(query, center, details, polygon)][:limit]
+
+    south, west, north, east = _viewbox(params.get("viewbox"))
+    rng = _rng("search", query.lower(), params.get("viewbox"))
+    count = min(limit, int(rng.expovariate(1 / 6)))
+    results = []
+    for i in range(count):
+        lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+        name = f"{query.title()} {i + 1}"
+        results.append(_result(rng, name, lat, lon, "amenity", "restaurant", details, polygon))
+    return results
+
+
+def _viewbox(viewbox: Optional[str]) -> Tuple[float, float, float, float]:
+    if not viewbox:
+        return LA_BBOX
+    try:
+        x1, y1, x2, y2 = (float(v) for v in viewbox.split(","))
+    except ValueError:
+        raise BadRequest("Bad viewbox parameter")
+    return min(y1, y2), min(x1, x2), max(y1, y2), max(x1, x2)
+
+
+def _place_result(query: str, center: Tuple[float, float], details: bool, polygon: bool) -> Dict:
+    rng = _rng("place", query.lower())
+    result = _result(rng, query.split(",")[0], center[0], center[1], "boundary", "administrative", details, False)
+    if polygon:
+        result["geojson"] = {"type": "Polygon", "coordinates": [_ring(rng, center, ZONE_RADIUS_KM)]}
+    return result
+
+
+def _ring(rng: random.Random, center: Tuple[float, float], radius_km: float, sides: int = 64) -> List[List[float]]:
+    """Closed, slightly irregular ring of [lon, lat] around ``center``."""
+    lat, lon = center
+    ring = []
+    for i in range(sides):
+        angle = 2 * math.pi * i / sides
+        r = radius_km * rng.uniform(0.85, 1.1)
+        ring.append([
+            round(lon + r / (111.32 * math.cos(math.radians(lat))) * math.cos(angle), 7),
+            round(lat + r / 110.57 * math.sin(angle), 7),
+        ])
+    ring.append(ring[0])
+    return ring
+
+
+def _result(rng: random.Random, name: str, lat: float, lon: float, osm_class: str, osm_type: str,
+            details: bool, polygon: bool) -> Dict:
+    street = f"{rng.randint(1, 9999)} {rng.choice(_STREETS)}"
+    city = rng.choice(_CITIES)
+    result = {
+        "place_id": rng.randint(10_000_000, 400_000_000),
+        "licence": "Data © OpenStreetMap contributors, ODbL 1.0. https://osm.org/copyright",
+        "osm_type": "node",
+        "osm_id": rng.randint(1, 12_000_000_000),
+        "lat": f"{lat:.7f}",
+        "lon": f"{lon:.7f}",
+        "class": osm_class,
+        "type": osm_type,
+        "place_rank": 30,
+        "importance": round(rng.uniform(0.00001, 0.6), 8),
+        "addresstype": osm_type,
+        "name": name,
+        "display_name": f"{name}, {street}, {city}, California, United States",
+        "boundingbox": [f"{lat - 0.0001:.7f}", f"{lat + 0.0001:.7f}", f"{lon - 0.0001:.7f}", f"{lon + 0.0001:.7f}"],
+    }
+    if details:
+        result["address"] = {
+            "road": street, "city": city, "county": "Los Angeles County",
+            "state": "California", "country": "United States", "country_code": "us",
+        }
+    if polygon:
+        result["geojson"] = {"type": "Point", "coordinates": [lon, lat]}
+    return result
+
+
+# ---------------- Overpass ----------------
+
+def overpass_interpreter(query: str) -> Dict:
+    """Response for an Overpass QL query (around: and poly: filters)."""
+    statements = _STATEMENT.findall(query)
+    if not statements:
+        raise BadRequest("No supported statement in the query (node/way/nwr with around: or poly:)")
+    with_center = _OUT_CENTER.search(query) is not None
+
+    elements, seen = [], set()
+    for element_type, filters, area in statements:
+        tags = _TAG_FILTER.findall(filters)
+        rng = _rng("overpass", element_type, filters, area)
+        for element in _statement_elements(rng, element_type, tags, area, with_center):
+            key = (element["type"], element["id"])
+            if key not in seen:
+                seen.add(key)
+                elements.append(element)
+    return {
+        "version": 0.6,
+        "generator": "Overpass API (simulated)",
+        "osm3s": {"timestamp_osm_base": "2024-01-01T00:00:00Z",
+                  "copyright": "The data included in this document is from www.openstreetmap.org."},
+        "elements": elements,
+    }
+
+
+def _statement_elements(rng: random.Random, element_type: str, tags: List[Tuple[str, str]], area: str,
+                        with_center: bool) -> List[Dict]:
+    sampler = _area_sampler(area)
+    count = min(OVERPASS_MAX_PER_STATEMENT, int(sampler.area_km2 * _density(element_type, tags)))
+    elements = []
+    for _ in range(count):
+        point = sampler.sample(rng)
+        if point is None:
+            continue
+        lat, lon = point
+        element_tags = {}
+        for key, value in tags:
+            key = key.strip()
+            element_tags[key] = value or rng.choice(_TAG_VALUES.get(key, ["yes"]))
+        if rng.random() < 0.8:
+            element_tags["name"] = f"{element_tags.get('amenity', 'Place').replace('_', ' ').title()} {rng.randint(1, 99999)}"
+        if rng.random() < 0.5:
+            element_tags.update({
+                "addr:street": f"{rng.randint(1, 9999)} {rng.choice(_STREETS)}",
+                "addr:city": rng.choice(_CITIES),
+                "addr:state": "CA",
+            })
+
+        kind = element_type if element_type in ("node", "way") else ("node" if rng.random() < 0.7 else "way")
+        element = {"type": kind, "id": rng.randint(1, 12_000_000_000)}
+        if kind == "node":
+            element.update({"lat": round(lat, 7), "lon": round(lon, 7)})
+        elif with_center:
+            element["center"] = {"lat": round(lat, 7), "lon": round(lon, 7)}
+        element["tags"] = element_tags
+        elements.append(element)
+    return elements
+
+
+def _density(element_type: str, tags: List[Tuple[str, str]]) -> float:
+    """Elements per km² for a statement's tag filters."""
+    value = next((v for _, v in tags if v), None)
+    if value is not None:
+        density = OVERPASS_DENSITY_PER_KM2.get(value, OVERPASS_DEFAULT_DENSITY)
+    elif tags:
+        density = OVERPASS_KEY_ONLY_DENSITY
+    else:
+        density = OVERPASS_DEFAULT_DENSITY
+    if element_type == "way":
+        density *= OVERPASS_WAY_SHARE
+    elif element_type == "node":
+        density *= 1 - OVERPASS_WAY_SHARE
+    return density
+
+
+class _AreaSampler:
+    """Uniform points inside an around: circle or poly: polygon."""
+
+    def __init__(self, bbox: Tuple[float, float, float, float], area_km2: float, contains):
+        self.bbox = bbox
+        self.area_km2 = area_km2
+        self._contains = contains
+
+    def sample(self, rng: random.Random, attempts: int = 20) -> Optional[Tuple[float, float]]:
+        south, west, north, east = self.bbox
+        for _ in range(attempts):
+            lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+            if self._contains(lat, lon):
+                return lat, lon
+        return None
+
+
+def _area_sampler(area: str) -> _AreaSampler:
+    around = _AROUND.search(area)
+    if around:
+        radius_m, lat, lon = (float(v) for v in around.groups())
+        lat_span = radius_m / 110_570
+        lon_span = radius_m / (111_320 * max(math.cos(math.radians(lat)), 1e-6))
+        return _AreaSampler(
+            (lat - lat_span, lon - lon_span, lat + lat_span, lon + lon_span),
+            math.pi * (radius_m / 1000) ** 2,
+            lambda p_lat, p_lon: calculate_distance(lat, lon, p_lat, p_lon) * 1000 <= radius_m,
+        )
+
+    poly = _POLY.search(area)
+    if poly:
+        values = [float(v) for v in poly.group(1).split()]
+        if len(values) < 6 or len(values) % 2:
+            raise BadRequest("poly: needs at least three lat/lon pairs")
+        ring = [(values[i + 1], values[i]) for i in range(0, len(values), 2)]  # (lon, lat)
+        lons, lats = [p[0] for p in ring], [p[1] for p in ring]
+        return _AreaSampler(
+            (min(lats), min(lons), max(lats), max(lons)),
+            _polygon_area_km2(ring),
+            lambda p_lat, p_lon: point_in_polygon((p_lon, p_lat), [ring]),
+        )
+    raise BadRequest(f"Unsupported area filter: ({area})")
+
+
+def _polygon_area_km2(ring: List[Tuple[float, float]]) -> float:
+    """Shoelace area of a (lon, lat) ring, on a local equirectangular projection."""
+    mean_lat = sum(p[1] for p in ring) / len(ring)
+    kx, ky = 111.32 * math.cos(math.radians(mean_lat)), 110.57
+    total = 0.0
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        total += (x1 * kx) * (y2 * ky) - (x2 * kx) * (y1 * ky)
+    return abs(total) / 2
+
+
+# ---------------- OSRM ----------------
+
+def _coordinates(coords: str) -> List[Tuple[float, float]]:
+    """Parse OSRM's "lon,lat;lon,lat" path segment into (lat, lon) tuples."""
+    points = []
+    for pair in coords.split(";"):
+        try:
+            lon, lat = (float(v) for v in pair.split(","))
+        except ValueError:
+            raise BadRequest("InvalidUrl")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise BadRequest("InvalidValue")
+        points.append((lat, lon))
+    return points
+
+
+def _speed(profile: str) -> float:
+    return _PROFILE_SPEEDS.get(profile, _PROFILE_SPEEDS["driving"])
+
+
+def osrm_route(profile: str, coords: str, params: Dict[str, str]) -> Dict:
+    """Response for GET /route/v1/{profile}/{coords}."""
+    points = _coordinates(coords)
+    if len(points) < 2:
+        raise BadRequest("InvalidUrl")
+    speed = _speed(profile)
+    rng = _rng("route", profile, coords)
+    with_steps = params.get("steps") == "true"
+    overview = params.get("overview", "simplified")
+    geometries = params.get("geometries", "polyline")
+
+    legs, path = [], [points[0]]
+    for start, end in zip(points, points[1:]):
+        distance = calculate_distance(start[0], start[1], end[0], end[1]) * 1000 * _DETOUR
+        leg_path = _leg_path(rng, start, end)
+        path.extend(leg_path[1:])
+        leg = {"distance": round(distance, 1), "duration": round(distance / speed, 1),
+               "weight": round(distance / speed, 1), "summary": rng.choice(_STREETS), "steps": []}
+        if with_steps:
+            leg["steps"] = _steps(rng, leg_path, distance, speed)
+        legs.append(leg)
+
+    distance = sum(leg["distance"] for leg in legs)
+    duration = sum(leg["duration"] for leg in legs)
+    route = {"distance": round(distance, 1), "duration": round(duration, 1), "weight": round(duration, 1),
+             "weight_name": "routability", "legs": legs}
+    if overview != "false":
+        route["geometry"] = _geometry(path if overview == "full" else path[::3] + [path[-1]], geometries)
+    return {
+        "code": "Ok",
+        "routes": [route],
+        "waypoints": [{"name": rng.choice(_STREETS), "location": [lon, lat], "distance": round(rng.uniform(0, 30), 1)}
+                      for lat, lon in points],
+    }
+
+
+def osrm_table(profile: str, coords: str, params: Dict[str, str]) -> Dict:
+    """Response for GET /table/v1/{profile}/{coords}."""
+    points = _coordinates(coords)
+    sources = _indexes(params.get("sources"), len(points))
+    destinations = _indexes(params.get("destinations"), len(points))
+    annotations = (params.get("annotations") or "duration").split(",")
+    speed = _speed(profile)
+
+    distances = [
+        [round(calculate_distance(points[s][0], points[s][1], points[d][0], points[d][1]) * 1000 * _DETOUR, 1)
+         for d in destinations]
+        for s in sources
+    ]
+    response = {
+        "code": "Ok",
+        "sources": [{"location": [points[i][1], points[i][0]], "name": ""} for i in sources],
+        "destinations": [{"location": [points[i][1], points[i][0]], "name": ""} for i in destinations],
+    }
+    if "duration" in annotations:
+        response["durations"] = [[round(d / speed, 1) for d in row] for row in distances]
+    if "distance" in annotations:
+        response["distances"] = distances
+    return response
+
+
+def _indexes(value: Optional[str], count: int) -> List[int]:
+    if not value or value == "all":
+        return list(range(count))
+    try:
+        indexes = [int(v) for v in value.split(";")]
+    except ValueError:
+        raise BadRequest("InvalidQuery")
+    if any(i < 0 or i >= count for i in indexes):
+        raise BadRequest("InvalidQuery")
+    return indexes
+
+
+def _leg_path(rng: random.Random, start: Tuple[float, float], end: Tuple[float, float],
+              segments: int = 12) -> List[Tuple[float, float]]:
+    """Wobbly line from start to end, standing in for a road path."""
+    path = [start]
+    for i in range(1, segments):
+        t = i / segments
+        path.append((
+            start[0] + (end[0] - start[0]) * t + rng.uniform(-0.0015, 0.0015),
+            start[1] + (end[1] - start[1]) * t + rng.uniform(-0.0015, 0.0015),
+        ))
+    path.append(end)
+    return path
+
+
+def _steps(rng: random.Random, path: List[Tuple[float, float]], distance: float, speed: float) -> List[Dict]:
+    turns = max(1, min(len(path) - 2, int(distance // 800)))
+    step_distance = distance / (turns + 1)
+    steps = []
+    for i in range(turns + 2):
+        lat, lon = path[min(len(path) - 1, round(i * (len(path) - 1) / (turns + 1)))]
+        if i == 0:
+            maneuver = {"type": "depart"}
+        elif i == turns + 1:
+            maneuver = {"type": "arrive"}
+        else:
+            maneuver = {"type": "turn", "modifier": rng.choice(["left", "right", "slight left", "slight right"])}
+        maneuver.update({"location": [round(lon, 6), round(lat, 6)],
+                         "bearing_before": rng.randint(0, 359), "bearing_after": rng.randint(0, 359)})
+        last = i == turns + 1
+        steps.append({
+            "name": rng.choice(_STREETS),
+            "mode": "driving",
+            "maneuver": maneuver,
+            "distance": 0 if last else round(step_distance, 1),
+            "duration": 0 if last else round(step_distance / speed, 1),
+            "weight": 0 if last else round(step_distance / speed, 1),
+            "driving_side": "right",
+            "intersections": [],
+        })
+    return steps
+
+
+def _geometry(path: List[Tuple[float, float]], geometries: str):
+    if geometries == "geojson":
+        return {"type": "LineString", "coordinates": [[round(lon, 6), round(lat, 6)] for lat, lon in path]}
+    return encode_polyline(path, 6 if geometries == "polyline6" else 5)
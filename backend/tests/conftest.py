@@ -0,0 +1,46 @@
+"""
+Shared fixtures for the offline test suite (no upstream APIs are called).
+
+Run from the backend directory:
+
+    python -m pytest -q
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.checkin_memory import MemoryCheckinStore
+from app.services.checkin_sqlite import SQLiteCheckinStore
+
+# Start of the synthetic timeline used by make_checkin
+T0 = datetime(2024, 6, 1, 12, 0, 0)
+
+
+def make_checkin(n: int, zone: str = "Test Zone", poi: str = None, minutes: float = None, **fields) -> dict:
+    """Store fields for the n-th test check-in, ``minutes`` (default n) after T0."""
+    poi = poi or f"poi-{n % 7}"
+    record = {
+        "user_name": f"user-{n % 5}",
+        "poi_name": poi.replace("-", " ").title(),
+        "poi_id": f"{zone}-{poi}",
+        "poi_lat": 34.0 + (n % 7) * 0.001,
+        "poi_lon": -118.0 - (n % 7) * 0.001,
+        "zone_name": zone,
+        "caption": f"check-in {n}",
+        "timestamp": (T0 + timedelta(minutes=n if minutes is None else minutes)).isoformat(),
+        "amenity_type": "cafe",
+    }
+    record.update(fields)
+    return record
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """An empty check-in store of each kind."""
+    if request.param == "memory":
+        yield MemoryCheckinStore(zone_capacity=1000)
+    else:
+        sqlite_store = SQLiteCheckinStore(str(tmp_path / "checkins.db"))
+        yield sqlite_store
+        sqlite_store.close()
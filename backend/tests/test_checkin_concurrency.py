@@ -0,0 +1,103 @@
+"""
+Concurrent writers and readers on the check-in stores: no lost updates, no
+duplicate ids and no torn reads.
+"""
+
+import sys
+import threading
+from collections import Counter
+
+import pytest
+
+from app.services.checkin_memory import MemoryCheckinStore
+
+from .conftest import make_checkin
+
+ZONES = ["Zone A", "Zone B", "Zone C"]
+WRITERS = 8
+WRITES = 150
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    """Switch threads far more often than the default 5 ms to shake out races."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _run(threads):
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _writer(store, worker, batch_size=1):
+    def write():
+        records = [
+            make_checkin(n, zone=ZONES[(worker + n) % len(ZONES)], poi=f"poi-{n % 4}")
+            for n in range(WRITES)
+        ]
+        for i in range(0, len(records), batch_size):
+            store.add_checkins(records[i:i + batch_size])
+    return threading.Thread(target=write)
+
+
+@pytest.mark.parametrize("batch_size", [1, 10])
+def test_concurrent_writes_lose_no_updates(store, batch_size):
+    _run([_writer(store, worker, batch_size) for worker in range(WRITERS)])
+
+    expected = Counter()
+    for worker in range(WRITERS):
+        for n in range(WRITES):
+            expected[(ZONES[(worker + n) % len(ZONES)], f"poi-{n % 4}")] += 1
+
+    all_ids = []
+    for zone in ZONES:
+        feed = store.get_zone_checkins(zone, 1000)
+        ids = [int(c["id"]) for c in feed]
+        assert ids == sorted(ids, reverse=True)
+        all_ids.extend(ids)
+        top = {loc["poi_id"]: loc["checkin_count"] for loc in store.get_top_locations(zone, 10)}
+        assert top == {f"{zone}-{poi}": count for (z, poi), count in expected.items() if z == zone}
+        assert len(feed) == sum(top.values())
+
+    assert len(all_ids) == len(set(all_ids)) == WRITERS * WRITES
+
+
+def test_readers_see_consistent_snapshots_during_writes():
+    store = MemoryCheckinStore(zone_capacity=100)
+    writers = [_writer(store, worker) for worker in range(WRITERS)]
+    done = threading.Event()
+    problems = []
+
+    def read():
+        while not done.is_set():
+            for zone in ZONES:
+                ids = [int(c["id"]) for c in store.get_zone_checkins(zone, 50)]
+                if ids != sorted(ids, reverse=True) or len(ids) != len(set(ids)):
+                    problems.append(("feed", zone, ids))
+                counts = [loc["checkin_count"] for loc in store.get_top_locations(zone, 10)]
+                if counts != sorted(counts, reverse=True):
+                    problems.append(("top", zone, counts))
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    _run(writers)
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert problems == []
+    # Feeds stay bounded while writers outpace the trimming
+    assert all(len(store.get_zone_checkins(zone, 1000)) == 100 for zone in ZONES)
+
+
+def test_version_counts_every_write_to_a_zone():
+    store = MemoryCheckinStore()
+    _run([_writer(store, worker) for worker in range(WRITERS)])
+
+    assert sum(store.zone_version(zone) for zone in ZONES) == WRITERS * WRITES
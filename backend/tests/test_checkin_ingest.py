@@ -0,0 +1,97 @@
+"""
+Bulk NDJSON import: accepted rows reach the store, bad lines are reported.
+"""
+
+import asyncio
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from app.models.schemas import ZonePolygon
+from app.services import checkin_store, zone_service
+from app.services.checkin_events import broadcaster
+from app.services.checkin_ingest import ingest_ndjson
+
+ZONE = "Ingest Test Zone"
+
+
+@pytest.fixture(autouse=True)
+def test_zone(monkeypatch):
+    """A single square zone around (34.05, -118.25), so no zones are fetched."""
+    square = [[(-118.3, 34.0), (-118.2, 34.0), (-118.2, 34.1), (-118.3, 34.1), (-118.3, 34.0)]]
+    monkeypatch.setitem(zone_service._zone_cache, "zones", [ZonePolygon(name=ZONE, color="#000000", coordinates=square)])
+    monkeypatch.setitem(zone_service._zone_cache, "expires_at", datetime.max)
+
+
+def _line(**fields) -> bytes:
+    record = {"user_name": "Importer", "poi_name": "Test Venue", "poi_lat": 34.05, "poi_lon": -118.25}
+    record.update(fields)
+    return json.dumps(record).encode() + b"\n"
+
+
+def _ingest(body: bytes, gzipped: bool = False, chunk_size: int = 3, split: int = 7) -> dict:
+    async def chunks():
+        # Split mid-line so the line reassembly is exercised
+        for i in range(0, len(body), split):
+            yield body[i:i + split]
+    return asyncio.run(ingest_ndjson(chunks(), gzipped=gzipped, chunk_size=chunk_size))
+
+
+def _venue_count(poi_id: str) -> int:
+    counts = {loc["poi_id"]: loc["checkin_count"] for loc in checkin_store.get_top_locations(ZONE, 100)}
+    return counts.get(poi_id, 0)
+
+
+def test_bulk_ingest_reports_rejected_lines():
+    body = b"".join([
+        _line(poi_id="ingest-ok"),                       # 1
+        b"{not json\n",                                  # 2
+        _line(poi_id="ingest-ok", poi_lat=95),           # 3
+        b"\n",                                           # 4 (blank, skipped)
+        _line(poi_id="ingest-ok", poi_lat=40.0),         # 5 outside every zone
+        json.dumps({"poi_name": "No User"}).encode() + b"\n",  # 6
+        _line(poi_id="ingest-ok", timestamp="2024-01-01T10:00:00"),  # 7
+    ])
+
+    result = _ingest(body)
+
+    assert result["accepted"] == 2
+    assert result["rejected"] == 4
+    errors = {error["line"]: error["error"] for error in result["errors"]}
+    assert sorted(errors) == [2, 3, 5, 6]
+    assert errors[2].startswith("Invalid JSON")
+    assert "poi_lat" in errors[3]
+    assert errors[5] == "Coordinates are outside every zone"
+    assert "user_name" in errors[6] and "poi_lat" in errors[6]
+    assert _venue_count("ingest-ok") == 2
+
+
+def test_bulk_ingest_accepts_gzip_and_a_final_line_without_newline():
+    body = b"".join(_line(poi_id="ingest-gzip") for _ in range(4)).rstrip(b"\n")
+
+    result = _ingest(gzip.compress(body), gzipped=True)
+
+    assert result == {"accepted": 4, "rejected": 0, "errors": []}
+    assert _venue_count("ingest-gzip") == 4
+
+
+def test_bulk_ingest_rejects_a_corrupt_gzip_body():
+    with pytest.raises(ValueError, match="Invalid gzip body"):
+        _ingest(b"definitely not gzip", gzipped=True)
+
+
+def test_bulk_ingest_does_not_publish_to_live_streams():
+    async def run():
+        subscription = broadcaster.subscribe(ZONE)
+        try:
+            async def body():
+                yield _line(poi_id="ingest-quiet")
+            await ingest_ndjson(body())
+            return await subscription.get(0.05)
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    assert asyncio.run(run()) is None
+    assert _venue_count("ingest-quiet") == 1
@@ -0,0 +1,78 @@
+"""
+Nearby check-ins from the grid index against a brute-force scan.
+"""
+
+import math
+import random
+
+import pytest
+
+from app.services.checkin_nearby import NearbyCheckinIndex
+
+from .conftest import make_checkin
+
+
+def _brute_force_near(checkins, lat, lon, radius_m):
+    cos_lat = math.cos(math.radians(lat))
+    matches = {}
+    for checkin in checkins:
+        dy = (checkin["poi_lat"] - lat) * 111_320.0
+        dx = (checkin["poi_lon"] - lon) * 111_320.0 * cos_lat
+        distance = math.hypot(dx, dy)
+        if distance <= radius_m:
+            matches[checkin["id"]] = distance
+    return matches
+
+
+def _random_checkins(count, seed=3):
+    rng = random.Random(seed)
+    return [
+        make_checkin(
+            n,
+            id=str(n),
+            poi_lat=34.05 + rng.uniform(-0.05, 0.05),
+            poi_lon=-118.25 + rng.uniform(-0.05, 0.05),
+            minutes=rng.uniform(0, 10_000),
+        )
+        for n in range(count)
+    ]
+
+
+@pytest.mark.parametrize("radius_m", [50, 300, 1500, 5000])
+def test_nearby_matches_brute_force(radius_m):
+    checkins = _random_checkins(3000)
+    index = NearbyCheckinIndex(cell_deg=0.005, cell_capacity=10_000)
+    index.add_many(checkins)
+
+    for lat, lon in [(34.05, -118.25), (34.02, -118.28), (34.11, -118.19)]:
+        expected = _brute_force_near(checkins, lat, lon, radius_m)
+        found = index.near(lat, lon, radius_m, limit=len(checkins))
+
+        assert {c["id"] for c in found} == set(expected)
+        assert [c["distance_m"] for c in found] == sorted(round(d, 1) for d in expected.values())
+
+
+def test_nearby_recent_sorts_by_timestamp():
+    checkins = _random_checkins(500)
+    index = NearbyCheckinIndex(cell_deg=0.005, cell_capacity=10_000)
+    index.add_many(checkins)
+
+    found = index.near(34.05, -118.25, 2000, limit=20, sort="recent")
+    expected = sorted(
+        (c for c in checkins if c["id"] in _brute_force_near(checkins, 34.05, -118.25, 2000)),
+        key=lambda c: c["timestamp"], reverse=True
+    )[:20]
+
+    assert [c["id"] for c in found] == [c["id"] for c in expected]
+
+
+def test_nearby_cells_keep_the_newest_checkins():
+    index = NearbyCheckinIndex(cell_deg=0.005, cell_capacity=3)
+    base = dict(poi_lat=34.05, poi_lon=-118.25)
+    index.add_many([make_checkin(n, id=str(n), minutes=100 + n, **base) for n in range(5)])
+    # Imported history older than everything held must not evict recent check-ins
+    index.add_many([make_checkin(9, id="old", minutes=1, **base)])
+    index.add_many([make_checkin(8, id="mid", minutes=103.5, **base)])
+
+    found = index.near(34.05, -118.25, 100, sort="recent")
+    assert [c["id"] for c in found] == ["4", "mid", "3"]
@@ -0,0 +1,51 @@
+"""
+Check-in read endpoints: limit validation, since_id polling and ETags.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import checkin_routes
+from app.services import checkin_store
+
+from .conftest import make_checkin
+
+ZONE = "Route Test Zone"
+
+app = FastAPI()
+app.include_router(checkin_routes.router, prefix="/api")
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("path", [
+    f"/api/checkins/{ZONE}?limit=0",
+    f"/api/checkins/{ZONE}?limit=-1&since_id=0",
+    f"/api/checkins/{ZONE}?limit=201",
+    f"/api/locations/{ZONE}/top?limit=0",
+    f"/api/locations/{ZONE}/top?limit=101",
+    f"/api/locations/{ZONE}/trending?limit=-5",
+    f"/api/locations/{ZONE}/trending?limit=101",
+])
+def test_out_of_range_limits_are_rejected(path):
+    assert client.get(path).status_code == 422
+
+
+def test_since_id_polling_through_the_route():
+    checkin_store.load_checkins([make_checkin(n, zone=ZONE) for n in range(5)])
+    ids = sorted(int(c["id"]) for c in checkin_store.get_zone_checkins(ZONE, 5))
+
+    response = client.get(f"/api/checkins/{ZONE}", params={"since_id": ids[0], "limit": 2})
+
+    assert response.status_code == 200
+    assert [int(c["id"]) for c in response.json()] == [ids[2], ids[1]]
+
+
+def test_etag_answers_if_none_match_until_the_zone_changes():
+    checkin_store.load_checkins([make_checkin(1, zone=ZONE)])
+    for path in (f"/api/checkins/{ZONE}", f"/api/locations/{ZONE}/top"):
+        etag = client.get(path).headers["ETag"]
+
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+        checkin_store.load_checkins([make_checkin(2, zone=ZONE)])
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
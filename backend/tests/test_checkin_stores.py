@@ -0,0 +1,171 @@
+"""
+Behaviour shared by the in-memory and SQLite check-in stores.
+"""
+
+from collections import Counter
+
+from app.services.checkin_memory import MemoryCheckinStore
+from app.services.checkin_sqlite import SQLiteCheckinStore
+
+from .conftest import make_checkin
+
+
+def _ids(checkins):
+    return [int(c["id"]) for c in checkins]
+
+
+def test_memory_and_sqlite_return_the_same_data(tmp_path):
+    memory = MemoryCheckinStore(zone_capacity=1000)
+    sqlite = SQLiteCheckinStore(str(tmp_path / "parity.db"))
+    records = [make_checkin(n, zone="Zone A" if n % 3 else "Zone B") for n in range(1, 60)]
+    for batch in (records[:20], records[20:21], records[21:]):
+        memory.add_checkins(batch)
+        sqlite.add_checkins(batch)
+
+    for zone in ("Zone A", "Zone B", "Missing Zone"):
+        assert memory.get_zone_checkins(zone, 15) == sqlite.get_zone_checkins(zone, 15)
+        assert memory.get_zone_checkins(zone, 5, since_id=30) == sqlite.get_zone_checkins(zone, 5, since_id=30)
+        assert memory.get_zone_checkins(zone, 5, before_id=30) == sqlite.get_zone_checkins(zone, 5, before_id=30)
+        # Ties between equal counts may come back in either order
+        assert Counter(
+            (loc["poi_id"], loc["checkin_count"]) for loc in memory.get_top_locations(zone, 100)
+        ) == Counter(
+            (loc["poi_id"], loc["checkin_count"]) for loc in sqlite.get_top_locations(zone, 100)
+        )
+    sqlite.close()
+
+
+def test_zone_checkins_are_newest_first(store):
+    store.add_checkins([make_checkin(n) for n in range(1, 11)])
+
+    assert _ids(store.get_zone_checkins("Test Zone", 4)) == [10, 9, 8, 7]
+    assert store.get_zone_checkins("Other Zone", 4) == []
+
+
+def test_sqlite_store_survives_a_restart(tmp_path):
+    path = str(tmp_path / "restart.db")
+    first = SQLiteCheckinStore(path)
+    first.add_checkins([make_checkin(n) for n in range(1, 6)])
+    epoch = first.epoch
+    first.close()
+
+    reopened = SQLiteCheckinStore(path)
+    stored = reopened.add_checkins([make_checkin(6)])
+
+    assert reopened.epoch == epoch
+    assert _ids(stored) == [6]
+    assert _ids(reopened.get_zone_checkins("Test Zone", 10)) == [6, 5, 4, 3, 2, 1]
+    # Seeding an already populated database is a no-op
+    assert reopened.seed([make_checkin(99)], {}) is False
+    reopened.close()
+
+
+def test_add_checkins_fills_id_and_photo_url(store):
+    stored = store.add_checkins([make_checkin(1), make_checkin(2)])
+
+    assert _ids(stored) == [1, 2]
+    assert stored[0]["photo_url"].endswith("random=1")
+    assert stored[1]["caption"] == "check-in 2"
+
+
+def test_ids_increase_across_zones(store):
+    store.add_checkins([make_checkin(n, zone="Zone A" if n % 2 else "Zone B") for n in range(1, 9)])
+
+    assert _ids(store.get_zone_checkins("Zone A", 10)) == [7, 5, 3, 1]
+    assert _ids(store.get_zone_checkins("Zone B", 10)) == [8, 6, 4, 2]
+
+
+def test_memory_feed_keeps_the_newest_zone_capacity_checkins():
+    store = MemoryCheckinStore(zone_capacity=10)
+    for n in range(1, 36):
+        store.add_checkins([make_checkin(n, poi="poi-0")])
+
+    assert _ids(store.get_zone_checkins("Test Zone", 100)) == list(range(35, 25, -1))
+    assert _ids(store.get_zone_checkins("Test Zone", 100, before_id=28)) == [27, 26]
+    # Trimmed check-ins still count towards the leaderboard
+    assert store.get_top_locations("Test Zone", 1)[0]["checkin_count"] == 35
+
+
+def test_top_locations_are_ordered_by_count(store):
+    # poi-0 x5, poi-1 x3, poi-2 x1, interleaved so order of arrival differs from rank
+    pois = ["poi-1", "poi-0", "poi-2", "poi-0", "poi-1", "poi-0", "poi-0", "poi-1", "poi-0"]
+    for n, poi in enumerate(pois):
+        store.add_checkins([make_checkin(n, poi=poi)])
+
+    top = store.get_top_locations("Test Zone", 10)
+
+    assert [(loc["poi_id"], loc["checkin_count"]) for loc in top] == [
+        ("Test Zone-poi-0", 5), ("Test Zone-poi-1", 3), ("Test Zone-poi-2", 1)
+    ]
+    assert len(store.get_top_locations("Test Zone", 2)) == 2
+
+
+def test_top_locations_match_counted_checkins(store):
+    records = [make_checkin(n, poi=f"poi-{(n * n) % 11}") for n in range(200)]
+    store.add_checkins(records)
+
+    top = store.get_top_locations("Test Zone", 100)
+    counts = [loc["checkin_count"] for loc in top]
+
+    assert counts == sorted(counts, reverse=True)
+    assert {loc["poi_id"]: loc["checkin_count"] for loc in top} == Counter(r["poi_id"] for r in records)
+
+
+def test_before_id_pages_through_history(store):
+    store.add_checkins([make_checkin(n) for n in range(1, 26)])
+
+    seen, before_id = [], None
+    while True:
+        page = store.get_zone_checkins("Test Zone", 10, before_id=before_id)
+        if not page:
+            break
+        seen.extend(_ids(page))
+        before_id = int(page[-1]["id"])
+
+    assert seen == list(range(25, 0, -1))
+
+
+def test_since_id_returns_only_newer_checkins(store):
+    store.add_checkins([make_checkin(n) for n in range(1, 11)])
+
+    assert _ids(store.get_zone_checkins("Test Zone", 20, since_id=7)) == [10, 9, 8]
+    assert store.get_zone_checkins("Test Zone", 20, since_id=10) == []
+
+
+def test_since_id_polling_leaves_no_gap(store):
+    store.add_checkins([make_checkin(n) for n in range(1, 6)])
+    cursor = 5
+    # More new check-ins arrive than one poll returns
+    store.add_checkins([make_checkin(n) for n in range(6, 30)])
+
+    first = store.get_zone_checkins("Test Zone", 10, since_id=cursor)
+    assert _ids(first) == list(range(15, 5, -1))
+
+    seen = []
+    while True:
+        page = store.get_zone_checkins("Test Zone", 10, since_id=cursor)
+        if not page:
+            break
+        seen.extend(reversed(_ids(page)))
+        cursor = int(page[0]["id"])
+    assert seen == list(range(6, 30))
+
+
+def test_zone_version_changes_on_write(store):
+    before = store.zone_version("Test Zone")
+    store.add_checkins([make_checkin(1)])
+    after = store.zone_version("Test Zone")
+
+    assert after != before
+    assert store.zone_version("Other Zone") == 0
+
+
+def test_imported_history_stays_out_of_the_feed(store):
+    store.add_checkins([make_checkin(n, minutes=1000 + n) for n in range(1, 4)])
+
+    store.import_checkins([make_checkin(n, minutes=n) for n in range(10, 15)])
+    store.import_checkins([make_checkin(20, minutes=2000)])
+
+    # The older imports count towards top locations but do not enter the feed
+    assert _ids(store.get_zone_checkins("Test Zone", 10)) == [9, 3, 2, 1]
+    assert sum(loc["checkin_count"] for loc in store.get_top_locations("Test Zone", 100)) == 9
@@ -0,0 +1,59 @@
+"""
+Upstream rate limits derived from the configured URLs.
+"""
+
+import pytest
+
+from app.config import _upstream_rate_limits
+
+PUBLIC = {
+    "NOMINATIM": "https://nominatim.openstreetmap.org",
+    "OVERPASS": "https://overpass-api.de/api/interpreter",
+    "OSRM": "http://router.project-osrm.org",
+}
+
+
+@pytest.fixture(autouse=True)
+def no_rate_settings(monkeypatch):
+    for name in PUBLIC:
+        monkeypatch.delenv(f"{name}_RATE_PER_SEC", raising=False)
+        monkeypatch.delenv(f"{name}_BURST", raising=False)
+
+
+def test_public_hosts_get_the_default_budgets():
+    assert _upstream_rate_limits(PUBLIC) == {
+        "nominatim.openstreetmap.org": (1.0, 1.0),
+        "overpass-api.de": (1.0, 2.0),
+        "router.project-osrm.org": (1.0, 2.0),
+    }
+
+
+def test_self_hosted_upstreams_are_unlimited_by_default():
+    limits = _upstream_rate_limits(dict(PUBLIC, OSRM="http://localhost:5000"))
+
+    assert "localhost:5000" not in limits
+    assert "router.project-osrm.org" not in limits
+    assert "nominatim.openstreetmap.org" in limits
+
+
+def test_self_hosted_upstream_uses_a_configured_rate(monkeypatch):
+    monkeypatch.setenv("OSRM_RATE_PER_SEC", "50")
+
+    limits = _upstream_rate_limits(dict(PUBLIC, OSRM="http://localhost:5000"))
+
+    assert limits["localhost:5000"] == (50.0, 2.0)
+
+
+def test_services_sharing_a_host_keep_the_stricter_budget(monkeypatch):
+    monkeypatch.setenv("NOMINATIM_RATE_PER_SEC", "5")
+    monkeypatch.setenv("NOMINATIM_BURST", "10")
+    monkeypatch.setenv("OVERPASS_RATE_PER_SEC", "20")
+    monkeypatch.setenv("OVERPASS_BURST", "4")
+
+    limits = _upstream_rate_limits({
+        "NOMINATIM": "http://127.0.0.1:8101",
+        "OVERPASS": "http://127.0.0.1:8101/api/interpreter",
+        "OSRM": "http://127.0.0.1:8103",
+    })
+
+    assert limits == {"127.0.0.1:8101": (5.0, 4.0)}
@@ -0,0 +1,58 @@
+"""
+Check-in heatmap tiles maintained incrementally at every zoom level.
+"""
+
+import random
+
+from app.services.heatmap import CELL_BITS, RESOLUTION, CheckinHeatmap
+from app.utils.geo_utils import lat_lon_to_pixel
+
+
+def test_heatmap_bins_a_point_at_every_zoom():
+    heatmap = CheckinHeatmap(max_zoom=8)
+    lat, lon = 34.1478, -118.1445
+    heatmap.record(lat, lon)
+    heatmap.record(lat, lon)
+
+    for z in range(heatmap.max_zoom + 1):
+        x, y = lat_lon_to_pixel(lat, lon, z)
+        col, row = lat_lon_to_pixel(lat, lon, z + CELL_BITS)
+        tile = heatmap.tile(z, x, y)
+        assert tile["resolution"] == RESOLUTION
+        assert tile["cells"] == [[col % RESOLUTION, row % RESOLUTION, 2]]
+        assert tile["max_count"] == 2
+
+
+def test_heatmap_parent_tile_sums_its_children():
+    heatmap = CheckinHeatmap(max_zoom=6)
+    rng = random.Random(7)
+    points = [(34 + rng.uniform(-1, 1), -118 + rng.uniform(-1, 1)) for _ in range(500)]
+    heatmap.record_many(points)
+
+    z = 3
+    x, y = lat_lon_to_pixel(34, -118, z)
+    parent = sum(count for _, _, count in heatmap.tile(z, x, y)["cells"])
+    children = sum(
+        count
+        for dx in (0, 1) for dy in (0, 1)
+        for _, _, count in heatmap.tile(z + 1, 2 * x + dx, 2 * y + dy)["cells"]
+    )
+    inside = sum(1 for lat, lon in points if lat_lon_to_pixel(lat, lon, z) == (x, y))
+
+    assert parent == children == inside == 500
+
+
+def test_heatmap_record_counts_matches_record_many():
+    points = [(34.0, -118.0)] * 3 + [(33.9, -118.2)]
+    one_by_one, counted = CheckinHeatmap(max_zoom=10), CheckinHeatmap(max_zoom=10)
+    one_by_one.record_many(points)
+    counted.record_counts([(34.0, -118.0, 3), (33.9, -118.2, 1)])
+
+    x, y = lat_lon_to_pixel(34.0, -118.0, 7)
+    assert one_by_one.tile(7, x, y) == counted.tile(7, x, y)
+
+
+def test_heatmap_empty_tile():
+    assert CheckinHeatmap(max_zoom=4).tile(2, 1, 1) == {
+        "z": 2, "x": 1, "y": 1, "resolution": RESOLUTION, "max_count": 0, "cells": []
+    }
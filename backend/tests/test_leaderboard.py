@@ -0,0 +1,85 @@
+"""
+Incremental leaderboard against a plain Counter.
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from app.services.leaderboard import Leaderboard
+
+
+def _venue(poi_id):
+    return {"poi_name": poi_id.title(), "poi_id": poi_id, "lat": 34.0, "lon": -118.0, "amenity_type": "cafe"}
+
+
+def _check_against(board, counts, limit=None):
+    top = board.top(len(counts) if limit is None else limit)
+    ranked = [loc["checkin_count"] for loc in top]
+
+    assert ranked == sorted(counts.values(), reverse=True)[:len(top)]
+    assert all(counts[loc["poi_id"]] == loc["checkin_count"] for loc in top)
+    assert len(board) == len(counts)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_increments_match_a_counter(seed):
+    rng = random.Random(seed)
+    board, counts = Leaderboard(), Counter()
+    # Skewed popularity so blocks of equal counts grow, split and merge
+    venues = [f"poi-{i}" for i in range(60)]
+    weights = [1 / (i + 1) for i in range(len(venues))]
+
+    for step in range(3000):
+        poi_id = rng.choices(venues, weights)[0]
+        board.increment(_venue(poi_id))
+        counts[poi_id] += 1
+        if step % 97 == 0:
+            _check_against(board, counts)
+
+    _check_against(board, counts)
+    _check_against(board, counts, limit=5)
+
+
+def test_load_then_increment():
+    board = Leaderboard([
+        {**_venue("a"), "checkin_count": 3},
+        {**_venue("b"), "checkin_count": 7},
+        {**_venue("c"), "checkin_count": 3},
+    ])
+    counts = Counter({"a": 3, "b": 7, "c": 3})
+
+    for poi_id in ["c", "a", "a", "d", "a"]:
+        board.increment(_venue(poi_id))
+        counts[poi_id] += 1
+
+    assert [(loc["poi_id"], loc["checkin_count"]) for loc in board.top(10)] == [
+        ("b", 7), ("a", 6), ("c", 4), ("d", 1)
+    ]
+    _check_against(board, counts)
+
+
+def test_load_replaces_the_contents():
+    board = Leaderboard([{**_venue("a"), "checkin_count": 5}])
+
+    board.load([{**_venue("b"), "checkin_count": 2}])
+    board.increment(_venue("a"))
+
+    assert [(loc["poi_id"], loc["checkin_count"]) for loc in board.top(10)] == [("b", 2), ("a", 1)]
+
+
+def test_top_returns_copies_and_respects_the_limit():
+    board = Leaderboard()
+    for poi_id in ["a", "b", "b", "c"]:
+        board.increment(_venue(poi_id))
+
+    top = board.top(2)
+    top[0]["checkin_count"] = 100
+    top[0]["poi_name"] = "changed"
+
+    # "a" and "c" tie for second place
+    assert [loc["poi_id"] for loc in top] in (["b", "a"], ["b", "c"])
+    assert board.top(1)[0] == {**_venue("b"), "checkin_count": 2}
+    assert board.top(0) == [] and board.top(-1) == []
+    assert Leaderboard().top(5) == []
@@ -0,0 +1,150 @@
+"""
+Offline router: ALT A* against plain Dijkstra, and pruning to the largest
+strongly connected component.
+"""
+
+import random
+
+import pytest
+
+from app.services.local_router import (
+    LocalRouter,
+    RoadGraph,
+    _dijkstra_all,
+    _largest_scc,
+    build_graphs,
+    graph_path,
+)
+
+HIGHWAYS = ["primary", "secondary", "residential", "service", "footway"]
+
+
+def _write_osm(path, nodes, ways):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<osm version="0.6">']
+    for node_id, (lat, lon) in nodes.items():
+        lines.append(f'  <node id="{node_id}" lat="{lat}" lon="{lon}"/>')
+    for way_id, (refs, tags) in enumerate(ways, start=1):
+        lines.append(f'  <way id="{way_id}">')
+        lines.extend(f'    <nd ref="{ref}"/>' for ref in refs)
+        lines.extend(f'    <tag k="{k}" v="{v}"/>' for k, v in tags.items())
+        lines.append("  </way>")
+    lines.append("</osm>")
+    path.write_text("\n".join(lines))
+
+
+def _grid_osm(path, size=12, seed=4):
+    """A street grid with mixed road classes, one-way streets and curved blocks."""
+    rng = random.Random(seed)
+    nodes = {}
+    for i in range(size):
+        for j in range(size):
+            nodes[i * size + j + 1] = (34.0 + i * 0.002 + rng.uniform(-3e-4, 3e-4), -118.3 + j * 0.002)
+    ways = []
+    shape_id = size * size + 1
+    for i in range(size):
+        for j in range(size):
+            here = i * size + j + 1
+            for ni, nj in ((i + 1, j), (i, j + 1)):
+                if ni >= size or nj >= size:
+                    continue
+                there = ni * size + nj + 1
+                refs = [here, there]
+                if rng.random() < 0.3:
+                    # A shape point that is not a junction
+                    lat = (nodes[here][0] + nodes[there][0]) / 2 + 4e-4
+                    nodes[shape_id] = (lat, (nodes[here][1] + nodes[there][1]) / 2)
+                    refs = [here, shape_id, there]
+                    shape_id += 1
+                tags = {"highway": rng.choice(HIGHWAYS), "name": f"Street {i}-{j}"}
+                if rng.random() < 0.25:
+                    tags["oneway"] = rng.choice(["yes", "-1"])
+                ways.append((refs, tags))
+    _write_osm(path, nodes, ways)
+
+
+@pytest.fixture(scope="module")
+def graph_dir(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("graphs")
+    osm = tmp / "grid.osm"
+    _grid_osm(osm)
+    build_graphs(str(osm), str(tmp), num_landmarks=4)
+    return tmp
+
+
+@pytest.mark.parametrize("profile", ["driving", "foot"])
+def test_astar_matches_dijkstra(graph_dir, profile):
+    graph = RoadGraph.load(graph_path(str(graph_dir), profile))
+    csr = (graph.offsets, graph.targets, graph.weights)
+    rng = random.Random(1)
+
+    for source in rng.sample(range(len(graph)), 10):
+        expected = _dijkstra_all(len(graph), csr, source)
+        for target in rng.sample(range(len(graph)), 15):
+            path = graph.shortest_path(source, target)
+            assert path is not None
+            assert sum(graph.weights[e] for e in path) == pytest.approx(expected[target])
+            # The edges chain from source to target
+            nodes = [source] + [graph.targets[e] for e in path]
+            assert [graph.sources[e] for e in path] == nodes[:-1]
+            assert nodes[-1] == target
+
+
+def test_one_to_many_matches_dijkstra(graph_dir):
+    graph = RoadGraph.load(graph_path(str(graph_dir), "driving"))
+    expected = _dijkstra_all(len(graph), (graph.offsets, graph.targets, graph.weights), 0)
+    targets = set(range(0, len(graph), 7))
+
+    found = graph.one_to_many(0, targets)
+
+    assert set(found) == targets
+    for target, (seconds, _) in found.items():
+        assert seconds == pytest.approx(expected[target])
+
+
+def test_route_returns_the_base_route_shape(graph_dir):
+    router = LocalRouter(str(graph_dir))
+
+    route = router.route("driving", 34.0, -118.3, 34.02, -118.28, geometry="full", steps=True)
+
+    assert route["distance_km"] > 2.0 and route["duration_s"] > 0
+    assert route["instructions"].startswith("Head on Street") and route["instructions"].endswith("Arrive at destination")
+    assert route["geometry"]
+    assert router.route("driving", 34.0, -118.3, 34.02, -118.28)["geometry"] is None
+
+
+def test_largest_scc_drops_one_way_spurs_and_islands():
+    edges = [
+        (0, 1), (1, 0), (1, 2), (2, 0),  # cycle
+        (2, 3),                          # spur with no way back
+        (4, 0),                          # dead end leading in
+        (5, 6), (6, 5),                  # separate island
+    ]
+
+    assert _largest_scc(7, edges) == {0, 1, 2}
+    assert _largest_scc(0, []) == set()
+
+
+def test_built_graph_keeps_only_the_largest_component(tmp_path):
+    nodes = {
+        1: (34.00, -118.30), 2: (34.00, -118.29), 3: (34.01, -118.29),
+        4: (34.02, -118.29),                   # reached only by a one-way street
+        5: (34.10, -118.10), 6: (34.10, -118.09),  # disconnected island
+    }
+    ways = [
+        ([1, 2, 3, 1], {"highway": "residential"}),
+        ([3, 4], {"highway": "residential", "oneway": "yes"}),
+        ([5, 6], {"highway": "residential", "oneway": "yes"}),
+    ]
+    osm = tmp_path / "spur.osm"
+    _write_osm(osm, nodes, ways)
+
+    sizes = build_graphs(str(osm), str(tmp_path), num_landmarks=2)
+    driving = RoadGraph.load(graph_path(str(tmp_path), "driving"))
+
+    # Node 2 is only a shape point; walking ignores the one-way tags, so the
+    # spur survives on foot while the smaller island is still dropped
+    assert sizes == {"driving": 2, "foot": 3}
+    assert sorted(zip(driving.lat, driving.lon)) == sorted([nodes[1], nodes[3]])
+    for u in range(len(driving)):
+        for v in range(len(driving)):
+            assert driving.shortest_path(u, v) is not None
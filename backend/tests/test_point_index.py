@@ -0,0 +1,79 @@
+"""
+KD-tree nearest-POI lookup against a brute-force scan.
+"""
+
+import random
+
+import pytest
+
+from app.services.overpass_service import OverpassService
+from app.utils.geo_utils import PointIndex, calculate_distance
+
+
+def _points(count, lat, lon, spread, seed=5):
+    rng = random.Random(seed)
+    return [
+        {"name": f"poi-{i}", "lat": lat + rng.uniform(-spread, spread), "lon": lon + rng.uniform(-spread, spread)}
+        for i in range(count)
+    ]
+
+
+def _brute_force(points, lat, lon, k):
+    return sorted(points, key=lambda p: calculate_distance(lat, lon, p["lat"], p["lon"]))[:k]
+
+
+@pytest.mark.parametrize("center, spread", [
+    ((34.05, -118.25), 0.5),   # LA
+    ((0.0, 179.9), 0.5),       # across the antimeridian
+    ((89.5, 0.0), 0.4),        # around the pole
+])
+@pytest.mark.parametrize("k", [1, 5, 40])
+def test_nearest_matches_brute_force(center, spread, k):
+    points = _points(1500, *center, spread)
+    index = PointIndex(points)
+    rng = random.Random(9)
+
+    for _ in range(25):
+        lat = center[0] + rng.uniform(-spread, spread)
+        lon = center[1] + rng.uniform(-spread, spread)
+        found = index.nearest(lat, lon, k)
+        expected = _brute_force(points, lat, lon, k)
+
+        assert [p["name"] for _, p in found] == [p["name"] for p in expected]
+        for distance, point in found:
+            assert distance == pytest.approx(calculate_distance(lat, lon, point["lat"], point["lon"]), abs=1e-6)
+
+
+def test_k_larger_than_the_index_returns_everything():
+    points = _points(5, 34.05, -118.25, 0.1)
+
+    assert len(PointIndex(points).nearest(34.05, -118.25, 50)) == 5
+
+
+def test_empty_index_and_zero_k():
+    assert PointIndex([]).nearest(34.05, -118.25, 3) == []
+    assert PointIndex(_points(20, 34.05, -118.25, 0.1)).nearest(34.05, -118.25, 0) == []
+
+
+def test_duplicate_coordinates_are_all_returned():
+    points = [{"name": f"twin-{i}", "lat": 34.05, "lon": -118.25} for i in range(12)]
+
+    found = PointIndex(points).nearest(34.06, -118.25, 12)
+
+    assert sorted(p["name"] for _, p in found) == sorted(p["name"] for p in points)
+
+
+def test_nearest_pois_index_follows_the_poi_cache():
+    service = OverpassService()
+    service._cache_result("zone-a", {"cafes": [{"name": "far", "lat": 34.2, "lon": -118.25}]}, "Zone A")
+    assert [p["name"] for p in service.get_nearest_pois("cafes", 34.05, -118.25, 1)] == ["far"]
+
+    # A new cache entry invalidates the index; the same POI cached twice counts once
+    service._cache_result("zone-b", {"cafes": [
+        {"name": "near", "lat": 34.051, "lon": -118.25},
+        {"name": "far", "lat": 34.2, "lon": -118.25},
+    ]}, "Zone B")
+    nearest = service.get_nearest_pois("cafes", 34.05, -118.25, 5)
+
+    assert [p["name"] for p in nearest] == ["near", "far"]
+    assert nearest[0]["distance"] == 0.11
@@ -0,0 +1,167 @@
+"""
+Base-route cache: snapped keys, geometry/steps reuse, TTL, LRU eviction and
+shared fetches for concurrent misses.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import transit_service as transit_module
+from app.services.transit_service import GEOMETRY_SATISFIED_BY, TransitService
+
+
+class FakeOSRM:
+    """Stands in for TransitService._fetch_osrm_route and counts the calls."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.calls = []
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self, profile, start, end, geometry, steps):
+        self.calls.append((profile, start, end, geometry, steps))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {
+            "distance_km": 1.0,
+            "duration_s": 120,
+            "legs": [] if steps else None,
+            "instructions": None if steps else "",
+            "geometry": f"{geometry}-shape" if geometry != "none" else None,
+        }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = TransitService(osrm_base="http://osrm.invalid", backend="osrm")
+    service.osrm = FakeOSRM()
+    monkeypatch.setattr(service, "_fetch_osrm_route", service.osrm)
+    return service
+
+
+def _route(service, lat=34.05, lon=-118.25, geometry="none", steps=True, profile="driving"):
+    return asyncio.run(service._get_base_route(profile, lat, lon, 34.10, -118.30, geometry, steps))
+
+
+def test_nearby_endpoints_share_one_entry(service):
+    _route(service, lat=34.050001)
+    _route(service, lat=34.050004)
+    _route(service, lat=34.0502)
+
+    assert len(service.osrm.calls) == 2
+    assert service.osrm.calls[0][1] == (34.05, -118.25)
+
+
+def test_profiles_are_cached_separately(service):
+    _route(service, profile="driving")
+    _route(service, profile="foot")
+
+    assert [call[0] for call in service.osrm.calls] == ["driving", "foot"]
+
+
+@pytest.mark.parametrize("cached, requested", [
+    (cached, requested)
+    for requested, satisfied_by in GEOMETRY_SATISFIED_BY.items()
+    for cached in ("none", "simplified", "full")
+])
+def test_geometry_reuse_follows_geometry_satisfied_by(service, cached, requested):
+    _route(service, geometry=cached)
+    _route(service, geometry=requested)
+
+    expected_calls = 1 if cached in GEOMETRY_SATISFIED_BY[requested] else 2
+    assert len(service.osrm.calls) == expected_calls
+
+
+def test_routes_with_steps_answer_requests_without(service):
+    _route(service, steps=True)
+    _route(service, steps=False)
+    assert len(service.osrm.calls) == 1
+
+    _route(service, lat=34.06, steps=False)
+    _route(service, lat=34.06, steps=True)
+    assert len(service.osrm.calls) == 3
+
+
+def test_expired_routes_are_fetched_again(service, monkeypatch):
+    monkeypatch.setattr(transit_module, "ROUTE_CACHE_TTL_SEC", -1)
+    _route(service)
+    _route(service)
+
+    assert len(service.osrm.calls) == 2
+
+
+def test_least_recently_used_route_is_evicted(service, monkeypatch):
+    monkeypatch.setattr(transit_module, "ROUTE_CACHE_MAX_ENTRIES", 2)
+    _route(service, lat=34.01)
+    _route(service, lat=34.02)
+    _route(service, lat=34.01)  # hit: 34.02 is now the oldest
+    _route(service, lat=34.03)  # evicts 34.02
+    assert len(service.osrm.calls) == 3
+
+    _route(service, lat=34.01)
+    assert len(service.osrm.calls) == 3
+    _route(service, lat=34.02)
+    assert len(service.osrm.calls) == 4
+
+
+def test_no_route_is_cached_too(service, monkeypatch):
+    async def no_route(*args):
+        service.osrm.calls.append(args)
+        return None
+
+    monkeypatch.setattr(service, "_fetch_osrm_route", no_route)
+    assert _route(service) is None
+    assert _route(service) is None
+    assert len(service.osrm.calls) == 1
+
+
+def test_concurrent_misses_share_one_fetch(service):
+    service.osrm.delay = 0.05
+
+    async def burst():
+        return await asyncio.gather(*(
+            service._get_base_route("driving", 34.05, -118.25, 34.10, -118.30, geometry)
+            for geometry in ("full", "none", "full", "none")
+        ))
+
+    routes = asyncio.run(burst())
+
+    # The "none" requests join the "full" fetch started first
+    assert len(service.osrm.calls) == 1
+    assert all(route is routes[0] for route in routes)
+    assert not service._route_fetches
+
+
+def test_a_failed_fetch_reaches_every_waiter_and_is_retried(service):
+    service.osrm.delay = 0.05
+    service.osrm.error = RuntimeError("upstream down")
+
+    async def burst():
+        return await asyncio.gather(
+            *(service._get_base_route("driving", 34.05, -118.25, 34.10, -118.30) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(burst())
+    assert len(service.osrm.calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    service.osrm.error = None
+    assert _route(service)["distance_km"] == 1.0
+    assert len(service.osrm.calls) == 2
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_fetch(service):
+    service.osrm.delay = 0.05
+
+    async def scenario():
+        first = asyncio.ensure_future(service._get_base_route("driving", 34.05, -118.25, 34.10, -118.30))
+        second = asyncio.ensure_future(service._get_base_route("driving", 34.05, -118.25, 34.10, -118.30))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario())["distance_km"] == 1.0
+    assert len(service.osrm.calls) == 1
@@ -0,0 +1,141 @@
+"""
+Route geometry: polyline6 encoding, Douglas-Peucker simplification and the
+OSRM request built for each geometry / steps combination.
+"""
+
+import asyncio
+import math
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import map_routes
+from app.services.transit_service import TransitService
+from app.utils.geo_utils import encode_polyline, simplify_path
+
+
+def _decode_polyline(encoded, precision=6):
+    coords, index, lat, lon = [], 0, 0, 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coords.append((lat / 10 ** precision, lon / 10 ** precision))
+    return coords
+
+
+def test_encode_polyline_matches_the_reference_example():
+    # Example from Google's polyline algorithm documentation
+    coords = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+    assert encode_polyline(coords, precision=5) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+
+@pytest.mark.parametrize("precision", [5, 6])
+def test_encode_polyline_round_trips(precision):
+    rng = random.Random(3)
+    coords = [(rng.uniform(-89.9, 89.9), rng.uniform(-179.9, 179.9)) for _ in range(300)]
+
+    decoded = _decode_polyline(encode_polyline(coords, precision), precision)
+
+    assert len(decoded) == len(coords)
+    for (lat, lon), (dlat, dlon) in zip(coords, decoded):
+        assert dlat == pytest.approx(lat, abs=0.6 / 10 ** precision)
+        assert dlon == pytest.approx(lon, abs=0.6 / 10 ** precision)
+
+
+def test_encode_polyline_empty_path():
+    assert encode_polyline([]) == ""
+
+
+def _deviation_m(point, a, b):
+    """Distance in meters from point to segment a-b, in the same projection as simplify_path."""
+    lat0 = math.radians(a[0])
+    x, y, x1, y1, x2, y2 = (
+        v for lat, lon in (point, a, b)
+        for v in (math.radians(lon) * math.cos(lat0) * 6371000.0, math.radians(lat) * 6371000.0)
+    )
+    dx, dy = x2 - x1, y2 - y1
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+
+def test_simplify_path_keeps_dropped_points_within_tolerance():
+    rng = random.Random(8)
+    coords = [(34.05 + i * 1e-4, -118.25 + rng.uniform(-2e-4, 2e-4)) for i in range(400)]
+
+    simplified = simplify_path(coords, tolerance_m=10.0)
+
+    assert simplified[0] == coords[0] and simplified[-1] == coords[-1]
+    assert 2 < len(simplified) < len(coords)
+    kept = [coords.index(point) for point in simplified]
+    assert kept == sorted(kept)
+    for first, last in zip(kept, kept[1:]):
+        for point in coords[first + 1:last]:
+            assert _deviation_m(point, coords[first], coords[last]) <= 10.0 + 1e-6
+
+
+def test_simplify_path_collapses_a_straight_line():
+    coords = [(34.05 + i * 1e-4, -118.25 + i * 1e-4) for i in range(50)]
+
+    assert simplify_path(coords) == [coords[0], coords[-1]]
+
+
+def test_simplify_path_keeps_a_corner():
+    coords = [(34.05, -118.25), (34.05, -118.24), (34.06, -118.24)]
+
+    assert simplify_path(coords) == coords
+
+
+def test_simplify_path_leaves_short_paths_alone():
+    assert simplify_path([]) == []
+    assert simplify_path([(34.05, -118.25), (34.05, -118.25)]) == [(34.05, -118.25), (34.05, -118.25)]
+
+
+@pytest.mark.parametrize("geometry, steps, expected", [
+    ("none", False, {"overview": "false", "steps": "false"}),
+    ("simplified", False, {"overview": "simplified", "steps": "false"}),
+    ("full", True, {"overview": "full", "steps": "true"}),
+])
+def test_osrm_request_asks_only_for_what_is_needed(monkeypatch, geometry, steps, expected):
+    service = TransitService(osrm_base="http://osrm.invalid", backend="osrm")
+    requests = []
+
+    async def get_json(url, params):
+        requests.append(params)
+        return {"routes": [{
+            "distance": 1500.0, "duration": 120.4, "geometry": "_encoded_",
+            "legs": [{"steps": []}],
+        }]}
+
+    monkeypatch.setattr(service, "_get_json", get_json)
+
+    route = asyncio.run(service._fetch_osrm_route("driving", (34.05, -118.25), (34.1, -118.3), geometry, steps))
+
+    assert requests == [{**expected, "geometries": "polyline6"}]
+    assert route["distance_km"] == 1.5 and route["duration_s"] == 120
+    assert route["geometry"] == (None if geometry == "none" else "_encoded_")
+    assert (route["legs"] is not None) == steps
+
+
+@pytest.mark.parametrize("body", [{"geometry": "detailed"}, {"steps": "false"}, {"steps": 1}])
+def test_transit_rejects_bad_geometry_and_steps(body):
+    app = FastAPI()
+    app.include_router(map_routes.router, prefix="/api")
+    trip = {"start_lat": 34.05, "start_lon": -118.25, "end_lat": 34.10, "end_lon": -118.30}
+
+    response = TestClient(app).post("/api/transit", json={**trip, **body})
+
+    assert response.status_code == 400
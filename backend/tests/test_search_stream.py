@@ -0,0 +1,126 @@
+"""
+Streaming search: per-source batches de-duplicated against everything sent.
+"""
+
+import asyncio
+import json
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import map_routes
+from app.services.nominatim_service import DEDUPE_DISTANCE_KM, NominatimService
+from app.utils.geo_utils import calculate_distance
+
+USER = (34.05, -118.25)
+
+
+def _place(name, lat, lon, source="nominatim"):
+    distance = calculate_distance(*USER, lat, lon)
+    return {
+        "name": name, "lat": lat, "lon": lon, "description": name,
+        "distance_km": round(distance, 2), "distance_miles": round(distance * 0.621371, 2),
+        "source": source,
+    }
+
+
+def _brute_force_dedupe(results, limit=None):
+    unique = []
+    for result in results:
+        if limit is not None and len(unique) >= limit:
+            break
+        if all(
+            calculate_distance(result["lat"], result["lon"], kept["lat"], kept["lon"]) >= DEDUPE_DISTANCE_KM
+            for kept in unique
+        ):
+            unique.append(result)
+    return unique
+
+
+@pytest.mark.parametrize("center", [(34.05, -118.25), (64.8, -147.7), (-33.9, 151.2)])
+def test_dedupe_matches_pairwise_comparison(center):
+    rng = random.Random(11)
+    points = [
+        {"lat": center[0] + rng.uniform(-0.01, 0.01), "lon": center[1] + rng.uniform(-0.01, 0.01)}
+        for _ in range(800)
+    ]
+
+    assert NominatimService()._deduplicate_results(points) == _brute_force_dedupe(points)
+    assert NominatimService()._deduplicate_results(points, limit=25) == _brute_force_dedupe(points, 25)
+
+
+def test_dedupe_grid_carries_over_between_calls():
+    service = NominatimService()
+    grid = {}
+    first = service._deduplicate_results([_place("a", 34.0500, -118.2500)], grid)
+    # ~55 m from "a", and ~1 km away
+    second = service._deduplicate_results(
+        [_place("a-dup", 34.0505, -118.2500), _place("b", 34.0600, -118.2500)], grid
+    )
+
+    assert [p["name"] for p in first] == ["a"]
+    assert [p["name"] for p in second] == ["b"]
+
+
+def _stream(service, query, limit=10):
+    async def collect():
+        return [event async for event in service.search_places_stream(query, *USER, limit=limit)]
+    return asyncio.run(collect())
+
+
+def _fake_source(results, delay, error=None):
+    async def search(**kwargs):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return [dict(r) for r in results]
+    return search
+
+
+def test_stream_sends_only_new_places_then_a_ranked_final(monkeypatch):
+    service = NominatimService()
+    overpass = [_place("cafe-1", 34.051, -118.25, "overpass"), _place("cafe-2", 34.07, -118.25, "overpass")]
+    nominatim = [
+        _place("cafe-1 (nominatim)", 34.0511, -118.25),  # ~11 m from cafe-1
+        _place("cafe-3", 34.055, -118.25),
+    ]
+    monkeypatch.setattr(service, "_search_overpass", _fake_source(overpass, 0.0))
+    monkeypatch.setattr(service, "_search_nominatim", _fake_source(nominatim, 0.02))
+
+    events = _stream(service, "coffee")
+
+    assert [(e["type"], e.get("source")) for e in events] == [
+        ("batch", "overpass"), ("batch", "nominatim"), ("final", None)
+    ]
+    assert [p["name"] for p in events[0]["results"]] == ["cafe-1", "cafe-2"]
+    assert [p["name"] for p in events[1]["results"]] == ["cafe-3"]
+    assert [p["name"] for p in events[2]["results"]] == ["cafe-1", "cafe-3", "cafe-2"]
+
+
+def test_stream_reports_a_failed_source_and_keeps_the_others(monkeypatch):
+    service = NominatimService()
+    monkeypatch.setattr(service, "_search_overpass", _fake_source([], 0.0, RuntimeError("overpass down")))
+    monkeypatch.setattr(service, "_search_nominatim", _fake_source([_place("cafe", 34.06, -118.25)], 0.01))
+
+    events = _stream(service, "coffee")
+
+    assert events[0] == {"type": "error", "source": "overpass", "detail": "overpass down"}
+    assert [p["name"] for p in events[-1]["results"]] == ["cafe"]
+
+
+def test_stream_route_writes_ndjson(monkeypatch):
+    service = map_routes.nominatim_service
+    monkeypatch.setattr(service, "_search_nominatim", _fake_source([_place("museum", 34.06, -118.25)], 0.0))
+    app = FastAPI()
+    app.include_router(map_routes.router, prefix="/api")
+
+    response = TestClient(app).post(
+        "/api/search/stream", json={"query": "museum", "lat": USER[0], "lon": USER[1]}
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["type"] for e in events] == ["batch", "final"]
+    assert events[-1]["total_count"] == 1 and events[-1]["query"] == "museum"
@@ -0,0 +1,61 @@
+"""
+Seeded synthetic dataset: same seed and end time, same check-ins.
+"""
+
+import gzip
+import json
+import subprocess
+import sys
+from datetime import datetime
+
+from app.services.synthetic_data import SyntheticDataset, _apportion
+
+END = datetime(2025, 1, 1)
+
+
+def _generate(seed, count=2000):
+    dataset = SyntheticDataset(seed=seed, num_users=500, pois_per_zone=30)
+    return list(dataset.iter_checkins(count, days=7, end=END))
+
+
+def test_same_seed_gives_the_same_checkins():
+    assert _generate(7) == _generate(7)
+
+
+def test_different_seeds_give_different_checkins():
+    assert _generate(7) != _generate(8)
+
+
+def test_checkins_are_time_ordered_within_the_window():
+    checkins = _generate(7)
+    timestamps = [c["timestamp"] for c in checkins]
+
+    assert len(checkins) == 2000
+    assert timestamps == sorted(timestamps)
+    assert "2024-12-25T00:00:00" <= timestamps[0] and timestamps[-1] < END.isoformat()
+
+
+def test_ndjson_fixture_is_byte_identical_across_runs(tmp_path):
+    paths = [tmp_path / "a.ndjson.gz", tmp_path / "b.ndjson.gz"]
+    for path in paths:
+        SyntheticDataset(seed=3, num_users=100, pois_per_zone=10).write_ndjson(str(path), 500, days=3, end=END)
+
+    first, second = (gzip.decompress(path.read_bytes()) for path in paths)
+    assert first == second
+    assert [json.loads(line) for line in first.splitlines()] == list(
+        SyntheticDataset(seed=3, num_users=100, pois_per_zone=10).iter_checkins(500, days=3, end=END)
+    )
+
+
+def test_apportion_keeps_the_total():
+    assert _apportion(10, [1, 1, 1]) == [4, 3, 3]
+    assert sum(_apportion(1_000_003, [1.4, 1, 1, 1, 1, 1, 1.4])) == 1_000_003
+
+
+def test_importing_the_generator_leaves_the_store_alone():
+    # Writing a fixture must not open (or seed) the configured check-in store
+    code = (
+        "import sys, app.services.synthetic_data; "
+        "sys.exit('app.services.checkin_store' in sys.modules)"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,100 @@
+"""
+/transit/compare: every mode from one fetch per OSRM profile.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import map_routes
+from app.services.transit_service import TransitService
+
+TRIP = {"start_lat": 34.05, "start_lon": -118.25, "end_lat": 34.10, "end_lon": -118.30}
+
+
+@pytest.fixture
+def osrm_calls(monkeypatch):
+    """Route /transit requests to a fresh service whose OSRM fetches are faked."""
+    service = TransitService(osrm_base="http://osrm.invalid", backend="osrm")
+    calls = []
+
+    async def fetch(profile, start, end, geometry, steps):
+        calls.append(profile)
+        if profile == "foot" and end == (0.0, 0.0):
+            return None
+        return {
+            "distance_km": 10.0,
+            "duration_s": 600 if profile == "driving" else 7200,
+            "legs": None,
+            "instructions": "Head north",
+            "geometry": None,
+        }
+
+    monkeypatch.setattr(service, "_fetch_osrm_route", fetch)
+    monkeypatch.setattr(map_routes, "transit_service", service)
+    return calls
+
+
+app = FastAPI()
+app.include_router(map_routes.router, prefix="/api")
+client = TestClient(app)
+
+
+def test_compare_fetches_each_profile_once(osrm_calls):
+    response = client.post("/api/transit/compare", json=TRIP)
+
+    assert response.status_code == 200
+    options = response.json()["options"]
+    assert set(options) == {"driving", "carpool", "transit", "walking"}
+    assert sorted(osrm_calls) == ["driving", "foot"]
+
+    durations = {mode: option["total_duration"] for mode, option in options.items()}
+    assert durations == {
+        "driving": 600,
+        "carpool": 600,
+        "transit": int(7200 * 1.5 + 300),
+        "walking": int(10.0 / 5 * 3600),
+    }
+    assert all(option["total_distance"] == 10.0 for option in options.values())
+
+
+def test_compare_only_fetches_the_profiles_of_the_requested_modes(osrm_calls):
+    response = client.post("/api/transit/compare", json={**TRIP, "modes": ["walking", "transit"]})
+
+    assert set(response.json()["options"]) == {"walking", "transit"}
+    assert osrm_calls == ["foot"]
+
+
+def test_compare_matches_single_mode_requests(osrm_calls):
+    options = client.post("/api/transit/compare", json={**TRIP, "passengers": 3}).json()["options"]
+
+    for mode, option in options.items():
+        single = client.post("/api/transit", json={**TRIP, "mode": mode, "passengers": 3}).json()
+        assert single == option
+    # The single-mode requests were all served from the route cache
+    assert len(osrm_calls) == 2
+
+
+def test_compare_reports_modes_without_a_route(osrm_calls):
+    trip = {**TRIP, "end_lat": 0.0, "end_lon": 0.0}
+
+    options = client.post("/api/transit/compare", json=trip).json()["options"]
+
+    assert options["walking"]["routes"] == [] and options["walking"]["total_duration"] == 0
+    assert options["driving"]["routes"][0]["mode"] == "driving"
+
+
+@pytest.mark.parametrize("body", [
+    {"modes": []},
+    {"modes": "driving"},
+    {"modes": ["driving", "flying"]},
+    {"modes": [None]},
+    {"start_lat": 95},
+    {"geometry": "detailed"},
+    {"steps": "false"},
+])
+def test_compare_rejects_bad_requests(osrm_calls, body):
+    response = client.post("/api/transit/compare", json={**TRIP, **body})
+
+    assert response.status_code == 400
+    assert osrm_calls == []
@@ -0,0 +1,77 @@
+"""
+rank=travel_time: places re-ranked from one matrix call, distance order on failure.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.local_router import LocalRouter
+from app.services.transit_service import TransitService
+from app.services.upstream_scheduler import UpstreamQueueTimeout
+
+ORIGIN = (34.05, -118.25)
+
+
+def _places():
+    # Named by straight-line distance from ORIGIN: p0 is the closest
+    return [{"name": f"p{i}", "lat": ORIGIN[0] + 0.01 * (i + 1), "lon": ORIGIN[1]} for i in (3, 0, 4, 1, 2)]
+
+
+def _rank(service, items, max_candidates=4):
+    return asyncio.run(service.rank_by_travel_time(*ORIGIN, items, max_candidates=max_candidates))
+
+
+def test_candidates_are_sorted_by_travel_time(monkeypatch):
+    service = TransitService(osrm_base="http://osrm.invalid", backend="osrm")
+    # Travel times for p0..p3 (the closest four); p2 is unreachable
+    times = {"p0": 900, "p1": 300, "p2": None, "p3": 600}
+
+    async def matrix(sources, destinations, mode="driving"):
+        names = [f"p{round((lat - ORIGIN[0]) / 0.01) - 1}" for lat, _ in destinations]
+        return [[times[name] for name in names]]
+
+    monkeypatch.setattr(service, "get_travel_time_matrix", matrix)
+    ranked = _rank(service, _places())
+
+    assert [(p["name"], p["travel_time_s"]) for p in ranked] == [
+        ("p1", 300), ("p3", 600), ("p0", 900), ("p2", None), ("p4", None)
+    ]
+
+
+@pytest.mark.parametrize("error", [
+    httpx.ConnectError("connection refused"),
+    UpstreamQueueTimeout("no slot"),
+    ValueError("bad response"),
+])
+def test_matrix_failure_keeps_distance_order(monkeypatch, error):
+    service = TransitService(osrm_base="http://osrm.invalid", backend="osrm")
+
+    async def failing_table(profile, sources, destinations):
+        raise error
+
+    monkeypatch.setattr(service, "_fetch_osrm_table", failing_table)
+    ranked = _rank(service, _places())
+
+    assert [p["name"] for p in ranked] == ["p0", "p1", "p2", "p3", "p4"]
+    assert all(p["travel_time_s"] is None for p in ranked)
+
+
+def test_missing_local_graph_keeps_distance_order(tmp_path):
+    service = TransitService(backend="local")
+    service._local_router = LocalRouter(str(tmp_path))
+
+    ranked = _rank(service, _places())
+
+    assert [p["name"] for p in ranked] == ["p0", "p1", "p2", "p3", "p4"]
+    assert all(p["travel_time_s"] is None for p in ranked)
+
+
+def test_ranking_returns_copies():
+    service = TransitService(osrm_base="http://osrm.invalid", backend="osrm")
+    places = _places()
+
+    _rank(service, places, max_candidates=0)
+
+    assert all("travel_time_s" not in p for p in places)
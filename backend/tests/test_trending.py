@@ -0,0 +1,89 @@
+"""
+Sliding-window trending venues under a controlled clock.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.services import trending as trending_module
+from app.services.trending import TrendingTracker
+
+from .conftest import make_checkin
+
+NOW = datetime(2024, 6, 1, 12, 0, 0).timestamp()
+
+
+def _at(seconds_ago: float) -> str:
+    return datetime.fromtimestamp(NOW - seconds_ago).isoformat()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable stand-in for time.time() as seen by the trending module."""
+    now = [NOW]
+    monkeypatch.setattr(trending_module.time, "time", lambda: now[0])
+    return now
+
+
+def _scores(tracker, window):
+    return {venue["poi_id"]: venue["score"] for venue in tracker.top("Test Zone", window, 10)}
+
+
+def test_trending_counts_checkins_per_window(clock):
+    tracker = TrendingTracker()
+    tracker.record_checkin(make_checkin(1, poi="poi-a", timestamp=_at(10)))
+    tracker.record_checkin(make_checkin(2, poi="poi-a", timestamp=_at(20)))
+    tracker.record_checkin(make_checkin(3, poi="poi-b", timestamp=_at(2 * 3600)))
+
+    assert _scores(tracker, "hour") == {"Test Zone-poi-a": 2}
+    assert _scores(tracker, "day") == {"Test Zone-poi-a": 2, "Test Zone-poi-b": 1}
+
+
+def test_trending_windows_expire(clock):
+    tracker = TrendingTracker()
+    tracker.record_checkin(make_checkin(1, poi="poi-a", timestamp=_at(0)))
+
+    clock[0] = NOW + 59 * 60
+    assert _scores(tracker, "hour") == {"Test Zone-poi-a": 1}
+    clock[0] = NOW + 61 * 60
+    assert _scores(tracker, "hour") == {}
+    assert _scores(tracker, "day") == {"Test Zone-poi-a": 1}
+    clock[0] = NOW + 25 * 3600
+    assert _scores(tracker, "day") == {}
+
+
+def test_trending_ignores_checkins_older_than_the_window(clock):
+    tracker = TrendingTracker()
+    tracker.record_checkin(make_checkin(1, poi="poi-a", timestamp=_at(0)))
+    tracker.record_checkin(make_checkin(2, poi="poi-b", timestamp=_at(2 * 86400)))
+
+    assert _scores(tracker, "day") == {"Test Zone-poi-a": 1}
+
+
+def test_trending_decay_halves_per_half_life(clock):
+    tracker = TrendingTracker(half_life_sec=600)
+    tracker.record_checkin(make_checkin(1, poi="poi-a", timestamp=_at(0)))
+
+    clock[0] = NOW + 600
+    assert _scores(tracker, "decay")["Test Zone-poi-a"] == pytest.approx(0.5)
+
+
+def test_trending_top_is_ranked_and_limited(clock):
+    tracker = TrendingTracker()
+    for n, poi in enumerate(["poi-a"] * 3 + ["poi-b"] * 5 + ["poi-c"]):
+        tracker.record_checkin(make_checkin(n, poi=poi, timestamp=_at(60 + n)))
+
+    assert [venue["poi_id"] for venue in tracker.top("Test Zone", "hour", 2)] == ["Test Zone-poi-b", "Test Zone-poi-a"]
+    assert tracker.top("Test Zone", "hour", 0) == []
+    assert tracker.top("Other Zone", "hour", 5) == []
+
+
+def test_trending_decay_survives_a_rebase(clock):
+    tracker = TrendingTracker(half_life_sec=1)
+    tracker.record_checkin(make_checkin(1, poi="poi-a", timestamp=_at(0)))
+    # Far enough ahead that the stored scores are rescaled to a new base time
+    clock[0] = NOW + 1000
+    tracker.record_checkin(make_checkin(2, poi="poi-b", timestamp=_at(-1000)))
+
+    assert _scores(tracker, "decay") == {"Test Zone-poi-b": pytest.approx(1.0), "Test Zone-poi-a": 0.0}
@@ -0,0 +1,146 @@
+"""
+Upstream token buckets: priority order, queue timeouts and per-host routing.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.upstream_scheduler import Priority, TokenBucket, UpstreamQueueTimeout, UpstreamScheduler
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    bucket = TokenBucket("test", rate=50, burst=1)
+    granted = []
+
+    async def request(name, priority):
+        await bucket.acquire(priority, timeout=5)
+        granted.append(name)
+
+    async def scenario():
+        await bucket.acquire(Priority.INTERACTIVE, timeout=1)  # empty the bucket
+        await asyncio.gather(
+            request("background", Priority.BACKGROUND),
+            request("prefetch-1", Priority.PREFETCH),
+            request("interactive-1", Priority.INTERACTIVE),
+            request("prefetch-2", Priority.PREFETCH),
+            request("interactive-2", Priority.INTERACTIVE),
+        )
+
+    asyncio.run(scenario())
+
+    assert granted == ["interactive-1", "interactive-2", "prefetch-1", "prefetch-2", "background"]
+
+
+def test_tokens_refill_at_the_configured_rate():
+    bucket = TokenBucket("test", rate=40, burst=2)
+
+    async def scenario():
+        started = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire(Priority.INTERACTIVE, timeout=5)
+        return time.monotonic() - started
+
+    # Two from the burst, then four more at 40/s
+    assert 0.08 <= asyncio.run(scenario()) < 0.5
+
+
+def test_queue_timeout_raises_and_leaves_the_queue():
+    bucket = TokenBucket("slow.example", rate=0.1, burst=1)
+
+    async def scenario():
+        await bucket.acquire(Priority.BACKGROUND, timeout=1)
+        with pytest.raises(UpstreamQueueTimeout, match="slow.example"):
+            await bucket.acquire(Priority.BACKGROUND, timeout=0.05)
+
+    asyncio.run(scenario())
+    snapshot = bucket.snapshot()
+
+    assert snapshot["timeouts"]["background"] == 1
+    assert snapshot["queue_depth"]["background"] == 0
+    assert snapshot["granted"]["background"] == 1
+
+
+def test_timed_out_waiter_does_not_take_a_later_token():
+    bucket = TokenBucket("test", rate=20, burst=1)
+    granted = []
+
+    async def scenario():
+        await bucket.acquire(Priority.INTERACTIVE, timeout=1)
+
+        async def patient():
+            await bucket.acquire(Priority.BACKGROUND, timeout=5)
+            granted.append("patient")
+
+        async def impatient():
+            try:
+                await bucket.acquire(Priority.INTERACTIVE, timeout=0.01)
+                granted.append("impatient")
+            except UpstreamQueueTimeout:
+                pass
+
+        await asyncio.gather(impatient(), patient())
+
+    asyncio.run(scenario())
+
+    assert granted == ["patient"]
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    bucket = TokenBucket("test", rate=20, burst=1)
+
+    async def scenario():
+        await bucket.acquire(Priority.INTERACTIVE, timeout=1)
+        waiter = asyncio.ensure_future(bucket.acquire(Priority.INTERACTIVE, timeout=5))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await bucket.acquire(Priority.BACKGROUND, timeout=1)
+
+    asyncio.run(scenario())
+    snapshot = bucket.snapshot()
+
+    assert snapshot["queue_depth"] == {"interactive": 0, "prefetch": 0, "background": 0}
+    assert snapshot["granted"]["background"] == 1
+
+
+def test_sync_and_async_callers_share_the_bucket():
+    bucket = TokenBucket("test", rate=50, burst=1)
+    bucket.acquire_sync(Priority.INTERACTIVE, timeout=1)
+    granted = []
+
+    def sync_caller():
+        bucket.acquire_sync(Priority.BACKGROUND, timeout=5)
+        granted.append("sync")
+
+    async def async_caller():
+        while bucket.snapshot()["queue_depth"]["background"] == 0:
+            await asyncio.sleep(0.001)  # queue after the thread
+        await bucket.acquire(Priority.INTERACTIVE, timeout=5)
+        granted.append("async")
+
+    thread = threading.Thread(target=sync_caller)
+    thread.start()
+    asyncio.run(async_caller())
+    thread.join()
+
+    assert granted == ["async", "sync"]
+
+
+def test_scheduler_limits_only_configured_hosts():
+    scheduler = UpstreamScheduler({"limited.example:8080": (0.1, 1)})
+
+    async def scenario():
+        for _ in range(20):
+            await scheduler.acquire("http://unlimited.example/api", Priority.INTERACTIVE, timeout=0.01)
+        await scheduler.acquire("http://limited.example:8080/a", Priority.INTERACTIVE, timeout=0.01)
+        with pytest.raises(UpstreamQueueTimeout):
+            await scheduler.acquire("http://limited.example:8080/b", Priority.INTERACTIVE, timeout=0.01)
+        # Same host name on another port is a different upstream
+        await scheduler.acquire("http://limited.example:9090/a", Priority.INTERACTIVE, timeout=0.01)
+
+    asyncio.run(scenario())
+
+    assert list(scheduler.snapshot()) == ["limited.example:8080"]
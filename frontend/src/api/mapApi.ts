@@ -36,6 +36,62 @@ export const searchPlaces = async (params: {
   return result.results  // This is the key change!
 }
 
+/**
+ * Stream search results from the backend as each source responds
+ * @param params - Search query and coordinates
+ * @param onBatch - Called with each batch of new (already deduplicated) places
+ * @returns Promise with the final ranked results
+ */
+export const searchPlacesStream = async (
+  params: {
+    query: string
+    lat: number
+    lon: number
+  },
+  onBatch: (places: Place[], source: string) => void
+): Promise<Place[]> => {
+  const response = await fetch(`${API_BASE_URL}/search/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(params),
+  })
+
+  if (!response.ok || !response.body) {
+    throw new Error('Search request failed')
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let finalResults: Place[] = []
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    // Each complete line is one JSON event
+    let newline = buffer.indexOf('\n')
+    while (newline >= 0) {
+      const line = buffer.slice(0, newline).trim()
+      buffer = buffer.slice(newline + 1)
+      if (line) {
+        const event = JSON.parse(line)
+        if (event.type === 'batch' && event.results.length > 0) {
+          onBatch(event.results, event.source)
+        } else if (event.type === 'final') {
+          finalResults = event.results
+        }
+      }
+      newline = buffer.indexOf('\n')
+    }
+  }
+
+  return finalResults
+}
+
 /**
  * Get zone data from the backend API
  * @returns Promise with zones data
@@ -1,4 +1,4 @@
-import { CheckIn, TopLocation } from '../types'
+import { CheckIn, HeatmapTile, LeaderboardDelta, TopLocation } from '../types'
 
 // Backend API base URL
 const API_BASE_URL = 'http://localhost:8000/api'
@@ -7,12 +7,19 @@ const API_BASE_URL = 'http://localhost:8000/api'
  * Get recent check-ins for a zone
  * @param zone - Zone name to get check-ins for
  * @param limit - Optional maximum number of check-ins to return
+ * @param cursor - Optional sinceId (only newer check-ins) or beforeId (older history page)
  * @returns Promise with list of check-ins
  */
-export const getZoneCheckins = async (zone: string, limit: number = 20): Promise<CheckIn[]> => {
+export const getZoneCheckins = async (
+  zone: string,
+  limit: number = 20,
+  cursor: { sinceId?: string; beforeId?: string } = {}
+): Promise<CheckIn[]> => {
   try {
     const params = new URLSearchParams()
     if (limit) params.append('limit', limit.toString())
+    if (cursor.sinceId) params.append('since_id', cursor.sinceId)
+    if (cursor.beforeId) params.append('before_id', cursor.beforeId)
 
     const response = await fetch(`${API_BASE_URL}/checkins/${zone}?${params}`)
 
@@ -49,4 +56,54 @@ export const getTopLocations = async (zone: string, limit: number = 10): Promise
     console.error('Top locations API error:', error)
     throw error
   }
-}
\ No newline at end of file
+}
+
+/**
+ * Live check-in events for a zone, pushed over server-sent events
+ * @param zone - Zone name to follow
+ * @param handlers - Callbacks for new check-ins, leaderboard deltas and resync requests
+ * @returns Function that closes the stream
+ */
+export const subscribeToZoneCheckins = (
+  zone: string,
+  handlers: {
+    onCheckin?: (checkin: CheckIn) => void
+    onLeaderboard?: (delta: LeaderboardDelta) => void
+    onResync?: () => void
+  }
+): (() => void) => {
+  const source = new EventSource(`${API_BASE_URL}/checkins/${encodeURIComponent(zone)}/stream`)
+
+  source.addEventListener('checkin', (event) => {
+    handlers.onCheckin?.(JSON.parse((event as MessageEvent).data))
+  })
+  source.addEventListener('leaderboard', (event) => {
+    handlers.onLeaderboard?.(JSON.parse((event as MessageEvent).data))
+  })
+  // Sent when this client fell behind; events were dropped, so re-fetch
+  source.addEventListener('resync', () => handlers.onResync?.())
+
+  return () => source.close()
+}
+
+/**
+ * Get check-in density for a slippy-map tile
+ * @param z - Zoom level
+ * @param x - Tile column
+ * @param y - Tile row
+ * @returns Promise with the tile's non-empty cells
+ */
+export const getHeatmapTile = async (z: number, x: number, y: number): Promise<HeatmapTile> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/checkins/heatmap/${z}/${x}/${y}`)
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`)
+    }
+
+    return await response.json()
+  } catch (error) {
+    console.error('Heatmap API error:', error)
+    throw error
+  }
+}
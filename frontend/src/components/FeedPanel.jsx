@@ -92,20 +92,20 @@
 
 import React from 'react';
 import { formatDistanceToNow } from 'date-fns';
+import { getZoneCheckins, subscribeToZoneCheckins } from '../api/mapApi_checkins';
+
+const FEED_LIMIT = 20;
 
 const FeedPanel = ({ zone }) => {
   const [checkins, setCheckins] = React.useState([]);
   const [loading, setLoading] = React.useState(true);
 
   React.useEffect(() => {
+    if (!zone) return;
+
     const fetchCheckins = async () => {
-      if (!zone) return;
-      setLoading(true);
       try {
-        const response = await fetch(`http://localhost:8000/api/checkins/${zone}`);
-        if (!response.ok) throw new Error('Failed to fetch check-ins');
-        const data = await response.json();
-        setCheckins(data);
+        setCheckins(await getZoneCheckins(zone, FEED_LIMIT));
       } catch (error) {
         console.error('Error fetching check-ins:', error);
       } finally {
@@ -113,7 +113,22 @@ const FeedPanel = ({ zone }) => {
       }
     };
 
+    setLoading(true);
     fetchCheckins();
+
+    // New check-ins are pushed by the server instead of re-fetching the list
+    const unsubscribe = subscribeToZoneCheckins(zone, {
+      onCheckin: (checkin) => {
+        setCheckins((current) =>
+          current.some((c) => c.id === checkin.id)
+            ? current
+            : [checkin, ...current].slice(0, FEED_LIMIT)
+        );
+      },
+      onResync: fetchCheckins,
+    });
+
+    return unsubscribe;
   }, [zone]);
 
   if (!zone) {
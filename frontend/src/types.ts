@@ -49,6 +49,26 @@ export interface CheckIn {
   poi_id: string
 }
 
+// Check-in density for one map tile; cells are [column, row, count]
+export interface HeatmapTile {
+  z: number
+  x: number
+  y: number
+  resolution: number
+  max_count: number
+  cells: [number, number, number][]
+}
+
+// Pushed on the live check-in stream when a venue gains check-ins
+export interface LeaderboardDelta {
+  poi_name: string
+  poi_id: string
+  lat: number
+  lon: number
+  amenity_type: string
+  delta: number
+}
+
 // API response types
 export interface ZonesResponse {
   zones: Zone[]